@@ -0,0 +1,133 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(__file__, *[os.pardir] * 2)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simplelms.settings')
+import django
+django.setup()
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import subprocess
+import threading
+import time
+
+from lms_core.models import Course, CourseContent
+
+# Throughput and latency of the read endpoints under concurrent load, with
+# the same number of sync WSGI workers (gunicorn) and async ASGI workers
+# (uvicorn). Both servers are started here against the database configured
+# in settings (the local Postgres), with silk turned off:
+#   python benchmarks/bench_asgi.py --workers 4 --concurrency 64 --duration 20
+# --username/--password add the authenticated reads (mycourses, comments).
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--workers', type=int, default=4)
+parser.add_argument('--concurrency', type=int, default=64)
+parser.add_argument('--duration', type=float, default=20, help="seconds of load per server")
+parser.add_argument('--port', type=int, default=8100)
+parser.add_argument('--username')
+parser.add_argument('--password')
+args = parser.parse_args()
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, *[os.pardir] * 2))
+SERVERS = {
+    'wsgi (gunicorn)': ['gunicorn', 'simplelms.wsgi:application', '--workers', str(args.workers),
+                        '--bind', f'127.0.0.1:{args.port}', '--log-level', 'warning'],
+    'asgi (uvicorn)': ['uvicorn', 'simplelms.asgi:application', '--workers', str(args.workers),
+                       '--host', '127.0.0.1', '--port', str(args.port), '--log-level', 'warning'],
+}
+
+course_ids = list(Course.objects.values_list('id', flat=True)[:1000])
+content_ids = list(CourseContent.objects.values_list('id', flat=True)[:1000])
+if not course_ids or not content_ids:
+    sys.exit("no courses or contents, load some data first (import_lms)")
+
+
+def paths(authenticated):
+    yield '/api/v1/courses'
+    yield f'/api/v1/courses/{random.choice(course_ids)}'
+    yield f'/api/v1/courses/{random.choice(course_ids)}/contents'
+    if authenticated:
+        yield '/api/v1/mycourses'
+        yield f'/api/v1/contents/{random.choice(content_ids)}/comments'
+
+
+def wait_for_port(process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"server exited with {process.returncode}")
+        try:
+            socket.create_connection(('127.0.0.1', args.port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit("server did not start")
+
+
+def sign_in():
+    if not args.username:
+        return {}
+    connection = http.client.HTTPConnection('127.0.0.1', args.port)
+    body = json.dumps({'username': args.username, 'password': args.password})
+    connection.request('POST', '/api/v1/auth/sign-in', body, {'Content-Type': 'application/json'})
+    token = json.loads(connection.getresponse().read())['access']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def client(headers, deadline, latencies, errors):
+    # one keep-alive connection per simulated user
+    connection = http.client.HTTPConnection('127.0.0.1', args.port, timeout=30)
+    while time.monotonic() < deadline:
+        for path in paths(bool(headers)):
+            start_time = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', args.port, timeout=30)
+                ok = False
+            latencies.append(time.perf_counter() - start_time)
+            if not ok:
+                errors.append(path)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+env = dict(os.environ, LMS_SILK='0')
+print(f"{args.workers} workers, {args.concurrency} concurrent clients, {args.duration:.0f}s each")
+for name, command in SERVERS.items():
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env)
+    try:
+        wait_for_port(process)
+        headers = sign_in()
+        # warm up worker imports and caches before measuring
+        client(headers, time.monotonic() + 2, [], [])
+
+        latencies, errors = [], []
+        deadline = time.monotonic() + args.duration
+        threads = [threading.Thread(target=client, args=(headers, deadline, latencies, errors))
+                   for _ in range(args.concurrency)]
+        start_time = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start_time
+    finally:
+        process.terminate()
+        process.wait()
+
+    latencies.sort()
+    print(f"{name:<16} {len(latencies) / elapsed:8.1f} req/s  "
+          f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  "
+          f"p95 {percentile(latencies, 0.95) * 1000:7.1f} ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  errors {len(errors)}")
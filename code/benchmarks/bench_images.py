@@ -0,0 +1,72 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(__file__, *[os.pardir] * 2)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simplelms.settings')
+import django
+django.setup()
+
+import argparse
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db.models.fields.files import FieldFile
+from PIL import Image
+
+from lms_core.images import FORMATS, VARIANTS, generate_variants
+from lms_core.models import Course
+
+# Variant generation throughput (thumb, card and full, each as WebP and JPEG)
+# on a batch of generated camera-sized photos, serially and with thread pools
+# of increasing size. Files go to a temporary directory:
+#   python benchmarks/bench_images.py --images 40 --width 4000 --height 3000
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--images', type=int, default=40)
+parser.add_argument('--width', type=int, default=4000)
+parser.add_argument('--height', type=int, default=3000)
+parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count() or 1}))
+args = parser.parse_args()
+
+root = tempfile.mkdtemp()
+storage = FileSystemStorage(location=root)
+field = Course._meta.get_field('image')
+
+
+def sample(num):
+    # noise over a gradient compresses like a photo, unlike a flat colour
+    noise = Image.effect_noise((args.width, args.height), 40 + num % 20).convert('RGB')
+    gradient = Image.linear_gradient('L').resize((args.width, args.height)).convert('RGB')
+    buffer = BytesIO()
+    Image.blend(noise, gradient, 0.5).save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+try:
+    originals = []
+    total = 0
+    for num in range(args.images):
+        content = sample(num)
+        total += len(content)
+        originals.append(FieldFile(None, field, storage.save(f'course/photo{num}.jpg', ContentFile(content))))
+    print(f"{args.images} images {args.width}x{args.height}, {total / args.images / 1024:.0f} KiB each, "
+          f"{len(VARIANTS)} variants x {len(FORMATS)} formats")
+    for fieldfile in originals:
+        fieldfile.storage = storage
+
+    variant_bytes = sum(storage.size(name) for formats in generate_variants(originals[0]).values()
+                        for name in formats.values())
+    print(f"variants of one image: {variant_bytes / 1024:.0f} KiB in total")
+
+    for workers in args.workers:
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(generate_variants, originals))
+        elapsed = time.perf_counter() - start_time
+        print(f"{workers:>3} workers  {args.images / elapsed:7.2f} images/s  {elapsed:7.2f} s")
+finally:
+    shutil.rmtree(root)
@@ -0,0 +1,65 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(__file__, *[os.pardir] * 2)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simplelms.settings')
+import django
+django.setup()
+
+import argparse
+import time
+
+from django.http import JsonResponse as DjangoJsonResponse
+from django.utils import timezone
+from ninja.renderers import JSONRenderer
+
+from lms_core.renderers import JsonResponse, ORJSONRenderer
+
+# Serialization time of the largest responses: a detailed progress report
+# (hand-built JsonResponse) and a page of courses (ninja renderer). Data is
+# built in memory, only the encoding is timed:
+#   python benchmarks/bench_json_render.py --rows 20000 --courses 100
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--rows', type=int, default=20000, help="completions in the progress report")
+parser.add_argument('--courses', type=int, default=100, help="courses in the course page")
+parser.add_argument('--repeat', type=int, default=20)
+args = parser.parse_args()
+
+now = timezone.now()
+report = {
+    "course_id": 1,
+    "students": [{"student_id": num, "student_username": f"student{num}", "completed": 7, "total": 10,
+                  "percentage": 70.0, "last_completed_at": now} for num in range(args.rows // 10)],
+    "completions": [{"student_id": num // 10, "student_username": f"student{num // 10}",
+                     "content_id": num % 10, "content_name": f"Lesson {num % 10}",
+                     "completed": True, "completed_at": now} for num in range(args.rows)],
+}
+page = {
+    "items": [{"id": num, "name": f"Course {num}", "description": "x" * 1000, "price": 100, "image": None,
+               "teacher": {"id": 1, "email": "teacher@example.com", "first_name": "T", "last_name": "1"},
+               "created_at": now, "updated_at": now,
+               "rating": {"count": 10, "average": 4.2, "histogram": {1: 0, 2: 1, 3: 1, 4: 3, 5: 5}}}
+              for num in range(args.courses)],
+    "next": "eyJ2IjpbXX0", "previous": None, "count": None,
+}
+
+
+def timed(name, render):
+    size = len(render())
+    start_time = time.perf_counter()
+    for _ in range(args.repeat):
+        render()
+    elapsed = (time.perf_counter() - start_time) / args.repeat
+    print(f"{name:<40} {size / 1024:9.1f} KiB  {elapsed * 1000:8.2f} ms")
+    return elapsed
+
+
+print(f"progress report, {args.rows} completions")
+slow = timed("django.http.JsonResponse", lambda: DjangoJsonResponse(report).content)
+fast = timed("lms_core.renderers.JsonResponse", lambda: JsonResponse(report).content)
+print(f"{'speedup':<40} {slow / fast:9.1f}x")
+
+print(f"course page, {args.courses} courses")
+slow = timed("ninja JSONRenderer", lambda: JSONRenderer().render(None, page, response_status=200))
+fast = timed("ORJSONRenderer", lambda: ORJSONRenderer().render(None, page, response_status=200))
+print(f"{'speedup':<40} {slow / fast:9.1f}x")
@@ -0,0 +1,65 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(__file__, *[os.pardir] * 2)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simplelms.settings')
+import django
+django.setup()
+
+import argparse
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from lms_core.fieldsets import side_load, subset_schema
+from lms_core.models import Course, CourseContent
+from lms_core.schema import CourseContentMini
+
+# Payload size and serialization time of a content list page, nested (the
+# default) against ?format=normalized. Objects are built in memory, so only
+# serialization is measured:
+#   python benchmarks/bench_normalized.py --items 200 --courses 1
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--items', type=int, default=200)
+parser.add_argument('--courses', type=int, default=1)
+parser.add_argument('--description', type=int, default=2000, help="course description length")
+parser.add_argument('--repeat', type=int, default=20)
+args = parser.parse_args()
+
+now = timezone.now()
+teachers = {num: User(id=num, username=f'teacher{num}', email=f'teacher{num}@example.com',
+                      first_name="Teacher", last_name=str(num))
+            for num in range(1, args.courses + 1)}
+courses = {num: Course(id=num, name=f"Course {num}", description="x" * args.description, price=100,
+                       teacher=teachers[num], created_at=now, updated_at=now)
+           for num in range(1, args.courses + 1)}
+contents = [CourseContent(id=num, name=f"Lesson {num}", description="Lesson description",
+                          course_id=courses[num % args.courses + 1], created_at=now, updated_at=now)
+            for num in range(args.items)]
+objects = {'courses': courses, 'users': teachers}
+
+
+def nested():
+    items = [CourseContentMini.model_validate(content).model_dump() for content in contents]
+    return json.dumps({'items': items}, cls=DjangoJSONEncoder)
+
+
+def normalized():
+    names = tuple(CourseContentMini.model_fields)
+    schema = subset_schema(CourseContentMini, names, {'course_id': 'course_id_id'})
+    items = [schema.model_validate(content).model_dump() for content in contents]
+    included = side_load({'courses': {content.course_id_id for content in contents}},
+                         fetch=lambda kind, ids: {pk: objects[kind][pk] for pk in ids})
+    return json.dumps({'items': items, 'included': included}, cls=DjangoJSONEncoder)
+
+
+for name, render in (('nested', nested), ('normalized', normalized)):
+    body = render()
+    start_time = time.perf_counter()
+    for _ in range(args.repeat):
+        render()
+    elapsed = (time.perf_counter() - start_time) / args.repeat
+    print(f"{name:<11} {args.items} items  {len(body) / 1024:9.1f} KiB  {elapsed * 1000:8.2f} ms")
@@ -0,0 +1,34 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(__file__, *[os.pardir] * 2)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simplelms.settings')
+import django
+django.setup()
+
+import argparse
+import time
+
+from lms_core.importer import PasswordHasherPool, hash_passwords
+
+# Compare serial make_password with the process pool used by import_lms.
+# No database access, only hashing:
+#   python benchmarks/bench_password_hashing.py --users 10000 --workers 8
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--users', type=int, default=10000)
+parser.add_argument('--workers', type=int, default=os.cpu_count())
+args = parser.parse_args()
+
+passwords = [f"Synthetic-{num:06d}!" for num in range(args.users)]
+
+start_time = time.perf_counter()
+hash_passwords(passwords)
+serial = time.perf_counter() - start_time
+print(f"serial     {args.users} users  {serial:8.2f}s  {args.users / serial:8.1f} users/s")
+
+with PasswordHasherPool(args.workers) as hasher:
+    start_time = time.perf_counter()
+    hasher(passwords)
+    parallel = time.perf_counter() - start_time
+print(f"parallel   {args.users} users  {parallel:8.2f}s  {args.users / parallel:8.1f} users/s"
+      f"  ({args.workers} workers, {serial / parallel:.1f}x)")
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from lms_core.models import Course
+from lms_core.search import course_search_query, full_text_available
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
@@ -7,4 +8,10 @@ class CourseAdmin(admin.ModelAdmin):
     list_filter = ["teacher"]
     search_fields = ["name", "description"]
     readonly_fields = ["created_at", "updated_at"]
-    fields = ["name", "description", "price", "image", "teacher", "created_at", "updated_at"]
\ No newline at end of file
+    fields = ["name", "description", "price", "image", "teacher", "created_at", "updated_at"]
+
+    def get_search_results(self, request, queryset, search_term):
+        # use the GIN indexed search_vector instead of ILIKE scans
+        if search_term and full_text_available():
+            return queryset.filter(search_vector=course_search_query(search_term)), False
+        return super().get_search_results(request, queryset, search_term)
@@ -1,61 +1,119 @@
 from ninja import NinjaAPI, UploadedFile, File, Form
 from ninja.responses import Response
-from lms_core.schema import CourseSchemaOut, CourseMemberOut, CourseSchemaIn
+from lms_core.schema import CourseSchemaOut, CourseMemberOut, CourseSchemaIn, CourseDetailOut
 from lms_core.schema import CourseContentMini, CourseContentFull
-from lms_core.schema import CourseCommentOut, CourseCommentIn
+from lms_core.schema import CourseCommentOut, CourseCommentIn, CommentListOut
 from lms_core.schema import CourseFeedbackCreateSchema, CourseFeedbackResponseSchema, FeedbackUpdateSchema
 from lms_core.schema import CategoryCreate, CourseCreateSchema, CourseUpdateSchema
 from lms_core.schema import CompletionTrackingCreateSchema, CompletionTrackingResponseSchema, CourseContentUpdateSchema
 from lms_core.schema import PublishContentSchema, GetCourseContentSchema, UserRoleSchema
+from lms_core.schema import BatchEnrollmentSchema, BatchCompletionSchema
+from lms_core.schema import UploadStartIn, UploadOut
 from lms_core.models import Course, CourseMember, CourseContent, Comment, CompletionTracking
-from lms_core.models import Profile, CourseFeedback, CourseCategory
+from lms_core.models import Profile, CourseFeedback, CourseCategory, CourseProgress, AttachmentUpload
+from lms_core.ratings import add_rating, change_rating, remove_rating, rating_summary
+from lms_core.outline import course_outline as get_course_outline
+from lms_core.search import search_courses
+from lms_core.auth import ClaimsJwtAuth
+from lms_core.identity import get_identity, identity_for_user_id, identity_for_username
+from lms_core.membership import membership_cache, membership_for_content
+from lms_core.batch import enroll_many, complete_many
+from lms_core.attachments import UploadError, start_upload, write_chunk, attachment_response
+from lms_core.progress import ensure_progress, record_completion, remove_completion, content_published_changed
 from ninja_simple_jwt.auth.views.api import mobile_auth_router
-from ninja_simple_jwt.auth.ninja_auth import HttpJwtAuth
-from ninja.pagination import paginate, PageNumberPagination
-
+from ninja.pagination import paginate
+from ninja.decorators import decorate_view
+from lms_core.cache import (CATALOGUE, CONTENTS, RATINGS, cached_response, course_list_key, course_detail_key,
+                            per_course)
+from lms_core.conditional import conditional
+from lms_core.pagination import KeysetPagination
+from lms_core.renderers import ORJSONRenderer, JsonResponse
+from lms_core.fieldsets import COURSE_FIELDS, MEMBER_FIELDS, CONTENT_FIELDS, CONTENT_DETAIL_FIELDS, COMMENT_FIELDS
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from collections import Counter
+from functools import wraps
 import json
+from uuid import UUID
 
 
-apiv1 = NinjaAPI()
+apiv1 = NinjaAPI(renderer=ORJSONRenderer())
 apiv1.add_router("/auth/", mobile_auth_router)
-apiAuth = HttpJwtAuth()
+apiAuth = ClaimsJwtAuth()
+
+
+def read_view(view=None, *, get=False):
+    # The hot reads only build a lazy queryset (`get` fetches its one row), so
+    # one body serves both servers: under ASGI (LMS_ASYNC_VIEWS) it becomes a
+    # coroutine function and the decorators above take their async paths,
+    # under WSGI it stays sync instead of going through async_to_sync.
+    if view is None:
+        return lambda view: read_view(view, get=get)
+    if getattr(settings, 'LMS_ASYNC_VIEWS', True):
+        @wraps(view)
+        async def async_view(request, *args, **kwargs):
+            result = view(request, *args, **kwargs)
+            return await result.aget() if get else result
+        return async_view
+
+    @wraps(view)
+    def sync_view(request, *args, **kwargs):
+        result = view(request, *args, **kwargs)
+        return result.get() if get else result
+    return sync_view
 
 @apiv1.get("/hello")
 def hello(request):
     return "Hello World"
 
 # - paginate list_courses
-@apiv1.get("/courses", response=list[CourseSchemaOut])
-@paginate(PageNumberPagination, page_size=10)
+@apiv1.get("/courses", response=list[CourseDetailOut])
+@decorate_view(conditional(CATALOGUE, RATINGS))
+@decorate_view(cached_response(course_list_key, groups=(CATALOGUE, RATINGS)))
+@COURSE_FIELDS.render
+@paginate(KeysetPagination, page_size=10)
+@read_view
 def list_courses(request):
-    courses = Course.objects.select_related('teacher').all()
-    return courses
+    courses = Course.objects.select_related('teacher', 'rating').defer('search_vector')
+    return COURSE_FIELDS.apply(request, courses)
+
+# - search courses
+@apiv1.get("/courses/search", response=list[CourseDetailOut])
+@COURSE_FIELDS.render
+@paginate(KeysetPagination, ordering=['-rank', '-id'], page_size=10)
+def search_course(request, q: str):
+    courses = search_courses(q, Course.objects.select_related('teacher', 'rating').defer('search_vector'))
+    return COURSE_FIELDS.apply(request, courses)
 
 # - my courses
 @apiv1.get("/mycourses", auth=apiAuth, response=list[CourseMemberOut])
+@MEMBER_FIELDS.render
+@paginate(KeysetPagination, ordering=['-created_at'])
+@read_view
 def my_courses(request):
-    user = User.objects.get(id=request.user.id)
-    courses = CourseMember.objects.select_related('user_id', 'course_id').filter(user_id=user)
-    return courses
+    courses = CourseMember.objects.select_related('user_id', 'course_id__teacher').filter(user_id=request.user.id)
+    return MEMBER_FIELDS.apply(request, courses, keep=['created_at'])
 
 # - create course
 @apiv1.post("/courses", auth=apiAuth, response={201:CourseSchemaOut})
 def create_course(request, data: Form[CourseSchemaIn], image: UploadedFile = File(None)):
-    user = User.objects.get(id=request.user.id)
     course = Course(
         name=data.name,
         description=data.description,
         price=data.price,
         image=image,
-        teacher=user
+        teacher_id=get_identity(request).user_id
     )
 
     if image:
-        course.image.save(image.name, image)
+        course.image.save(image.name, image, save=False)
 
     course.save()
     return 201, course
@@ -72,58 +130,101 @@ def update_course(request, course_id: int, data: Form[CourseSchemaIn], image: Up
     course.description = data.description
     course.price = data.price
     if image:
-        course.image.save(image.name, image)
+        course.image.save(image.name, image, save=False)
     course.save()
     return course
 
 # - detail course
-@apiv1.get("/courses/{course_id}", response=CourseSchemaOut)
+@apiv1.get("/courses/{course_id}", response=CourseDetailOut)
+@decorate_view(conditional(CATALOGUE, per_course(RATINGS)))
+@decorate_view(cached_response(course_detail_key, groups=(CATALOGUE, per_course(RATINGS))))
+@COURSE_FIELDS.render
+@read_view(get=True)
 def detail_course(request, course_id: int):
-    course = Course.objects.select_related('teacher').get(id=course_id)
-    return course
+    courses = Course.objects.select_related('teacher', 'rating').defer('search_vector')
+    return COURSE_FIELDS.apply(request, courses).filter(id=course_id)
 
 # - list content course
 @apiv1.get("/courses/{course_id}/contents", response=list[CourseContentMini])
+@decorate_view(conditional(CATALOGUE, CONTENTS))
+@CONTENT_FIELDS.render
+@paginate(KeysetPagination, ordering=['created_at'])
+@read_view
 def list_content_course(request, course_id: int):
-    contents = CourseContent.objects.filter(course_id=course_id)
-    return contents
+    contents = CourseContent.objects.select_related('course_id__teacher').filter(course_id=course_id)
+    return CONTENT_FIELDS.apply(request, contents, keep=['created_at'])
+
+# - content outline (nested modules and lessons)
+@apiv1.get("/courses/{course_id}/outline", auth=apiAuth)
+def course_outline(request, course_id: int):
+    course = get_object_or_404(Course.objects.only("id", "teacher_id"), id=course_id)
+    is_teacher = course.teacher_id == request.user.id or request.auth_claims.is_teacher
+    return JsonResponse({
+        "course_id": course.id,
+        "outline": get_course_outline(course.id, published_only=not is_teacher),
+    }, status=200)
 
 # - detail content course
 @apiv1.get("/courses/{course_id}/contents/{content_id}", response=CourseContentFull)
+@decorate_view(conditional(CATALOGUE, CONTENTS))
+@CONTENT_DETAIL_FIELDS.render
 def detail_content_course(request, course_id: int, content_id: int):
-    content = CourseContent.objects.get(id=content_id)
-    return content
+    contents = CourseContent.objects.select_related('course_id__teacher')
+    return CONTENT_DETAIL_FIELDS.apply(request, contents).get(id=content_id)
 
 # - enroll course
 @apiv1.post("/courses/{course_id}/enroll", auth=apiAuth, response=CourseMemberOut)
 def enroll_course(request, course_id: int):
-    user = User.objects.get(id=request.user.id)
+    user_id = get_identity(request).user_id
     course = Course.objects.get(id=course_id)
-    course_member = CourseMember(course_id=course, user_id=user, roles="std")
-    course_member.save()
+    course_member, _ = CourseMember.objects.get_or_create(course_id=course, user_id_id=user_id,
+                                                          defaults={"roles": "std"})
+    ensure_progress(user_id, course.id)
     # print(course_member)
     return course_member
 
+def batch_teacher_id(request):
+    # batches are limited to the caller's own courses, staff may use any
+    identity = identity_for_user_id(request.user.id, fresh=True)
+    return None if identity.is_staff else identity.user_id
+
+# - enroll many students at once
+@apiv1.post("/courses/enroll-batch/", auth=apiAuth)
+def enroll_batch(request, data: BatchEnrollmentSchema):
+    results = enroll_many([(item.username, item.course_id) for item in data.items],
+                          teacher_id=batch_teacher_id(request))
+    return JsonResponse({
+        "summary": Counter(result["status"] for result in results),
+        "results": results,
+    }, status=200)
+
 # - list content comment
-@apiv1.get("/contents/{content_id}/comments", auth=apiAuth, response=list[CourseContentMini])
+@apiv1.get("/contents/{content_id}/comments", auth=apiAuth, response=list[CommentListOut])
+@COMMENT_FIELDS.render
+@paginate(KeysetPagination, ordering=['created_at'])
+@read_view
 def list_content_comment(request, content_id: int):
-    comments = CourseContent.objects.filter(course_id=content_id)
-    return comments
+    comments = (Comment.objects.filter(content_id=content_id)
+                .select_related('member_id__user_id')
+                .only('id', 'comment', 'created_at', 'member_id__user_id__username',
+                      'member_id__user_id__first_name', 'member_id__user_id__last_name'))
+    return COMMENT_FIELDS.apply(request, comments, keep=['created_at'])
 
 # - create content comment
 @apiv1.post("/contents/{content_id}/comments", auth=apiAuth, response={201: CourseCommentOut})
 def create_content_comment(request, content_id: int, data: CourseCommentIn):
-    user = User.objects.get(id=request.user.id)
-    content = CourseContent.objects.get(id=content_id)
+    member = None
+    course_id = membership_cache.content_course(content_id)
+    # once the course of the content is known a fresh token can refuse without queries
+    if course_id is None or request.auth_claims.is_member(course_id):
+        member = membership_for_content(content_id, request.user.id)
 
-    if not content.course_id.is_member(user):
+    if member is None:
         message =  {"error": "You are not authorized to create comment in this content"}
         return Response(message, status=401)
     
-    member = CourseMember.objects.get(course_id=content.course_id, user_id=user)
-    
     comment = Comment(
-        content_id=content,
+        content_id_id=content_id,
         member_id=member,
         comment=data.comment
     )
@@ -176,29 +277,28 @@ def register_user(request):
 
 @apiv1.post("/feedbacks/", response=CourseFeedbackResponseSchema)
 def create_feedback(request, data: CourseFeedbackCreateSchema):
-    try:
-        student = User.objects.get(username=data.created_by)
-    except User.DoesNotExist:
+    identity = identity_for_username(data.created_by)
+    if identity is None:
         return JsonResponse({"detail": "User not found"}, status=404)
-    if not student.is_authenticated:
-        return JsonResponse({"detail": "Only authenticated students can provide feedback"}, status=403)
     course = get_object_or_404(Course, id=data.course_id)
-    if CourseFeedback.objects.filter(course=course, student=student).exists():
+    if CourseFeedback.objects.filter(course=course, student_id=identity.user_id).exists():
         return JsonResponse({"detail": "You have already given feedback for this course"}, status=400)
     
-    feedback = CourseFeedback.objects.create(
-        course=course,
-        student=student,
-        rating=data.rating,
-        feedback=data.feedback,
-    )
+    with transaction.atomic():
+        feedback = CourseFeedback.objects.create(
+            course=course,
+            student_id=identity.user_id,
+            rating=data.rating,
+            feedback=data.feedback,
+        )
+        add_rating(course.id, feedback.rating)
 
     return JsonResponse({
         "message": "Feedback Added",
         "feedback": {
             "id": feedback.id,
             "course_id": feedback.course.id,
-            "student_id": feedback.student.id,
+            "student_id": feedback.student_id,
             "rating": feedback.rating,
             "feedback": feedback.feedback,
             "created_at": feedback.created_at,
@@ -206,15 +306,18 @@ def create_feedback(request, data: CourseFeedbackCreateSchema):
     }, status=201)
     
 @apiv1.get("/show-feedback/", auth=apiAuth)
-def show_feedback(request, course_id: int):
-    course = get_object_or_404(Course, id=course_id)
-    feedbacks = CourseFeedback.objects.filter(course=course)
+def show_feedback(request, course_id: int, cursor: str = None, page_size: int = None):
+    course = get_object_or_404(Course.objects.select_related('rating'), id=course_id)
+    feedbacks = CourseFeedback.objects.filter(course=course).only(
+        "id", "course_id", "student_id", "rating", "feedback", "created_at", "updated_at")
+    page = KeysetPagination(ordering=['-created_at'], page_size=20).paginate_queryset(
+        feedbacks, KeysetPagination.Input(cursor=cursor, page_size=page_size), request)
     feedback_data = []
-    for feedback in feedbacks:
+    for feedback in page["items"]:
         feedback_data.append({
             "id": feedback.id,
-            "course_id": feedback.course.id,
-            "student_id": feedback.student.id,
+            "course_id": feedback.course_id,
+            "student_id": feedback.student_id,
             "rating": feedback.rating,
             "feedback": feedback.feedback,
             "created_at": feedback.created_at,
@@ -224,20 +327,26 @@ def show_feedback(request, course_id: int):
     return JsonResponse({
         "message": "Showing Feedbacks",
         "course_id": course.id,
-        "feedbacks": feedback_data
+        "rating": rating_summary(getattr(course, 'rating', None)),
+        "feedbacks": feedback_data,
+        "next": page["next"],
+        "previous": page["previous"],
     }, status=200)
 
 @apiv1.put("/edit-feedback/{feedback_id}", auth=apiAuth)
 def edit_feedback(request, feedback_id: int, data: FeedbackUpdateSchema):
-    feedback = get_object_or_404(CourseFeedback, id=feedback_id)
-    if request.user.id != feedback.student.id:
-        return JsonResponse({
-            "detail": "Only the student who created this feedback can edit it.",
-            }, status=403) 
-        
-    feedback.rating = data.rating
-    feedback.feedback = data.feedback
-    feedback.save()
+    with transaction.atomic():
+        # locked, so a concurrent edit cannot change the rating read here
+        feedback = get_object_or_404(CourseFeedback.objects.select_for_update(), id=feedback_id)
+        if request.user.id != feedback.student_id:
+            return JsonResponse({
+                "detail": "Only the student who created this feedback can edit it.",
+                }, status=403)
+        old_rating = feedback.rating
+        feedback.rating = data.rating
+        feedback.feedback = data.feedback
+        feedback.save()
+        change_rating(feedback.course_id, old_rating, feedback.rating)
 
     return JsonResponse({
         "message": "Feedback updated successfully",
@@ -255,10 +364,14 @@ def edit_feedback(request, feedback_id: int, data: FeedbackUpdateSchema):
 @apiv1.delete("/delete-feedback/", auth=apiAuth)
 def delete_feedback(request, student_id: int, feedback_id: int):
     student = get_object_or_404(User, id=student_id)
-    feedback = CourseFeedback.objects.filter(student=student, id=feedback_id).first()
-    if not feedback:
-        return JsonResponse({"error": "Feedback not found for this student."}, status=404)
-    feedback.delete()
+    with transaction.atomic():
+        feedback = CourseFeedback.objects.select_for_update().filter(student=student, id=feedback_id).first()
+        if not feedback:
+            return JsonResponse({"error": "Feedback not found for this student."}, status=404)
+        # only the request that actually removed the row takes it off the rating
+        deleted, _ = CourseFeedback.objects.filter(pk=feedback.pk).delete()
+        if deleted:
+            remove_rating(feedback.course_id, feedback.rating)
 
     return JsonResponse({"message": "Feedback successfully deleted."}, status=200)
 
@@ -336,48 +449,129 @@ def update_course(request, course_id: int, data: CourseUpdateSchema):
 
 @apiv1.post("/add-completion/", auth=apiAuth)
 def add_completion_tracking(request, data: CompletionTrackingCreateSchema):
-    student_username = data.student_username  
-    try:
-        student = User.objects.get(username=student_username)
-    except User.DoesNotExist:
+    identity = identity_for_username(data.student_username)
+    if identity is None:
         return JsonResponse({"detail": "User not found"}, status=404)
-
     content = get_object_or_404(CourseContent, id=data.content_id)
 
-    completion, created = CompletionTracking.objects.update_or_create(
-        student=student,
-        content=content,
-        defaults={'completed': True, 'completed_at': timezone.now()}
-    )
+    with transaction.atomic():
+        completion, created = CompletionTracking.objects.select_for_update().get_or_create(
+            student_id=identity.user_id,
+            content=content,
+            defaults={'completed': True, 'completed_at': timezone.now()}
+        )
+        newly_completed = created or not completion.completed
+        if not created:
+            completion.completed = True
+            completion.completed_at = timezone.now()
+            completion.save()
+        if newly_completed:
+            record_completion(identity.user_id, content, completion.completed_at)
 
     return JsonResponse({
-        "student_username": student.username,
+        "student_username": identity.username,
         "content_id": content.id,
         "completed": completion.completed,
         "completed_at": completion.completed_at,
     }, status=200)
 
+@apiv1.post("/add-completion-batch/", auth=apiAuth)
+def add_completion_batch(request, data: BatchCompletionSchema):
+    results = complete_many([(item.student_username, item.content_id) for item in data.items],
+                            teacher_id=batch_teacher_id(request))
+    return JsonResponse({
+        "summary": Counter(result["status"] for result in results),
+        "results": results,
+    }, status=200)
+
+def course_completions(course_id):
+    # one joined query instead of touching completion.student/.content per row
+    return (CompletionTracking.objects
+            .filter(content__course_id=course_id)
+            .order_by("student_id", "content_id")
+            .values("student_id", "student__username", "content_id", "content__name",
+                    "completed", "completed_at"))
+
+def completion_rows(course_id):
+    return [{
+        "student_id": row["student_id"],
+        "student_username": row["student__username"],
+        "content_id": row["content_id"],
+        "content_name": row["content__name"],
+        "completed": row["completed"],
+        "completed_at": row["completed_at"],
+    } for row in course_completions(course_id)]
+
+
 @apiv1.get("/show-completion/", auth=apiAuth, response=CompletionTrackingResponseSchema)
 def show_completion(request, course_id: int):
     course = get_object_or_404(Course, id=course_id)
-    course_contents = CourseContent.objects.filter(course_id=course.id)
-
-    completions = CompletionTracking.objects.filter(content__in=course_contents)
-
-    completion_data = []
-    for completion in completions:
-        completion_data.append({
-            "student_id": completion.student.id,
-            "student_username": completion.student.username,
-            "content_id": completion.content.id,
-            "content_name": completion.content.name,
-            "completed": completion.completed,
-            "completed_at": completion.completed_at,
-        })
 
     return JsonResponse({
         "course_id": course.id,
-        "completions": completion_data
+        "completions": completion_rows(course.id)
+    }, status=200)
+
+@apiv1.get("/progress-report/", auth=apiAuth)
+def progress_report(request, course_id: int, detail: bool = False):
+    course = get_object_or_404(Course, id=course_id)
+
+    # published contents only, the same numbers as CourseProgress and /my-progress/
+    total_contents = (CourseContent.objects
+                      .filter(course_id=OuterRef("course_id"), is_published=True)
+                      .order_by()
+                      .values("course_id")
+                      .annotate(total=Count("id"))
+                      .values("total"))
+    rows = (CourseMember.objects
+            .filter(course_id=course.id)
+            .order_by("user_id")
+            .values("user_id", "user_id__username")
+            .annotate(
+                completed=Count("user_id__completiontracking",
+                                filter=Q(user_id__completiontracking__completed=True,
+                                         user_id__completiontracking__content__course_id=course.id,
+                                         user_id__completiontracking__content__is_published=True),
+                                distinct=True),
+                total=Coalesce(Subquery(total_contents), 0),
+            ))
+
+    students = []
+    for row in rows:
+        total = row["total"]
+        students.append({
+            "student_id": row["user_id"],
+            "student_username": row["user_id__username"],
+            "completed": row["completed"],
+            "total": total,
+            "percentage": round(row["completed"] * 100 / total, 2) if total else 0.0,
+        })
+
+    data = {
+        "course_id": course.id,
+        "students": students,
+    }
+    if detail:
+        data["completions"] = completion_rows(course.id)
+    return JsonResponse(data, status=200)
+
+@apiv1.get("/my-progress/", auth=apiAuth)
+def my_progress(request):
+    progress = (CourseProgress.objects
+                .filter(student_id=request.user.id)
+                .order_by("course_id")
+                .values("course_id", "course__name", "completed_count", "total_contents",
+                        "last_completed_at"))
+    return JsonResponse({
+        "progress": [{
+            "course_id": row["course_id"],
+            "course_name": row["course__name"],
+            "completed": row["completed_count"],
+            "total": row["total_contents"],
+            "percentage": round(row["completed_count"] * 100 / row["total_contents"], 2)
+            if row["total_contents"] else 0.0,
+            "last_completed_at": row["last_completed_at"],
+        } for row in progress]
     }, status=200)
 
 @apiv1.delete("/delete-completion/", auth=apiAuth)
@@ -388,7 +582,11 @@ def delete_completion(request, student_id: int, content_id: int):
     if not completion:
         return JsonResponse({"error": "Completion not found for this student and content."}, status=404)
 
-    completion.delete()
+    with transaction.atomic():
+        # a concurrent delete of the same row must not take it off the progress twice
+        deleted, _ = CompletionTracking.objects.filter(pk=completion.pk).delete()
+        if deleted and completion.completed:
+            remove_completion(student.id, completion.content)
     
     return JsonResponse({"message": "Completion successfully deleted."}, status=200)
 
@@ -404,6 +602,9 @@ def update_course_content(request, content_id: int, data: CourseContentUpdateSch
         course_content.video_url = data.video_url
     if data.file_attachment is not None:
         course_content.file_attachment = data.file_attachment
+        # size and digest described the previous file
+        course_content.file_size = None
+        course_content.file_sha256 = ''
     if data.course_id is not None:
         course_content.course_id = get_object_or_404(Course, id=data.course_id)
     if data.parent_id is not None:
@@ -422,13 +623,19 @@ def update_course_content(request, content_id: int, data: CourseContentUpdateSch
 def publish_content(request, content_id: int, data: PublishContentSchema):
     course_content = get_object_or_404(CourseContent, id=content_id)
 
-    user = get_object_or_404(User, username=data.username)
+    identity = identity_for_username(data.username, fresh=True)
+    if identity is None:
+        raise Http404("No User matches the given query.")
     
-    if user != course_content.teacher:
+    if identity.user_id != course_content.teacher_id:
         return JsonResponse({"message": "You are not authorized to perform this action."}, status=403)
 
-    course_content.is_published = data.is_published
-    course_content.save()
+    with transaction.atomic():
+        changed = course_content.is_published != data.is_published
+        course_content.is_published = data.is_published
+        course_content.save()
+        if changed:
+            content_published_changed(course_content, data.is_published)
 
     return JsonResponse({
         "message": "Course content publication status updated successfully",
@@ -436,28 +643,24 @@ def publish_content(request, content_id: int, data: PublishContentSchema):
     }, status=200)
 
 
+def course_contents(course_id, is_teacher):
+    # teachers also see the unpublished contents
+    contents = CourseContent.objects.filter(course_id=course_id)
+    return contents if is_teacher else contents.filter(is_published=True)
+
 @apiv1.post("/course-content/{course_id}/", auth=apiAuth)
 def get_course_content(request, course_id: int, data: GetCourseContentSchema):
-    username = data.username
-    
-    try:
-        user = User.objects.get(username=username)
-    except User.DoesNotExist:
-        return JsonResponse({"message": "User not found"}, status=404)
-
-    try:
-        profile = Profile.objects.get(user=user)
-        is_teacher = profile.role == 'teacher'  
-    except Profile.DoesNotExist:
-        is_teacher = False
-
-    if is_teacher:
-        course_contents = CourseContent.objects.filter(course_id=course_id)
+    claims = request.auth_claims
+    if data.username == claims.username:
+        is_teacher = claims.is_teacher
     else:
-        course_contents = CourseContent.objects.filter(course_id=course_id, is_published=True)
+        identity = identity_for_username(data.username, fresh=True)
+        if identity is None:
+            return JsonResponse({"message": "User not found"}, status=404)
+        is_teacher = identity.is_teacher
 
     contents_data = []
-    for content in course_contents:
+    for content in course_contents(course_id, is_teacher):
         contents_data.append({
             "name": content.name,
             "description": content.description,
@@ -470,3 +673,58 @@ def get_course_content(request, course_id: int, data: GetCourseContentSchema):
         "message": "Course content fetched successfully",
         "contents": contents_data
     }, status=200)
+
+
+# Attachments
+# Large files are uploaded in chunks and downloaded with Range support, see
+# lms_core.attachments.
+
+def upload_error(error):
+    body = {"error": error.message}
+    if error.upload is not None:
+        body["offset"] = error.upload.offset
+    response = JsonResponse(body, status=error.status)
+    if error.status == 416:
+        response['Content-Range'] = f'bytes */{error.size}'
+    return response
+
+@apiv1.post("/contents/{content_id}/uploads", auth=apiAuth, response={201: UploadOut})
+def create_upload(request, content_id: int, data: UploadStartIn):
+    content = get_object_or_404(CourseContent.objects.select_related('course_id'), id=content_id)
+    if request.user.id not in (content.teacher_id, content.course_id.teacher_id):
+        return JsonResponse({"error": "Only the teacher can upload attachments"}, status=403)
+    try:
+        upload = start_upload(content, request.user.id, data.filename, data.size, data.sha256)
+    except UploadError as error:
+        return upload_error(error)
+    return 201, upload
+
+@apiv1.get("/uploads/{upload_id}", auth=apiAuth, response=UploadOut)
+def upload_status(request, upload_id: UUID):
+    # clients resume an interrupted upload from the offset returned here
+    return get_object_or_404(AttachmentUpload, id=upload_id, uploaded_by_id=request.user.id)
+
+@apiv1.put("/uploads/{upload_id}", auth=apiAuth, response=UploadOut)
+def upload_chunk(request, upload_id: UUID, offset: int):
+    # the raw request body is the chunk, written at `offset`
+    if not AttachmentUpload.objects.filter(id=upload_id, uploaded_by_id=request.user.id).exists():
+        raise Http404("No AttachmentUpload matches the given query.")
+    length = request.META.get('CONTENT_LENGTH')
+    try:
+        return write_chunk(upload_id, offset, request, int(length) if length else None,
+                           request.headers.get('X-Chunk-SHA256'))
+    except UploadError as error:
+        return upload_error(error)
+
+@apiv1.get("/contents/{content_id}/attachment", auth=apiAuth)
+def download_attachment(request, content_id: int):
+    content = get_object_or_404(CourseContent.objects.select_related('course_id'), id=content_id)
+    is_teacher = request.user.id in (content.teacher_id, content.course_id.teacher_id)
+    if not is_teacher and not (content.is_published and request.auth_claims.is_member(content.course_id_id)):
+        return JsonResponse({"error": "You are not authorized to download this attachment"}, status=403)
+    if not content.file_attachment:
+        raise Http404("This content has no attachment.")
+    try:
+        return attachment_response(request, content)
+    except UploadError as error:
+        return upload_error(error)
@@ -0,0 +1,285 @@
+import base64
+import glob
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from lms_core.models import AttachmentUpload, CourseContent
+from lms_core.taskqueue import enqueue
+
+# Large CourseContent attachments are uploaded in chunks: the client creates
+# an upload with the file's size and SHA-256, then PUTs the bytes in order,
+# each chunk at the offset the server reports (so an interrupted upload
+# resumes where it stopped). Chunks are streamed to disk in LMS_UPLOAD_DIR,
+# never held in memory, and appended to the partial file. Once every byte
+# arrived a queued task checks the SHA-256 and moves the file into storage.
+# Uploads without a chunk for LMS_UPLOAD_EXPIRY seconds are given up.
+#
+# Downloads answer Range requests and carry the SHA-256 as ETag and
+# Repr-Digest, so clients can resume and verify what they received.
+
+READ_SIZE = 64 * 1024
+SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+def chunk_size():
+    return getattr(settings, 'LMS_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+
+
+def max_size():
+    return getattr(settings, 'LMS_UPLOAD_MAX_SIZE', 2 * 1024 ** 3)
+
+
+def upload_expiry():
+    return getattr(settings, 'LMS_UPLOAD_EXPIRY', 24 * 3600)
+
+
+class UploadError(Exception):
+
+    def __init__(self, status, message, upload=None, size=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.upload = upload
+        # file size for a 416 Content-Range
+        self.size = size
+
+
+def partial_path(upload):
+    return os.path.join(settings.LMS_UPLOAD_DIR, f'{upload.pk}.part')
+
+
+def start_upload(content, user_id, filename, size, sha256):
+    sha256 = sha256.lower()
+    if not SHA256.match(sha256):
+        raise UploadError(400, "sha256 must be 64 hex digits")
+    if size < 0 or size > max_size():
+        raise UploadError(400, f"size must be between 0 and {max_size()} bytes")
+    filename = get_valid_filename(os.path.basename(filename))
+    with transaction.atomic():
+        upload = AttachmentUpload.objects.create(content=content, uploaded_by_id=user_id, filename=filename,
+                                                 size=size, sha256=sha256)
+        os.makedirs(settings.LMS_UPLOAD_DIR, exist_ok=True)
+        open(partial_path(upload), 'wb').close()
+        if size == 0:
+            _received_all(upload)
+        enqueue('uploads.expire', dedup_key='uploads:expire', delay=upload_expiry())
+    return upload
+
+
+def _received_all(upload):
+    upload.status = 'verifying'
+    upload.save(update_fields=['status', 'updated_at'])
+    enqueue('uploads.finalize', {'upload_id': str(upload.pk)}, dedup_key=f'upload:{upload.pk}')
+
+
+def _check_chunk(upload, offset, length):
+    if upload.status != 'uploading':
+        raise UploadError(409, f"Upload is {upload.status}", upload)
+    if offset != upload.offset:
+        raise UploadError(409, f"Expected offset {upload.offset}", upload)
+    if length is None or length <= 0 or length > chunk_size():
+        raise UploadError(400, f"Each chunk needs a Content-Length of 1 to {chunk_size()} bytes", upload)
+    if offset + length > upload.size:
+        raise UploadError(400, "Chunk goes past the declared size", upload)
+
+
+def _receive(stream, path, length, chunk_sha256):
+    # stream `length` bytes from the client into `path`
+    digest = hashlib.sha256()
+    received = 0
+    with open(path, 'wb') as chunk:
+        while received < length:
+            data = stream.read(min(READ_SIZE, length - received))
+            if not data:
+                break
+            chunk.write(data)
+            digest.update(data)
+            received += len(data)
+    if received != length:
+        raise UploadError(400, "Chunk is shorter than its Content-Length")
+    if chunk_sha256 and digest.hexdigest() != chunk_sha256.lower():
+        raise UploadError(400, "Chunk checksum mismatch")
+
+
+def write_chunk(upload_id, offset, stream, length, chunk_sha256=None):
+    # append `length` bytes read from `stream` at `offset`, returns the upload
+    upload = AttachmentUpload.objects.filter(pk=upload_id).first()
+    if upload is None:
+        raise UploadError(404, "Upload not found")
+    _check_chunk(upload, offset, length)
+
+    # The client may be slow: the chunk is received into a file of its own
+    # first, and only appended under the row lock if the upload is still
+    # where it was (another request may have sent the same chunk meanwhile).
+    path = os.path.join(settings.LMS_UPLOAD_DIR, f'{upload.pk}.{uuid.uuid4().hex}.chunk')
+    try:
+        try:
+            _receive(stream, path, length, chunk_sha256)
+        except UploadError as error:
+            error.upload = upload
+            raise
+        with transaction.atomic():
+            upload = AttachmentUpload.objects.select_for_update().get(pk=upload_id)
+            _check_chunk(upload, offset, length)
+            with open(partial_path(upload), 'r+b') as partial, open(path, 'rb') as chunk:
+                partial.seek(offset)
+                shutil.copyfileobj(chunk, partial, READ_SIZE)
+                # drop bytes left over from an earlier, interrupted append
+                partial.truncate()
+            upload.offset += length
+            upload.save(update_fields=['offset', 'updated_at'])
+            if upload.offset == upload.size:
+                _received_all(upload)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    return upload
+
+
+def _remove_files(upload):
+    # the partial file and chunks left by interrupted requests
+    for path in glob.glob(os.path.join(settings.LMS_UPLOAD_DIR, f'{upload.pk}.*')):
+        os.remove(path)
+
+
+def expire_uploads():
+    # fail uploads that received nothing for LMS_UPLOAD_EXPIRY seconds and
+    # remove their files; runs again while any upload is in progress
+    now = timezone.now()
+    expired_before = now - timedelta(seconds=upload_expiry())
+    with transaction.atomic():
+        expired = list(AttachmentUpload.objects.select_for_update(skip_locked=True)
+                       .filter(status='uploading', updated_at__lt=expired_before))
+        for upload in expired:
+            _remove_files(upload)
+        AttachmentUpload.objects.filter(pk__in=[upload.pk for upload in expired]).update(
+            status='failed', error="Upload expired", updated_at=now)
+
+    oldest = (AttachmentUpload.objects.filter(status='uploading').order_by('updated_at')
+              .values_list('updated_at', flat=True).first())
+    if oldest is not None:
+        delay = max((oldest - expired_before).total_seconds(), 60)
+        enqueue('uploads.expire', dedup_key='uploads:expire', delay=delay)
+    return len(expired)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for data in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def finalize_upload(upload_id):
+    upload = AttachmentUpload.objects.filter(pk=upload_id).first()
+    if upload is None or upload.status != 'verifying':
+        return None
+    path = partial_path(upload)
+    if file_sha256(path) != upload.sha256:
+        os.remove(path)
+        upload.status, upload.error = 'failed', "SHA-256 of the received file does not match"
+        upload.save(update_fields=['status', 'error', 'updated_at'])
+        return upload
+
+    with open(path, 'rb') as source:
+        name = default_storage.save(f'attachments/{upload.content_id}/{upload.filename}', File(source))
+    with transaction.atomic():
+        content = CourseContent.objects.select_for_update().get(pk=upload.content_id)
+        previous = content.file_attachment.name
+        content.file_attachment = name
+        content.file_size = upload.size
+        content.file_sha256 = upload.sha256
+        content.save(update_fields=['file_attachment', 'file_size', 'file_sha256', 'updated_at'])
+        upload.status = 'complete'
+        upload.save(update_fields=['status', 'updated_at'])
+    os.remove(path)
+    # the replaced attachment (storage.save() never overwrites, names differ)
+    if previous and previous != name:
+        default_storage.delete(previous)
+    return upload
+
+
+def parse_range(header, size):
+    # (start, end) inclusive for a single `bytes=` range, None to send the
+    # whole file (no or multiple ranges), UploadError(416) if unsatisfiable
+    match = re.fullmatch(r'\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*', header or '')
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if length == 0 or size == 0:
+            raise UploadError(416, "Range not satisfiable", size=size)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise UploadError(416, "Range not satisfiable", size=size)
+    return start, end
+
+
+class RangeFile:
+    # `length` bytes of `file` from `start`; no fileno(), so servers iterate
+    # it instead of sending the whole file with sendfile()
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def attachment_response(request, content):
+    fieldfile = content.file_attachment
+    size = fieldfile.size
+    filename = os.path.basename(fieldfile.name)
+    # the stored digest only describes the file it was computed for
+    sha256 = content.file_sha256 if content.file_size == size else ''
+    etag = f'"{sha256}"' if sha256 else None
+
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if byte_range is not None and if_range is not None and if_range != etag:
+        # the client's partial copy is of another version, send it all
+        byte_range = None
+
+    source = fieldfile.storage.open(fieldfile.name, 'rb')
+    if byte_range is None:
+        # a real file: servers can hand it to sendfile() through wsgi.file_wrapper
+        response = FileResponse(source, as_attachment=True, filename=filename)
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        response = FileResponse(RangeFile(source, start, end - start + 1), status=206,
+                                as_attachment=True, filename=filename)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+        digest = base64.b64encode(bytes.fromhex(sha256)).decode()
+        response['Repr-Digest'] = f'sha-256=:{digest}:'
+    return response
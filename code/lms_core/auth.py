@@ -0,0 +1,67 @@
+from django.conf import settings
+from ninja_simple_jwt.auth.ninja_auth import HttpJwtAuth
+
+from lms_core.claims import claims_stale
+from lms_core.identity import identity_for_user_id
+from lms_core.membership import is_member
+
+
+CLAIMS_DB_FALLBACK = getattr(settings, 'LMS_AUTH_CLAIMS_DB_FALLBACK', True)
+
+
+class AuthClaims:
+    # Role and enrolled courses as carried by the access token. While the
+    # claims are fresh every check is answered from the token; once the user's
+    # role or memberships changed after they were issued (or the token has
+    # none) the checks go to the database, unless the fallback is disabled.
+
+    def __init__(self, user_id, username=None, role=None, courses=None, claims_at=None,
+                 db_fallback=None):
+        self.user_id = user_id
+        self.username = username
+        self._role = role
+        self._courses = None if courses is None else frozenset(courses)
+        self.claims_at = claims_at
+        self.db_fallback = CLAIMS_DB_FALLBACK if db_fallback is None else db_fallback
+        self._stale = None
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id,
+                   username=getattr(user, 'username', None),
+                   role=getattr(user, 'role', None),
+                   courses=getattr(user, 'courses', None),
+                   claims_at=getattr(user, 'claims_at', None))
+
+    @property
+    def stale(self):
+        if self._stale is None:
+            self._stale = claims_stale(self.user_id, self.claims_at)
+        return self._stale
+
+    def _use_token(self):
+        return not self.db_fallback or (self.claims_at is not None and not self.stale)
+
+    @property
+    def role(self):
+        if self._use_token():
+            return self._role
+        identity = identity_for_user_id(self.user_id, fresh=True)
+        return identity.role if identity else None
+
+    @property
+    def is_teacher(self):
+        return self.role == 'teacher'
+
+    def is_member(self, course_id):
+        if self._courses is not None and self._use_token():
+            return course_id in self._courses
+        return is_member(course_id, self.user_id)
+
+
+class ClaimsJwtAuth(HttpJwtAuth):
+
+    def authenticate(self, request, token):
+        authenticated = super().authenticate(request, token)
+        request.auth_claims = AuthClaims.from_user(request.user)
+        return authenticated
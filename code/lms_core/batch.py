@@ -0,0 +1,118 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from lms_core.claims import touch_claims_many
+from lms_core.models import Course, CourseMember, CourseContent, CompletionTracking, CourseProgress
+from lms_core.progress import ensure_progress_many
+
+
+# Batch versions of enroll and add-completion: every lookup is one IN query
+# for the whole batch, the writes are a single bulk_create, and the result
+# has one entry per submitted item, in order. Only the teacher of a course
+# (or staff, teacher_id=None) may enroll into it or complete its contents,
+# other items get the `forbidden` status.
+
+def _user_ids(usernames):
+    return dict(User.objects.filter(username__in=set(usernames)).values_list('username', 'id'))
+
+
+def enroll_many(items, teacher_id=None):
+    # items: [(username, course_id)]
+    user_ids = _user_ids(username for username, _ in items)
+    teachers = dict(Course.objects.filter(id__in={course_id for _, course_id in items})
+                    .values_list('id', 'teacher_id'))
+    course_ids = {course_id for course_id, teacher in teachers.items()
+                  if teacher_id is None or teacher == teacher_id}
+    enrolled = set(CourseMember.objects.filter(user_id__in=user_ids.values(), course_id__in=course_ids)
+                   .values_list('user_id', 'course_id'))
+
+    results, members = [], {}
+    for username, course_id in items:
+        result = {'username': username, 'course_id': course_id}
+        user_id = user_ids.get(username)
+        if user_id is None:
+            result['status'] = 'user_not_found'
+        elif course_id not in teachers:
+            result['status'] = 'course_not_found'
+        elif course_id not in course_ids:
+            result['status'] = 'forbidden'
+        elif (user_id, course_id) in enrolled or (user_id, course_id) in members:
+            result['status'] = 'already_enrolled'
+        else:
+            result['status'] = 'enrolled'
+            members[(user_id, course_id)] = CourseMember(user_id_id=user_id, course_id_id=course_id,
+                                                         roles='std')
+        results.append(result)
+
+    with transaction.atomic():
+        # a concurrent single enroll of the same pair only touches updated_at
+        CourseMember.objects.bulk_create(members.values(), batch_size=1000, update_conflicts=True,
+                                         unique_fields=['course_id', 'user_id'],
+                                         update_fields=['updated_at'])
+        ensure_progress_many(members.keys())
+    touch_claims_many(user_id for user_id, _ in members)
+    return results
+
+
+def complete_many(items, teacher_id=None):
+    # items: [(student_username, content_id)]
+    user_ids = _user_ids(username for username, _ in items)
+    contents = {row['id']: row for row in
+                CourseContent.objects.filter(id__in={content_id for _, content_id in items})
+                .values('id', 'course_id', 'course_id__teacher_id', 'is_published')}
+
+    now = timezone.now()
+    results, pending = [], {}
+    for username, content_id in items:
+        result = {'student_username': username, 'content_id': content_id}
+        student_id = user_ids.get(username)
+        content = contents.get(content_id)
+        if student_id is None:
+            result['status'] = 'user_not_found'
+        elif content is None:
+            result['status'] = 'content_not_found'
+        elif teacher_id is not None and content['course_id__teacher_id'] != teacher_id:
+            result['status'] = 'forbidden'
+        elif (student_id, content_id) in pending:
+            result['status'] = 'already_completed'
+        else:
+            pending[(student_id, content_id)] = result
+        results.append(result)
+
+    newly = Counter()
+    with transaction.atomic():
+        # every pair gets a row first, so all of them can be locked and a
+        # concurrent /add-completion/ either finished before or waits for us
+        CompletionTracking.objects.bulk_create(
+            [CompletionTracking(student_id=student_id, content_id=content_id, completed=False)
+             for student_id, content_id in pending], batch_size=1000, ignore_conflicts=True)
+        rows = (CompletionTracking.objects.select_for_update()
+                .filter(student_id__in={student_id for student_id, _ in pending},
+                        content_id__in={content_id for _, content_id in pending})
+                .values_list('id', 'student_id', 'content_id', 'completed'))
+        completing = []
+        for pk, student_id, content_id, completed in rows:
+            result = pending.get((student_id, content_id))
+            if result is None:
+                continue
+            if completed:
+                result['status'] = 'already_completed'
+                continue
+            result['status'] = 'completed'
+            result['completed_at'] = now
+            completing.append(pk)
+            if contents[content_id]['is_published']:
+                newly[(student_id, contents[content_id]['course_id'])] += 1
+        CompletionTracking.objects.filter(id__in=completing).update(completed=True, completed_at=now)
+        # rows created here already count the new completions
+        created = ensure_progress_many(newly.keys())
+        for (student_id, course_id), count in newly.items():
+            if (student_id, course_id) in created:
+                continue
+            CourseProgress.objects.filter(student_id=student_id, course_id=course_id).update(
+                completed_count=F('completed_count') + count, last_completed_at=now)
+    return results
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from functools import partial, wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+
+CACHE_TIMEOUT = getattr(settings, 'LMS_CACHE_TIMEOUT', 300)
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 5
+LOCK_POLL = 0.05
+
+CATALOGUE = 'catalogue'
+CONTENTS = 'contents'
+RATINGS = 'ratings'
+
+
+def cache_version(name):
+    return cache.get_or_set(f'lms:{name}:version', time.time_ns, None)
+
+
+async def acache_version(name):
+    return await cache.aget_or_set(f'lms:{name}:version', time.time_ns, None)
+
+
+def version_changed_at(name):
+    # when the group version last moved (epoch seconds), for Last-Modified
+    return cache.get_or_set(f'lms:{name}:changed', time.time, None)
+
+
+async def aversion_changed_at(name):
+    return await cache.aget_or_set(f'lms:{name}:changed', time.time, None)
+
+
+def bump_version(name):
+    # Every cached key of a group embeds the group version, so bumping it
+    # invalidates all of them at once, on every process sharing the cache.
+    try:
+        cache.incr(f'lms:{name}:version')
+    except ValueError:
+        cache.set(f'lms:{name}:version', time.time_ns(), None)
+    cache.set(f'lms:{name}:changed', time.time(), None)
+
+
+def invalidate(name):
+    # Bump right away for this request and again after commit, so a reader
+    # that rebuilt the cache before the transaction committed is not kept.
+    bump_version(name)
+    transaction.on_commit(partial(bump_version, name))
+
+
+def course_group(name, course_id):
+    # a group versioned per course, so writes to one course leave the cached
+    # keys of every other course alone
+    return f'{name}:{course_id}'
+
+
+def per_course(name):
+    # a course_group() resolved from the course_id argument of the view, for
+    # cached_response() and conditional()
+    def group(course_id, **kwargs):
+        return course_group(name, course_id)
+    return group
+
+
+def group_names(groups, kwargs):
+    return [group(**kwargs) if callable(group) else group for group in groups]
+
+
+def catalogue_version():
+    return cache_version(CATALOGUE)
+
+
+def invalidate_catalogue():
+    invalidate(CATALOGUE)
+
+
+def get_or_build(key, build, timeout=CACHE_TIMEOUT):
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    # Only the worker holding the lock rebuilds an expired key, the others
+    # wait for its result instead of all hitting the database at once.
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = build()
+            if value is not None:
+                cache.set(key, value, timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return build()
+
+
+async def aget_or_build(key, build, timeout=CACHE_TIMEOUT):
+    # get_or_build() for async views, `build` is a coroutine function
+    value = await cache.aget(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    if await cache.aadd(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = await build()
+            if value is not None:
+                await cache.aset(key, value, timeout)
+            return value
+        finally:
+            await cache.adelete(lock_key)
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL)
+        value = await cache.aget(key)
+        if value is not None:
+            return value
+    return await build()
+
+
+# Key functions get the current version of the cached_response() groups.
+
+def course_list_key(request, version, **kwargs):
+    query = urlencode(sorted(request.GET.items()))
+    return f'lms:courses:{version}:{request.path}?{query}'
+
+
+def course_detail_key(request, version, course_id, **kwargs):
+    query = urlencode(sorted(request.GET.items()))
+    return f'lms:course:{version}:{course_id}?{query}'
+
+
+def cached_response(key_func, groups=(CATALOGUE,), timeout=CACHE_TIMEOUT):
+    # View decorator for use with ninja's @decorate_view: caches the rendered
+    # body of successful responses so hits skip the database and serialization.
+    def cacheable(response):
+        if response.status_code != 200 or getattr(response, 'streaming', False):
+            return None
+        return (response.content, response['Content-Type'])
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                responses = {}
+
+                async def build():
+                    response = responses['response'] = await view(request, *args, **kwargs)
+                    return cacheable(response)
+
+                versions = [await acache_version(name) for name in group_names(groups, kwargs)]
+                key = key_func(request, '.'.join(map(str, versions)), *args, **kwargs)
+                cached = await aget_or_build(key, build, timeout)
+                if 'response' in responses:
+                    return responses['response']
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            responses = {}
+
+            def build():
+                response = responses['response'] = view(request, *args, **kwargs)
+                return cacheable(response)
+
+            versions = [cache_version(name) for name in group_names(groups, kwargs)]
+            key = key_func(request, '.'.join(map(str, versions)), *args, **kwargs)
+            cached = get_or_build(key, build, timeout)
+            if 'response' in responses:
+                return responses['response']
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        return wrapper
+    return decorator
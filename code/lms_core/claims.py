@@ -0,0 +1,77 @@
+import time
+
+# Extra JWT claims issued at sign-in (see NINJA_SIMPLE_JWT in settings). This
+# module is imported by the settings, so models and the cache are imported
+# lazily inside the functions.
+
+MAX_TOKEN_COURSES = 200
+
+
+def _settings():
+    from django.conf import settings
+    return settings
+
+
+def token_role(user):
+    from lms_core.models import Profile
+    return Profile.objects.filter(user_id=user.pk).values_list('role', flat=True).first()
+
+
+def token_courses(user):
+    # enrolled course ids, or None when there are too many to carry in a token
+    from lms_core.models import CourseMember
+    limit = getattr(_settings(), 'LMS_TOKEN_MAX_COURSES', MAX_TOKEN_COURSES)
+    course_ids = sorted(set(CourseMember.objects.filter(user_id=user.pk)
+                            .values_list('course_id', flat=True)))
+    return course_ids if len(course_ids) <= limit else None
+
+
+def token_claims_at(user):
+    # copied as-is into access tokens minted from a refresh token, so it dates
+    # the role/courses claims rather than the token itself
+    return time.time()
+
+
+# The time a user's role or memberships last changed is stored in
+# ClaimsStamp, so every process (and a restarted one) sees it. The cache only
+# keeps it for LMS_CLAIMS_CHECK_TTL seconds, which is how long another process
+# may still trust older claims when the cache is not shared.
+
+CLAIMS_CHECK_TTL = 10
+
+
+def _stamp_key(user_id):
+    return f'lms:claims:{user_id}'
+
+
+def _check_ttl():
+    return getattr(_settings(), 'LMS_CLAIMS_CHECK_TTL', CLAIMS_CHECK_TTL)
+
+
+def touch_claims_many(user_ids):
+    # role or memberships of the users changed: tokens issued before now are stale
+    from django.core.cache import cache
+    from lms_core.models import ClaimsStamp
+    changed_at = time.time()
+    user_ids = set(user_ids)
+    ClaimsStamp.objects.bulk_create([ClaimsStamp(user_id=user_id, changed_at=changed_at) for user_id in user_ids],
+                                    batch_size=1000, update_conflicts=True, unique_fields=['user_id'],
+                                    update_fields=['changed_at'])
+    cache.set_many({_stamp_key(user_id): changed_at for user_id in user_ids}, _check_ttl())
+
+
+def touch_claims(user_id):
+    touch_claims_many([user_id])
+
+
+def claims_stale(user_id, claims_at):
+    from django.core.cache import cache
+    from lms_core.models import ClaimsStamp
+    if claims_at is None:
+        return True
+    changed = cache.get(_stamp_key(user_id))
+    if changed is None:
+        # 0 marks a user without changes, so the lookup is cached as well
+        changed = ClaimsStamp.objects.filter(user_id=user_id).values_list('changed_at', flat=True).first() or 0
+        cache.set(_stamp_key(user_id), changed, _check_ttl())
+    return claims_at <= changed
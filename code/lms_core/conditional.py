@@ -0,0 +1,83 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from lms_core.cache import acache_version, aversion_changed_at, cache_version, group_names, version_changed_at
+
+
+# Conditional GETs for ninja's @decorate_view. Every write that changes these
+# responses already bumps a cache group version (see signals.py), so the
+# validators come from the cache alone: a matching If-None-Match /
+# If-Modified-Since is answered with 304 before the view runs, without a
+# database query. The ETag covers the path, the query string (pages, sparse
+# fields, format) and the group versions. Last-Modified is the last time any of
+# the groups moved and only has one second resolution, so clients should
+# prefer the ETag.
+#
+# The versions are only bumped in the cache of the process that handled the
+# write, so the validators are only sent when that cache is shared by every
+# process (LMS_CONDITIONAL_GET overrides the check). A group may also be a
+# per_course() group, resolved from the view's course_id.
+
+LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',
+                'django.core.cache.backends.dummy.DummyCache')
+
+
+def conditional_enabled():
+    enabled = getattr(settings, 'LMS_CONDITIONAL_GET', None)
+    if enabled is None:
+        return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHES
+    return enabled
+
+
+def conditional(*groups):
+    # Django's @condition calls the validator functions synchronously, which
+    # would block the event loop of async views on the cache, so the async
+    # path reads the versions with the cache's async API instead.
+    def check(request, versions, changed_at):
+        query = urlencode(sorted(request.GET.items()))
+        data = '|'.join(str(part) for part in (request.path, query, *versions))
+        etag = quote_etag(hashlib.md5(data.encode(), usedforsecurity=False).hexdigest())
+        last_modified = int(changed_at)
+        return etag, last_modified, get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    def finish(request, response, etag, last_modified):
+        if request.method in ('GET', 'HEAD'):
+            if not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(last_modified)
+            response.headers.setdefault('ETag', etag)
+        return response
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not conditional_enabled():
+                    return await view(request, *args, **kwargs)
+                names = group_names(groups, kwargs)
+                versions = [await acache_version(name) for name in names]
+                changed_at = max([await aversion_changed_at(name) for name in names])
+                etag, last_modified, response = check(request, versions, changed_at)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return finish(request, response, etag, last_modified)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not conditional_enabled():
+                return view(request, *args, **kwargs)
+            names = group_names(groups, kwargs)
+            versions = [cache_version(name) for name in names]
+            changed_at = max(version_changed_at(name) for name in names)
+            etag, last_modified, response = check(request, versions, changed_at)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return finish(request, response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,286 @@
+import inspect
+from functools import wraps
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist
+from django.http import HttpResponseBase
+from ninja import Schema
+from ninja.errors import ValidationError
+
+from lms_core.models import Course, CourseMember, CourseContent, Comment
+from lms_core.renderers import JsonResponse
+from lms_core.schema import CourseDetailOut, CourseMemberOut, CourseContentMini, CourseContentFull
+from lms_core.schema import CommentListOut, CourseSchemaOut, UserOut
+
+
+# Sparse fieldsets: `?fields=id,name,price` limits the output to those fields
+# and `?expand=teacher` adds nested objects, which are left out otherwise.
+# Without either parameter the endpoint answers with its full schema. The
+# queryset gets the matching select_related()/only(), so the SQL reads the
+# same columns the response contains.
+#
+# `?format=normalized` (list endpoints with `included` relations) replaces
+# nested objects by their id and side-loads each referenced object once in
+# an `included` map, fetched with one in_bulk() per type.
+
+def _is_nested(annotation):
+    return isinstance(annotation, type) and issubclass(annotation, Schema)
+
+
+def _relation(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field if field.is_relation else None
+
+
+def _columns(schema, model, prefix=''):
+    # only() paths needed to fill `schema` from `model`, None when unknown
+    paths = []
+    for name, info in schema.model_fields.items():
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if field.is_relation and _is_nested(info.annotation):
+            nested = _columns(info.annotation, field.related_model, f'{prefix}{name}__')
+            paths.extend(nested if nested is not None else [f'{prefix}{name}'])
+        else:
+            paths.append(f'{prefix}{name}')
+    return paths
+
+
+def _select_related(model, path):
+    # longest prefix of `path` that walks through relations
+    names, related = path.split('__'), []
+    for name in names:
+        field = _relation(model, name)
+        if field is None:
+            break
+        related.append(name)
+        model = field.related_model
+    return '__'.join(related)
+
+
+_subsets = {}
+
+
+def subset_schema(schema, names, ids=None):
+    # `schema` restricted to `names`; fields in `ids` (name -> attname) become
+    # the raw foreign key value
+    ids = ids or {}
+    key = (schema, names, tuple(sorted(ids.items())))
+    subset = _subsets.get(key)
+    if subset is None:
+        namespace = {'__annotations__': {}, '__module__': __name__}
+        for name in names:
+            info = schema.model_fields[name]
+            if name in ids:
+                namespace['__annotations__'][name] = Optional[int]
+                namespace[f'resolve_{name}'] = _foreign_key_resolver(ids[name])
+                continue
+            namespace['__annotations__'][name] = info.annotation
+            namespace[name] = info
+            resolver = f'resolve_{name}'
+            if hasattr(schema, resolver):
+                namespace[resolver] = inspect.getattr_static(schema, resolver)
+        subset = _subsets[key] = type(f'{schema.__name__}Sparse', (Schema,), namespace)
+    return subset
+
+
+def _foreign_key_resolver(attname):
+    return staticmethod(lambda obj: getattr(obj, attname))
+
+
+class IncludedType:
+    # A model that normalized responses side-load once per id instead of
+    # nesting it in every item. `refs` are its own relations to other types.
+
+    def __init__(self, model, schema, refs=None):
+        self.model = model
+        self.schema = schema
+        self.refs = refs or {}
+        names = tuple(schema.model_fields)
+        self.attnames = {name: model._meta.get_field(name).attname for name in self.refs}
+        self.output = subset_schema(schema, names, self.attnames)
+        self.columns = names
+
+    def fetch(self, ids):
+        return self.model.objects.only(*self.columns).in_bulk(ids)
+
+
+INCLUDED_TYPES = {
+    'courses': IncludedType(Course, CourseSchemaOut, refs={'teacher': 'users'}),
+    'users': IncludedType(User, UserOut),
+}
+
+
+def side_load(pending, fetch=None):
+    # pending: {type: ids}. Types are resolved in INCLUDED_TYPES order, where a
+    # type only refers to types after it, so each is fetched with one in_bulk()
+    fetch = fetch or (lambda kind, ids: INCLUDED_TYPES[kind].fetch(ids))
+    pending = {kind: set(ids) for kind, ids in pending.items()}
+    included = {}
+    for kind, included_type in INCLUDED_TYPES.items():
+        if kind not in pending:
+            continue
+        objs = included[kind] = {}
+        ids = pending[kind]
+        for pk, obj in (fetch(kind, ids).items() if ids else ()):
+            objs[str(pk)] = included_type.output.model_validate(obj).model_dump()
+            for name, ref in included_type.refs.items():
+                ref_id = getattr(obj, included_type.attnames[name])
+                if ref_id is not None:
+                    pending.setdefault(ref, set()).add(ref_id)
+    return included
+
+
+class FieldSet:
+
+    def __init__(self, schema, model, computed=None, included=None):
+        self.schema = schema
+        self.model = model
+        # output fields filled by a resolver: name -> only() paths they read
+        self.computed = computed or {}
+        # relations that ?format=normalized side-loads: name -> INCLUDED_TYPES key
+        self.included = included or {}
+        self.nested = {name for name, info in schema.model_fields.items() if _is_nested(info.annotation)}
+        self.scalars = [name for name in schema.model_fields if name not in self.nested]
+
+    def selection(self, request):
+        # (output fields in schema order, normalized), fields is None for the full schema
+        cache = request.__dict__.setdefault('_lms_fieldsets', {})
+        if self in cache:
+            return cache[self]
+        fields, expand = request.GET.get('fields'), request.GET.get('expand')
+        normalized = self._parse_format(request.GET.get('format'))
+        selected = None
+        if fields or expand or normalized:
+            if fields:
+                names = self._parse('fields', fields)
+            else:
+                names = set(self.schema.model_fields if normalized else self.scalars)
+            names |= self._parse('expand', expand) if expand else set()
+            selected = tuple(name for name in self.schema.model_fields if name in names)
+        cache[self] = selected, normalized
+        return cache[self]
+
+    def _parse_format(self, value):
+        if value in (None, '', 'nested'):
+            return False
+        if value == 'normalized' and self.included:
+            return True
+        raise ValidationError([{'format': f"Unsupported format: {value}"}])
+
+    def _parse(self, param, value):
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names - set(self.schema.model_fields)
+        if unknown:
+            raise ValidationError([{param: f"Unknown field(s): {', '.join(sorted(unknown))}"}])
+        return names
+
+    def _paths(self, name, normalized):
+        if name in self.computed:
+            return list(self.computed[name])
+        if normalized and name in self.included:
+            # only the foreign key column, the object itself is side-loaded
+            return [name]
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        info = self.schema.model_fields[name]
+        if field.is_relation and _is_nested(info.annotation):
+            return _columns(info.annotation, field.related_model, f'{name}__') or [name]
+        return [name]
+
+    def apply(self, request, queryset, keep=()):
+        selected, normalized = self.selection(request)
+        if selected is None:
+            return queryset
+        paths = set(keep) | {field.lstrip('-') for field in self.model._meta.ordering} | {'id'}
+        for name in selected:
+            needed = self._paths(name, normalized)
+            if needed is None:
+                # nothing known about this field, load every column
+                return queryset
+            paths.update(needed)
+        side_loaded = set(self.included) if normalized else set()
+        related = {_select_related(self.model, path) for path in paths if path not in side_loaded} - {''}
+        queryset = queryset.select_related(None)
+        if related:
+            # select_related() without arguments would follow every foreign key
+            queryset = queryset.select_related(*related)
+        return queryset.only(*paths)
+
+    def serialize(self, request, result):
+        # (data, pending side loads or None) for a sparse or normalized
+        # response, None when ninja should answer with the declared schema
+        selected, normalized = self.selection(request)
+        if selected is None or isinstance(result, HttpResponseBase):
+            return None
+
+        ids = {}
+        if normalized:
+            ids = {name: self.model._meta.get_field(name).attname
+                   for name in selected if name in self.included}
+        schema = subset_schema(self.schema, selected, ids)
+        pending = {self.included[name]: set() for name in ids}
+
+        def dump(obj):
+            for name, attname in ids.items():
+                value = getattr(obj, attname)
+                if value is not None:
+                    pending[self.included[name]].add(value)
+            return schema.model_validate(obj, context={'request': request}).model_dump()
+
+        if isinstance(result, dict) and 'items' in result:
+            data = dict(result, items=[dump(item) for item in result['items']])
+        elif normalized:
+            data = {'item': dump(result)}
+        else:
+            data = dump(result)
+        return data, pending if normalized else None
+
+    def render(self, view):
+        # View decorator, above @paginate: sparse and normalized responses are
+        # serialized here and bypass the declared response schema.
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                result = await view(request, *args, **kwargs)
+                serialized = self.serialize(request, result)
+                if serialized is None:
+                    return result
+                data, pending = serialized
+                if pending is not None:
+                    data['included'] = await sync_to_async(side_load)(pending)
+                return JsonResponse(data, status=200, safe=False)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            result = view(request, *args, **kwargs)
+            serialized = self.serialize(request, result)
+            if serialized is None:
+                return result
+            data, pending = serialized
+            if pending is not None:
+                data['included'] = side_load(pending)
+            return JsonResponse(data, status=200, safe=False)
+        return wrapper
+
+
+COURSE_FIELDS = FieldSet(CourseDetailOut, Course, computed={'rating': ['rating'],
+                                                            'image_variants': ['image', 'image_variants']})
+MEMBER_FIELDS = FieldSet(CourseMemberOut, CourseMember,
+                         included={'course_id': 'courses', 'user_id': 'users'})
+CONTENT_FIELDS = FieldSet(CourseContentMini, CourseContent, included={'course_id': 'courses'})
+CONTENT_DETAIL_FIELDS = FieldSet(CourseContentFull, CourseContent)
+COMMENT_FIELDS = FieldSet(CommentListOut, Comment, computed={
+    'author': ['member_id__user_id__username', 'member_id__user_id__first_name',
+               'member_id__user_id__last_name'],
+})
@@ -0,0 +1,382 @@
+import json
+import random
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from io import StringIO
+from itertools import accumulate
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, models, transaction
+from django.db.models import Max
+
+from lms_core.cache import CONTENTS, invalidate, invalidate_catalogue
+from lms_core.importer import DEFAULT_CHUNK_SIZE, StageResult, chunked, iter_csv, iter_json_array
+from lms_core.importer import _copy_value, reset_sequences
+from lms_core.models import Comment, CompletionTracking, Course, CourseCategory, CourseContent
+from lms_core.models import CourseFeedback, CourseMember, Profile
+from lms_core.progress import rebuild_progress
+from lms_core.ratings import rebuild_ratings
+
+# Synthetic data for load tests, written by `manage.py generate_lms_data`.
+# All randomness comes from one random.Random(seed) and timestamps count back
+# from a fixed base time (EPOCH unless given), so the same sizes and seed give
+# the same rows on every run. Primary keys are assigned up front, after the
+# largest existing ones, so related rows are built from a few arrays instead
+# of reading back what was inserted. Rows are plain tuples streamed in
+# chunks to executemany, or COPY on PostgreSQL: building model instances
+# would cost more than writing them.
+#
+# The data is skewed like a real LMS: course popularity and user activity
+# follow Zipf weights (a few courses hold most members, a few users write
+# most comments), students complete contents in order and mostly drop out
+# early, and ratings cluster around each course's own quality.
+
+ZIPF_EXPONENT = 1.1
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class Sizes:
+    users: int = 10000
+    teachers: int = 200
+    categories: int = 20
+    courses: int = 1000
+    # means, the actual numbers vary per course and per student
+    contents_per_course: int = 30
+    courses_per_student: float = 4.0
+    comments: int = 100000
+    # share of members that rate their course, and of published contents a member completes
+    feedback_rate: float = 0.2
+    completion_rate: float = 0.3
+    # timestamps are spread over this many days before now
+    days: int = 365
+
+
+def load_samples(path):
+    # names and texts to recycle from the bundled csv_data/ export
+    path = Path(path)
+    samples = {'first_names': ['Ani'], 'last_names': ['Budi'], 'courses': [('Course', '-')],
+               'contents': [('Content', '-', None)], 'comments': ['-']}
+    if (path / 'user-data.csv').exists():
+        users = list(iter_csv(path / 'user-data.csv'))
+        samples['first_names'] = [row['firstname'] for row in users]
+        samples['last_names'] = [row['lastname'] for row in users]
+    if (path / 'course-data.csv').exists():
+        samples['courses'] = [(row['name'][:240], row['description'])
+                              for row in iter_csv(path / 'course-data.csv')]
+    if (path / 'contents.json').exists():
+        samples['contents'] = [(row['name'][:200], row['description'], row['video_url'][:200])
+                               for row in iter_json_array(path / 'contents.json')]
+    if (path / 'comments.json').exists():
+        samples['comments'] = [row['comment'] for row in iter_json_array(path / 'comments.json')]
+    return samples
+
+
+def _columns(model, names):
+    fields = [model._meta.get_field(name) for name in names]
+    return fields, ', '.join(connection.ops.quote_name(field.column) for field in fields)
+
+
+def insert_writer(model, names, rows):
+    # one executemany per chunk, only datetimes and JSON need converting
+    fields, columns = _columns(model, names)
+    preps = []
+    for index, field in enumerate(fields):
+        if isinstance(field, models.DateTimeField):
+            # the values are already aware datetimes, skip the field's checks
+            preps.append((index, connection.ops.adapt_datetimefield_value))
+        elif isinstance(field, models.JSONField):
+            preps.append((index, partial(field.get_db_prep_save, connection=connection)))
+    if preps:
+        rows = [list(row) for row in rows]
+        for row in rows:
+            for index, prep in preps:
+                row[index] = prep(row[index])
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) "
+                           f"VALUES ({placeholders})", rows)
+
+
+def copy_writer(model, names, rows):
+    # the keys are new, so rows are copied straight into the table
+    _, columns = _columns(model, names)
+    buffer = StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_value(json.dumps(value) if isinstance(value, dict) else value)
+                              for value in row))
+        buffer.write('\n')
+    copy_sql = (f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) "
+                f"FROM STDIN WITH (FORMAT csv, NULL '\\N')")
+    with connection.cursor() as cursor:
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+WRITERS = {
+    'insert': insert_writer,
+    'copy': copy_writer,
+}
+
+
+def get_writer(backend):
+    # COPY is PostgreSQL only, every other database gets executemany
+    if backend == 'copy' and connection.vendor != 'postgresql':
+        return insert_writer
+    return WRITERS[backend]
+
+
+def _next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def _zipf_cum_weights(rng, count):
+    # cumulative Zipf weights over a shuffled order, so popularity does not follow the pk
+    ranks = list(range(1, count + 1))
+    rng.shuffle(ranks)
+    return array('d', accumulate(1 / rank ** ZIPF_EXPONENT for rank in ranks))
+
+
+class Generator:
+
+    def __init__(self, sizes, seed=0, samples=None, now=None, password='password123'):
+        self.sizes = sizes
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.samples = samples or load_samples(Path(settings.BASE_DIR) / 'csv_data')
+        self.now = now or EPOCH
+        self.password = password
+
+    def _moment(self):
+        # a random time in the generated period
+        return self.now - timedelta(days=self.sizes.days) * self.rng.random()
+
+    def plan(self):
+        # every primary key and the shape of the data, before any row is built
+        sizes, rng = self.sizes, self.rng
+        self.category_pk = _next_pk(CourseCategory)
+        self.user_pk = _next_pk(User)
+        self.profile_pk = _next_pk(Profile)
+        self.course_pk = _next_pk(Course)
+        self.content_pk = _next_pk(CourseContent)
+        self.member_pk = _next_pk(CourseMember)
+        self.comment_pk = _next_pk(Comment)
+        self.feedback_pk = _next_pk(CourseFeedback)
+        self.completion_pk = _next_pk(CompletionTracking)
+        self.teachers = min(sizes.teachers, sizes.users)
+        self.students = sizes.users - self.teachers
+
+        # per course: first content, number of contents, published ones (the first of them)
+        # and the quality its ratings centre on
+        self.content_start = array('q')
+        self.content_count = array('l')
+        self.published_count = array('l')
+        self.quality = array('d')
+        start = self.content_pk
+        for _ in range(sizes.courses):
+            mean = max(1, sizes.contents_per_course)
+            count = rng.randint(max(1, mean // 2), max(1, mean * 3 // 2))
+            self.content_start.append(start)
+            self.content_count.append(count)
+            self.published_count.append(max(1, count - int(count * rng.random() * 0.2)))
+            self.quality.append(rng.triangular(2.0, 5.0, 4.2))
+            start += count
+
+        # per student: first membership and number of memberships; per membership: course index
+        course_weights = _zipf_cum_weights(rng, sizes.courses)
+        courses = range(sizes.courses)
+        self.member_start = array('q')
+        self.member_count = array('l')
+        self.member_course = array('l')
+        for _ in range(self.students):
+            wanted = 0
+            if sizes.courses:
+                extra = rng.expovariate(1 / max(sizes.courses_per_student - 1, 0.01))
+                wanted = min(sizes.courses, 1 + int(extra))
+            chosen = set()
+            for _ in range(10):
+                if len(chosen) >= wanted:
+                    break
+                chosen.update(rng.choices(courses, cum_weights=course_weights, k=wanted - len(chosen)))
+            else:
+                # nearly every course wanted: the rarest ones are seldom drawn, take them uniformly
+                chosen.update(rng.sample(sorted(set(courses) - chosen), wanted - len(chosen)))
+            self.member_start.append(len(self.member_course))
+            self.member_count.append(wanted)
+            self.member_course.extend(sorted(chosen))
+        self.activity = _zipf_cum_weights(rng, self.students) if self.member_course else None
+
+    def student_pk(self, student):
+        # users are the teachers first, then the students
+        return self.user_pk + self.teachers + student
+
+    def categories(self):
+        for num in range(self.sizes.categories):
+            pk = self.category_pk + num
+            yield pk, f'Kategori {pk}'
+
+    def users(self):
+        password = make_password(self.password)
+        first_names, last_names = self.samples['first_names'], self.samples['last_names']
+        for num in range(self.sizes.users):
+            pk = self.user_pk + num
+            yield (pk, f'gen{pk}', password, self.rng.choice(first_names), self.rng.choice(last_names),
+                   f'gen{pk}@example.com', self._moment(), False, True, False)
+
+    def profiles(self):
+        for num in range(self.teachers):
+            yield self.profile_pk + num, self.user_pk + num, 'teacher', {}
+
+    def courses(self):
+        samples = self.samples['courses']
+        for num in range(self.sizes.courses):
+            name, description = samples[num % len(samples)]
+            created_at = self._moment()
+            category = None
+            if self.sizes.categories:
+                category = self.category_pk + self.rng.randrange(self.sizes.categories)
+            yield (self.course_pk + num, f'{name} {num + 1}', description, self.rng.randrange(0, 5000000, 50000),
+                   self.user_pk + self.rng.randrange(max(self.teachers, 1)), category, {},
+                   created_at, created_at)
+
+    def contents(self):
+        samples = self.samples['contents']
+        for course in range(self.sizes.courses):
+            course_pk = self.course_pk + course
+            start, count = self.content_start[course], self.content_count[course]
+            # the first contents are modules, the rest are lessons in one of them
+            modules = max(1, count // 6)
+            created_at = self._moment()
+            for num in range(count):
+                name, description, video_url = samples[self.rng.randrange(len(samples))]
+                created_at += timedelta(minutes=self.rng.randint(1, 600))
+                parent = None if num < modules else start + self.rng.randrange(modules)
+                yield (start + num, course_pk, parent, name, description, video_url, '',
+                       num < self.published_count[course], created_at, created_at)
+
+    def members(self):
+        for student in range(self.students):
+            start = self.member_start[student]
+            for num in range(self.member_count[student]):
+                created_at = self._moment()
+                yield (self.member_pk + start + num, self.course_pk + self.member_course[start + num],
+                       self.student_pk(student), 'std', created_at, created_at)
+
+    def comments(self):
+        if self.activity is None:
+            return
+        samples = self.samples['comments']
+        students = range(self.students)
+        made = 0
+        while made < self.sizes.comments:
+            # heavy commenters are drawn far more often than the rest
+            batch = min(DEFAULT_CHUNK_SIZE, self.sizes.comments - made)
+            for student in self.rng.choices(students, cum_weights=self.activity, k=batch):
+                if not self.member_count[student]:
+                    continue
+                member = self.member_start[student] + self.rng.randrange(self.member_count[student])
+                course = self.member_course[member]
+                content = self.content_start[course] + self.rng.randrange(self.published_count[course])
+                created_at = self._moment()
+                yield (self.comment_pk + made, content, self.member_pk + member,
+                       samples[self.rng.randrange(len(samples))], created_at, created_at)
+                made += 1
+
+    def feedbacks(self):
+        texts = self.samples['comments']
+        num = 0
+        for student in range(self.students):
+            start = self.member_start[student]
+            for member in range(start, start + self.member_count[student]):
+                if self.rng.random() >= self.sizes.feedback_rate:
+                    continue
+                course = self.member_course[member]
+                rating = min(5, max(1, round(self.rng.gauss(self.quality[course], 1.0))))
+                created_at = self._moment()
+                yield (self.feedback_pk + num, self.course_pk + course, self.student_pk(student), rating,
+                       texts[self.rng.randrange(len(texts))], created_at, created_at)
+                num += 1
+
+    def completions(self):
+        # a member completes the published contents in order and stops somewhere,
+        # most of them early: beta distributed with mean completion_rate
+        rate = min(max(self.sizes.completion_rate, 0.001), 0.999)
+        alpha = 0.8
+        beta = alpha * (1 - rate) / rate
+        num = 0
+        for student in range(self.students):
+            student_pk = self.student_pk(student)
+            start = self.member_start[student]
+            for member in range(start, start + self.member_count[student]):
+                course = self.member_course[member]
+                done = int(self.rng.betavariate(alpha, beta) * self.published_count[course] + 0.5)
+                completed_at = self._moment()
+                for index in range(done):
+                    completed_at += timedelta(minutes=self.rng.randint(5, 2000))
+                    yield (self.completion_pk + num, student_pk, self.content_start[course] + index, True,
+                           min(completed_at, self.now))
+                    num += 1
+
+    def stages(self):
+        # (name, model, columns, rows)
+        return [
+            ('categories', CourseCategory, ['id', 'name'], self.categories),
+            ('users', User, ['id', 'username', 'password', 'first_name', 'last_name', 'email', 'date_joined',
+                             'is_staff', 'is_active', 'is_superuser'], self.users),
+            ('profiles', Profile, ['id', 'user', 'role', 'picture_variants'], self.profiles),
+            ('courses', Course, ['id', 'name', 'description', 'price', 'teacher', 'category', 'image_variants',
+                                 'created_at', 'updated_at'], self.courses),
+            ('contents', CourseContent, ['id', 'course_id', 'parent_id', 'name', 'description', 'video_url',
+                                         'file_sha256', 'is_published', 'created_at', 'updated_at'],
+             self.contents),
+            ('members', CourseMember, ['id', 'course_id', 'user_id', 'roles', 'created_at', 'updated_at'],
+             self.members),
+            ('comments', Comment, ['id', 'content_id', 'member_id', 'comment', 'created_at', 'updated_at'],
+             self.comments),
+            ('feedback', CourseFeedback, ['id', 'course', 'student', 'rating', 'feedback', 'created_at',
+                                          'updated_at'], self.feedbacks),
+            ('completions', CompletionTracking, ['id', 'student', 'content', 'completed', 'completed_at'],
+             self.completions),
+        ]
+
+
+def write_stage(name, model, columns, rows, writer=insert_writer, chunk_size=DEFAULT_CHUNK_SIZE):
+    result = StageResult(name)
+    start = time.perf_counter()
+    for chunk in chunked(rows, chunk_size):
+        with transaction.atomic():
+            writer(model, columns, chunk)
+        result.rows += len(chunk)
+        result.inserted += len(chunk)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def generate(generator, writer=insert_writer, chunk_size=DEFAULT_CHUNK_SIZE):
+    # write every stage, then the tables that are normally kept up to date
+    # per request (ratings, progress); yields a StageResult per stage
+    start = time.perf_counter()
+    generator.plan()
+    yield StageResult('plan', seconds=time.perf_counter() - start)
+
+    for name, model, columns, rows in generator.stages():
+        result = write_stage(name, model, columns, rows(), writer=writer, chunk_size=chunk_size)
+        reset_sequences([model])
+        yield result
+
+    for name, rebuild in (('ratings', rebuild_ratings), ('progress', rebuild_progress)):
+        start = time.perf_counter()
+        rows = rebuild()
+        yield StageResult(name, rows=rows, inserted=rows, seconds=time.perf_counter() - start)
+    invalidate_catalogue()
+    invalidate(CONTENTS)
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+
+IDENTITY_CACHE_SIZE = getattr(settings, 'LMS_IDENTITY_CACHE_SIZE', 1024)
+IDENTITY_CACHE_TTL = getattr(settings, 'LMS_IDENTITY_CACHE_TTL', 60)
+
+
+@dataclass(frozen=True)
+class Identity:
+    # An immutable snapshot, cached entries are shared by every thread of
+    # the process, so they must not hand out model instances.
+    user_id: int
+    username: str
+    role: Optional[str]
+    is_staff: bool = False
+
+    @property
+    def is_teacher(self):
+        return self.role == 'teacher'
+
+
+class IdentityCache:
+    # Bounded LRU of Identity objects keyed by user id (with a username
+    # index), entries expire after `ttl` seconds. It is per process: saves in
+    # this process evict right away, other processes catch up within the TTL.
+
+    def __init__(self, maxsize=IDENTITY_CACHE_SIZE, ttl=IDENTITY_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._usernames = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+            identity, expires = item
+            if expires < time.monotonic():
+                self._remove(user_id)
+                return None
+            self._items.move_to_end(user_id)
+            return identity
+
+    def get_by_username(self, username):
+        with self._lock:
+            user_id = self._usernames.get(username)
+        return None if user_id is None else self.get(user_id)
+
+    def put(self, identity):
+        with self._lock:
+            self._remove(identity.user_id)
+            self._items[identity.user_id] = (identity, time.monotonic() + self.ttl)
+            self._usernames[identity.username] = identity.user_id
+            while len(self._items) > self.maxsize:
+                self._remove(next(iter(self._items)))
+
+    def evict(self, user_id, username=None):
+        with self._lock:
+            self._remove(user_id)
+            if username is not None:
+                self._remove(self._usernames.get(username))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._usernames.clear()
+
+    def _remove(self, user_id):
+        item = self._items.pop(user_id, None)
+        if item is not None:
+            self._usernames.pop(item[0].username, None)
+
+
+identity_cache = IdentityCache()
+
+
+def _load(**lookup):
+    # one query for the user and its (optional) profile
+    row = (User.objects.filter(**lookup)
+           .values_list('id', 'username', 'profile__role', 'is_staff').first())
+    if row is None:
+        return None
+    identity = Identity(*row)
+    identity_cache.put(identity)
+    return identity
+
+
+# Authorization and write paths pass fresh=True: the cache may lag a role
+# change made in another process by up to the TTL.
+
+def identity_for_user_id(user_id, fresh=False):
+    return (not fresh and identity_cache.get(user_id)) or _load(id=user_id)
+
+
+def identity_for_username(username, fresh=False):
+    return (not fresh and identity_cache.get_by_username(username)) or _load(username=username)
+
+
+def get_identity(request):
+    # Identity of the authenticated user, resolved at most once per request.
+    identity = getattr(request, '_lms_identity', None)
+    if identity is None:
+        identity = identity_for_user_id(request.user.id)
+        request._lms_identity = identity
+    return identity
@@ -0,0 +1,114 @@
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from lms_core.cache import invalidate_catalogue
+from lms_core.models import Course
+from lms_core.taskqueue import enqueue
+
+logger = logging.getLogger(__name__)
+
+# Uploaded originals are stored by the request as before; resized variants are
+# generated afterwards by the task queue (`manage.py run_workers`) and written
+# next to the original:
+#   course/photo.jpg -> course/photo.thumb.webp, course/photo.thumb.jpg, ...
+# The generated names are kept in a JSON field together with the source they
+# were made from, so a replaced image is never served with stale variants.
+
+# name -> (size, mode): "cover" crops to exactly that size, "contain" only shrinks
+VARIANTS = {
+    'thumb': ((160, 160), 'cover'),
+    'card': ((640, 360), 'cover'),
+    'full': ((1600, 1600), 'contain'),
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def variant_name(name, variant, fmt):
+    root, _ = os.path.splitext(name)
+    return f'{root}.{variant}.{EXTENSIONS[fmt]}'
+
+
+def _resize(image, size, mode):
+    if mode == 'cover':
+        return ImageOps.fit(image, size, Image.LANCZOS)
+    image = image.copy()
+    image.thumbnail(size, Image.LANCZOS)
+    return image
+
+
+def _encode(image, fmt):
+    format_name, options = FORMATS[fmt]
+    if format_name == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format_name, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(fieldfile):
+    # write every variant of `fieldfile` to its storage, returns {variant: {format: name}}
+    storage = fieldfile.storage
+    with storage.open(fieldfile.name, 'rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    files = {}
+    for variant, (size, mode) in VARIANTS.items():
+        resized = _resize(image, size, mode)
+        files[variant] = {}
+        for fmt in FORMATS:
+            name = variant_name(fieldfile.name, variant, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            files[variant][fmt] = storage.save(name, ContentFile(_encode(resized, fmt)))
+    return files
+
+
+def variant_urls(fieldfile, variants):
+    # {variant: {format: url}} once the variants of the current file exist, else None
+    if not fieldfile or not variants or variants.get('source') != fieldfile.name:
+        return None
+    storage = fieldfile.storage
+    return {variant: {fmt: storage.url(name) for fmt, name in formats.items()}
+            for variant, formats in variants['files'].items()}
+
+
+def process_image(model, pk, field, variants_field):
+    try:
+        instance = model.objects.only(field).get(pk=pk)
+        fieldfile = getattr(instance, field)
+        if not fieldfile:
+            return None
+        try:
+            files = generate_variants(fieldfile)
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            logger.warning("Cannot make variants of %s", fieldfile.name, exc_info=True)
+            return None
+        # update() skips signals; the filter drops the result if the image was replaced meanwhile
+        variants = {'source': fieldfile.name, 'files': files}
+        updated = model.objects.filter(pk=pk, **{field: fieldfile.name}).update(**{variants_field: variants})
+        if updated and model is Course:
+            invalidate_catalogue()
+        return variants
+    except model.DoesNotExist:
+        return None
+
+
+def schedule_variants(instance, field, variants_field):
+    # queue variant generation when the stored variants are not from the
+    # current file, one queued task per image
+    fieldfile = getattr(instance, field)
+    variants = getattr(instance, variants_field) or {}
+    if not fieldfile or variants.get('source') == fieldfile.name:
+        return None
+    label = instance._meta.label
+    return enqueue('images.variants', {'model': label, 'pk': instance.pk, 'field': field,
+                                       'variants_field': variants_field},
+                   dedup_key=f'images:{label}:{instance.pk}:{field}')
@@ -0,0 +1,326 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from dataclasses import dataclass
+from itertools import islice
+from random import randint
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+
+from lms_core.models import Course, CourseMember, CourseContent, Comment
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class StageResult:
+    name: str
+    rows: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def iter_csv(path):
+    with open(path, newline='') as csvfile:
+        yield from csv.DictReader(csvfile)
+
+
+def iter_json_array(path, read_size=64 * 1024):
+    # Decode a top level JSON array one element at a time so large exports
+    # never have to be loaded into memory at once.
+    decoder = json.JSONDecoder()
+    with open(path) as jsonfile:
+        buffer = ''
+        started = False
+        eof = False
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer and not eof:
+                    chunk = jsonfile.read(read_size)
+                    eof = not chunk
+                    buffer += chunk
+                    continue
+                if not buffer.startswith('['):
+                    raise ValueError(f"{path} is not a JSON array")
+                buffer = buffer[1:]
+                started = True
+                continue
+            if buffer.startswith(']'):
+                return
+            if buffer.startswith(','):
+                buffer = buffer[1:]
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = jsonfile.read(read_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield item
+            buffer = buffer[end:]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def orm_writer(model, objs):
+    model.objects.bulk_create(objs, batch_size=len(objs) or None, ignore_conflicts=True)
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_row(fields, obj):
+    # one CSV line; JSON is encoded here since the driver adapters (psycopg2
+    # renders its Json as '...'::jsonb) only work as query parameters
+    values = []
+    for field in fields:
+        value = field.pre_save(obj, True)
+        if isinstance(field, models.JSONField):
+            value = None if value is None else json.dumps(value, cls=field.encoder)
+        else:
+            value = field.get_db_prep_save(value, connection)
+        values.append(_copy_value(value))
+    return ','.join(values) + '\n'
+
+
+def copy_writer(model, objs):
+    # COPY the chunk into a temporary staging table and move it into the real
+    # table with a single INSERT ... SELECT so conflicting keys are skipped
+    # instead of aborting the whole COPY.
+    meta = model._meta
+    fields = [field for field in meta.concrete_fields
+              if not (field.primary_key and objs[0].pk is None)]
+    table = connection.ops.quote_name(meta.db_table)
+    staging = connection.ops.quote_name(f"staging_{meta.db_table}")
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+
+    buffer = StringIO()
+    for obj in objs:
+        buffer.write(_copy_row(fields, obj))
+    buffer.seek(0)
+
+    copy_sql = f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TEMPORARY TABLE {staging} AS SELECT {columns} FROM {table} WITH NO DATA")
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            cursor.copy_expert(copy_sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+        cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+                       f"ON CONFLICT DO NOTHING")
+        cursor.execute(f"DROP TABLE {staging}")
+
+
+WRITERS = {
+    'orm': orm_writer,
+    'copy': copy_writer,
+}
+
+
+def get_writer(backend):
+    # COPY is PostgreSQL only, every other database goes through the ORM.
+    if backend == 'copy' and connection.vendor != 'postgresql':
+        return orm_writer
+    return WRITERS[backend]
+
+
+def hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def _init_hash_worker():
+    if not apps.ready:
+        django.setup()
+
+
+class PasswordHasherPool:
+    # PBKDF2 dominates user imports, so spread make_password over a process
+    # pool. Use as a context manager and pass the instance as the hasher.
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                initializer=_init_hash_worker)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __call__(self, passwords):
+        if not self.executor or len(passwords) < 2:
+            return hash_passwords(passwords)
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self.executor.map(make_password, passwords, chunksize=chunksize))
+
+
+# Every build_* function receives a chunk of (row number, row) pairs and
+# returns (objects to insert, skipped count) using one query per lookup.
+
+def build_users(chunk, hasher=hash_passwords):
+    usernames = [row['username'] for _, row in chunk]
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    rows = []
+    for _, row in chunk:
+        if row['username'] in existing:
+            continue
+        existing.add(row['username'])
+        rows.append(row)
+    passwords = hasher([row['password'] for row in rows])
+    objs = [User(username=row['username'],
+                 password=password,
+                 email=row['email'],
+                 first_name=row['firstname'],
+                 last_name=row['lastname']) for row, password in zip(rows, passwords)]
+    return objs, len(chunk) - len(objs)
+
+
+def _existing_pks(model, chunk):
+    return set(model.objects.filter(pk__in=[num + 1 for num, _ in chunk]).values_list('pk', flat=True))
+
+
+def build_courses(chunk):
+    existing = _existing_pks(Course, chunk)
+    teachers = set(User.objects.filter(pk__in={int(row['teacher']) for _, row in chunk})
+                   .values_list('pk', flat=True))
+    objs = [Course(pk=num + 1, name=row['name'], price=row['price'],
+                   description=row['description'],
+                   teacher_id=int(row['teacher']))
+            for num, row in chunk
+            if num + 1 not in existing and int(row['teacher']) in teachers]
+    return objs, len(chunk) - len(objs)
+
+
+def build_members(chunk):
+    existing = _existing_pks(CourseMember, chunk)
+    courses = set(Course.objects.filter(pk__in={int(row['course_id']) for _, row in chunk})
+                  .values_list('pk', flat=True))
+    users = set(User.objects.filter(pk__in={int(row['user_id']) for _, row in chunk})
+                .values_list('pk', flat=True))
+    objs = [CourseMember(pk=num + 1, course_id_id=int(row['course_id']),
+                         user_id_id=int(row['user_id']), roles=row['roles'])
+            for num, row in chunk
+            if num + 1 not in existing
+            and int(row['course_id']) in courses and int(row['user_id']) in users]
+    return objs, len(chunk) - len(objs)
+
+
+def build_contents(chunk):
+    existing = _existing_pks(CourseContent, chunk)
+    courses = set(Course.objects.filter(pk__in={int(row['course_id']) for _, row in chunk})
+                  .values_list('pk', flat=True))
+    objs = [CourseContent(pk=num + 1, course_id_id=int(row['course_id']),
+                          video_url=row['video_url'], name=row['name'],
+                          description=row['description'])
+            for num, row in chunk
+            if num + 1 not in existing and int(row['course_id']) in courses]
+    return objs, len(chunk) - len(objs)
+
+
+def build_comments(chunk):
+    users = set(User.objects.filter(pk__in={int(row['user_id']) for _, row in chunk})
+                .values_list('pk', flat=True))
+    for _, row in chunk:
+        # the sample export references users that do not exist in user-data.csv
+        if int(row['user_id']) not in users:
+            row['user_id'] = randint(5, 40)
+    existing = _existing_pks(Comment, chunk)
+    content_courses = dict(CourseContent.objects
+                           .filter(pk__in={int(row['content_id']) for _, row in chunk})
+                           .values_list('pk', 'course_id'))
+    members = {(course_id, user_id): member_id for member_id, course_id, user_id in
+               CourseMember.objects.filter(course_id__in=set(content_courses.values()),
+                                           user_id__in={int(row['user_id']) for _, row in chunk})
+               .values_list('pk', 'course_id', 'user_id')}
+    objs = []
+    for num, row in chunk:
+        if num + 1 in existing:
+            continue
+        content_id = int(row['content_id'])
+        member_id = members.get((content_courses.get(content_id), int(row['user_id'])))
+        if member_id is None:
+            continue
+        objs.append(Comment(pk=num + 1, content_id_id=content_id,
+                            member_id_id=member_id, comment=row['comment']))
+    return objs, len(chunk) - len(objs)
+
+
+STAGES = [
+    ('users', User, 'user-data.csv', build_users),
+    ('courses', Course, 'course-data.csv', build_courses),
+    ('members', CourseMember, 'member-data.csv', build_members),
+    ('contents', CourseContent, 'contents.json', build_contents),
+    ('comments', Comment, 'comments.json', build_comments),
+]
+
+
+def iter_rows(path):
+    if str(path).endswith('.json'):
+        return iter_json_array(path)
+    return iter_csv(path)
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def load_stage(name, model, rows, build, writer=orm_writer, chunk_size=DEFAULT_CHUNK_SIZE):
+    result = StageResult(name)
+    start = time.perf_counter()
+    for chunk in chunked(enumerate(rows), chunk_size):
+        with transaction.atomic():
+            objs, skipped = build(chunk)
+            if objs:
+                writer(model, objs)
+        result.rows += len(chunk)
+        result.inserted += len(objs)
+        result.skipped += skipped
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def import_all(path, writer=orm_writer, chunk_size=DEFAULT_CHUNK_SIZE, builders=None, stages=None):
+    builders = builders or {}
+    for name, model, filename, build in STAGES:
+        if stages and name not in stages:
+            continue
+        result = load_stage(name, model, iter_rows(path / filename), builders.get(name, build),
+                            writer=writer, chunk_size=chunk_size)
+        if model is not User:
+            reset_sequences([model])
+        yield result
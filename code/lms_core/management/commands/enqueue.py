@@ -0,0 +1,24 @@
+import argparse
+
+from django.core.management import get_commands
+from django.core.management.base import BaseCommand, CommandError
+
+from lms_core.taskqueue import enqueue
+
+
+class Command(BaseCommand):
+    help = "Queue a management command for the background workers, e.g. `enqueue import_lms --backend copy`"
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help="Management command to run")
+        parser.add_argument('command_args', nargs=argparse.REMAINDER, metavar='args', help="Its arguments")
+        parser.add_argument('--delay', type=float, default=0,
+                            help="Seconds to wait before running it (put it before the command name)")
+
+    def handle(self, *args, **options):
+        name, arguments = options['name'], options['command_args']
+        if name not in get_commands():
+            raise CommandError(f"Unknown command: {name}")
+        queued = enqueue('command', {'name': name, 'args': arguments},
+                         dedup_key=' '.join(['command', name, *arguments]), delay=options['delay'])
+        self.stdout.write(f"Queued task #{queued.pk}")
@@ -0,0 +1,65 @@
+from argparse import ArgumentTypeError
+from dataclasses import fields
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from lms_core.generator import EPOCH, WRITERS, Generator, Sizes, generate, get_writer, load_samples
+from lms_core.importer import DEFAULT_CHUNK_SIZE
+
+
+def moment(value):
+    if value == 'now':
+        return timezone.now()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ArgumentTypeError(f"not an ISO 8601 date and time: {value}")
+    # naive times are in TIME_ZONE
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+class Command(BaseCommand):
+    help = "Generate seeded, skewed synthetic LMS data (users, courses, members, contents, comments, ...)"
+
+    def add_arguments(self, parser):
+        for field in fields(Sizes):
+            parser.add_argument(f"--{field.name.replace('_', '-')}", type=field.type, default=field.default,
+                                help=f"(default: {field.default})")
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help="Multiply users, teachers, courses and comments by this factor")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Same seed, sizes and --now give the same data")
+        parser.add_argument('--now', type=moment, default=EPOCH,
+                            help=f"Generated timestamps lie before this ISO 8601 time, or 'now' "
+                                 f"(default: {EPOCH.isoformat()})")
+        parser.add_argument('--password', default='password123',
+                            help="Password of every generated user (hashed once)")
+        parser.add_argument('--samples', default=str(Path(settings.BASE_DIR) / 'csv_data'),
+                            help="Directory whose csv/json exports provide names and texts")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Rows inserted per batch")
+        parser.add_argument('--backend', default='copy', choices=list(WRITERS),
+                            help="copy uses PostgreSQL COPY, other databases fall back to insert")
+
+    def handle(self, *args, **options):
+        sizes = Sizes(**{field.name: options[field.name] for field in fields(Sizes)})
+        for name in ('users', 'teachers', 'courses', 'comments'):
+            setattr(sizes, name, int(getattr(sizes, name) * options['scale']))
+        if sizes.courses and not min(sizes.teachers, sizes.users):
+            raise CommandError("Courses need at least one teacher")
+
+        generator = Generator(sizes, seed=options['seed'], samples=load_samples(options['samples']),
+                              now=options['now'], password=options['password'])
+        total_rows = 0
+        total_seconds = 0.0
+        for result in generate(generator, writer=get_writer(options['backend']), chunk_size=options['chunk_size']):
+            total_rows += result.inserted
+            total_seconds += result.seconds
+            self.stdout.write(
+                f"{result.name:<12} {result.inserted:>10} rows  {result.seconds:8.2f}s  "
+                f"{result.rows_per_second:10.0f} rows/s"
+            )
+        self.stdout.write(self.style.SUCCESS(f"--- {total_rows} rows in {total_seconds:.2f} seconds ---"))
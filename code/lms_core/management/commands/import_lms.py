@@ -0,0 +1,42 @@
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lms_core.importer import DEFAULT_CHUNK_SIZE, STAGES, WRITERS, get_writer, import_all
+from lms_core.importer import PasswordHasherPool, build_users
+
+
+class Command(BaseCommand):
+    help = "Import users, courses, members, contents and comments from csv_data/"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=str(Path(settings.BASE_DIR) / 'csv_data'),
+                            help="Directory containing the csv/json exports")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Rows resolved and inserted per batch")
+        parser.add_argument('--backend', default='orm', choices=list(WRITERS),
+                            help="copy uses PostgreSQL COPY, other databases fall back to orm")
+        parser.add_argument('--hash-workers', type=int, default=None,
+                            help="Processes used to hash passwords (default: number of cores, 1 = serial)")
+        parser.add_argument('--stage', action='append', dest='stages',
+                            choices=[name for name, *_ in STAGES],
+                            help="Only run the given stage (can be repeated)")
+
+    def handle(self, *args, **options):
+        total_rows = 0
+        total_seconds = 0.0
+        writer = get_writer(options['backend'])
+        with PasswordHasherPool(options['hash_workers']) as hasher:
+            builders = {'users': partial(build_users, hasher=hasher)}
+            for result in import_all(Path(options['path']), writer=writer, builders=builders,
+                                     chunk_size=options['chunk_size'], stages=options['stages']):
+                total_rows += result.rows
+                total_seconds += result.seconds
+                self.stdout.write(
+                    f"{result.name:<10} {result.rows:>9} rows  {result.inserted:>9} inserted  "
+                    f"{result.skipped:>9} skipped  {result.seconds:8.2f}s  "
+                    f"{result.rows_per_second:10.0f} rows/s"
+                )
+        self.stdout.write(self.style.SUCCESS(f"--- {total_rows} rows in {total_seconds:.2f} seconds ---"))
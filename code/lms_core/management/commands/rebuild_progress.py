@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lms_core.progress import rebuild_progress, verify_progress
+
+
+class Command(BaseCommand):
+    help = "Rebuild the CourseProgress table from CompletionTracking and verify it"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help="Only rebuild the given course id (can be repeated)")
+        parser.add_argument('--verify-only', action='store_true',
+                            help="Compare the table with a fresh recount without rewriting it")
+
+    def handle(self, *args, **options):
+        courses = options['courses']
+        if not options['verify_only']:
+            rows = rebuild_progress(courses)
+            self.stdout.write(f"Rebuilt {rows} progress rows")
+
+        mismatches = verify_progress(courses)
+        for (student_id, course_id), expected, actual in mismatches[:20]:
+            self.stderr.write(f"student {student_id} course {course_id}: expected {expected}, found {actual}")
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} progress rows do not match CompletionTracking")
+        self.stdout.write(self.style.SUCCESS("Progress table verified"))
@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from lms_core.taskqueue import work
+
+
+def run_worker(name, stop, poll, burst):
+    # entry point of a worker process
+    if not apps.ready:
+        django.setup()
+    # Ctrl+C reaches the whole process group, the parent decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    try:
+        work(name, stop=stop, burst=burst, poll=poll)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run background task workers until interrupted"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Worker processes (1 = this process)")
+        parser.add_argument('--poll', type=float, default=1.0, help="Seconds between polls of an empty queue")
+        parser.add_argument('--burst', action='store_true', help="Exit once no task is due")
+
+    def handle(self, *args, **options):
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        workers, poll, burst = options['workers'], options['poll'], options['burst']
+
+        if workers <= 1:
+            stop = threading.Event()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *args: stop.set())
+            processed = work(prefix, stop=stop, burst=burst, poll=poll)
+            self.stdout.write(f"{processed} tasks processed")
+            return
+
+        # children must not share the parent's database connection
+        connections.close_all()
+        stop = multiprocessing.Event()
+        processes = [multiprocessing.Process(target=run_worker, args=(f'{prefix}-{num}', stop, poll, burst))
+                     for num in range(workers)]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {workers} workers")
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: stop.set())
+        for process in processes:
+            process.join()
+        self.stdout.write("Workers stopped")
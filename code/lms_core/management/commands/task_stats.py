@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from lms_core.taskqueue import task_metrics
+
+
+def _seconds(value):
+    return f"{value:9.3f}" if value is not None else f"{'-':>9}"
+
+
+class Command(BaseCommand):
+    help = "Show task counts and timings per task name"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=None, help="Only tasks created in the last hours")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['hours'] is not None:
+            since = timezone.now() - timedelta(hours=options['hours'])
+        self.stdout.write(f"{'task':<20} {'queued':>7} {'running':>7} {'done':>7} {'failed':>7} {'retried':>7} "
+                          f"{'avg s':>9} {'max s':>9} {'latency s':>9}")
+        for row in task_metrics(since):
+            self.stdout.write(
+                f"{row['name']:<20} {row['queued']:>7} {row['running']:>7} {row['done']:>7} {row['failed']:>7} "
+                f"{row['retries']:>7} {_seconds(row['avg_duration'])} {_seconds(row['max_duration'])} "
+                f"{_seconds(row['avg_latency'])}"
+            )
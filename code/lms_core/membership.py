@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from lms_core.models import CourseMember
+
+
+MEMBERSHIP_CACHE_SIZE = getattr(settings, 'LMS_MEMBERSHIP_CACHE_SIZE', 4096)
+MEMBERSHIP_CACHE_TTL = getattr(settings, 'LMS_MEMBERSHIP_CACHE_TTL', 60)
+
+
+class MembershipCache:
+    # Per-process LRU of CourseMember rows keyed by (course_id, user_id), plus
+    # a content_id -> course_id index so checks that start from a content can
+    # skip the join once the content has been seen. Only memberships that
+    # exist are cached, enrolling is therefore visible at once everywhere;
+    # unenrolling (or moving a content to another course) updates this
+    # process and expires elsewhere after `ttl`.
+
+    def __init__(self, maxsize=MEMBERSHIP_CACHE_SIZE, ttl=MEMBERSHIP_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._members = OrderedDict()
+        self._contents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, table, key):
+        with self._lock:
+            item = table.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del table[key]
+                return None
+            table.move_to_end(key)
+            return value
+
+    def _put(self, table, key, value):
+        with self._lock:
+            table[key] = (value, time.monotonic() + self.ttl)
+            table.move_to_end(key)
+            while len(table) > self.maxsize:
+                table.popitem(last=False)
+
+    def get(self, course_id, user_id):
+        return self._get(self._members, (course_id, user_id))
+
+    def put(self, member):
+        self._put(self._members, (member.course_id_id, member.user_id_id), member)
+
+    def evict(self, course_id, user_id):
+        with self._lock:
+            self._members.pop((course_id, user_id), None)
+
+    def content_course(self, content_id):
+        return self._get(self._contents, content_id)
+
+    def put_content(self, content_id, course_id):
+        self._put(self._contents, content_id, course_id)
+
+    def evict_content(self, content_id):
+        with self._lock:
+            self._contents.pop(content_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._members.clear()
+            self._contents.clear()
+
+
+membership_cache = MembershipCache()
+
+
+def _members():
+    return CourseMember.objects.select_related('course_id', 'user_id')
+
+
+def get_membership(course_id, user_id):
+    member = membership_cache.get(course_id, user_id)
+    if member is None:
+        member = _members().filter(course_id=course_id, user_id=user_id).first()
+        if member is not None:
+            membership_cache.put(member)
+    return member
+
+
+def membership_for_content(content_id, user_id):
+    # content -> course -> member in one joined query on a cold cache
+    course_id = membership_cache.content_course(content_id)
+    if course_id is not None:
+        return get_membership(course_id, user_id)
+    member = _members().filter(course_id__coursecontent__id=content_id, user_id=user_id).first()
+    if member is not None:
+        membership_cache.put_content(content_id, member.course_id_id)
+        membership_cache.put(member)
+    return member
+
+
+def is_member(course_id, user_id):
+    return get_membership(course_id, user_id) is not None
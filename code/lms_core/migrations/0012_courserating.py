@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_ratings(apps, schema_editor):
+    CourseFeedback = apps.get_model('lms_core', 'CourseFeedback')
+    CourseRating = apps.get_model('lms_core', 'CourseRating')
+    stats = (CourseFeedback.objects.order_by().values('course_id')
+             .annotate(count=Count('id'), total=Sum('rating'),
+                       **{f'star_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}))
+    CourseRating.objects.bulk_create([CourseRating(**row) for row in stats], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0011_courseprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseRating',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to='lms_core.course')),
+                ('count', models.IntegerField(default=0, verbose_name='Jumlah rating')),
+                ('total', models.IntegerField(default=0, verbose_name='Total rating')),
+                ('star_1', models.IntegerField(default=0)),
+                ('star_2', models.IntegerField(default=0)),
+                ('star_3', models.IntegerField(default=0)),
+                ('star_4', models.IntegerField(default=0)),
+                ('star_5', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Rating Kursus',
+                'verbose_name_plural': 'Rating Kursus',
+            },
+        ),
+        migrations.RunPython(populate_ratings, migrations.RunPython.noop),
+    ]
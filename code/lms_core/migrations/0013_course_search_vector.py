@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:37
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# The vector is computed by a trigger so it also stays in sync for bulk
+# loads (import_lms, COPY) that never call Course.save(). Only PostgreSQL
+# has tsvector/GIN; other databases keep a NULL column and lms_core.search
+# falls back to icontains.
+FORWARD_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION lms_core_course_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER lms_core_course_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description, search_vector ON lms_core_course
+    FOR EACH ROW EXECUTE FUNCTION lms_core_course_search_vector_update()
+    """,
+    "UPDATE lms_core_course SET search_vector = NULL",
+    "CREATE INDEX lms_core_course_search_vector_gin ON lms_core_course USING gin (search_vector)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS lms_core_course_search_vector_gin",
+    "DROP TRIGGER IF EXISTS lms_core_course_search_vector_trigger ON lms_core_course",
+    "DROP FUNCTION IF EXISTS lms_core_course_search_vector_update()",
+]
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0012_courserating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(run_on_postgresql(FORWARD_SQL), run_on_postgresql(REVERSE_SQL)),
+    ]
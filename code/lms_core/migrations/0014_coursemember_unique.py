@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:52
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_members(apps, schema_editor):
+    # enrolling twice used to create a second row; keep the oldest one and
+    # move the comments of the others onto it
+    CourseMember = apps.get_model('lms_core', 'CourseMember')
+    Comment = apps.get_model('lms_core', 'Comment')
+    duplicates = (CourseMember.objects.order_by().values('course_id', 'user_id')
+                  .annotate(keep=Min('id'), rows=Count('id')).filter(rows__gt=1))
+    for row in duplicates:
+        others = CourseMember.objects.filter(course_id=row['course_id'], user_id=row['user_id'],
+                                             id__gt=row['keep'])
+        Comment.objects.filter(member_id__in=others).update(member_id=row['keep'])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0013_course_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_members, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='coursemember',
+            unique_together={('course_id', 'user_id')},
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:42
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0016_task_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursecontent',
+            name='file_sha256',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='SHA-256 file'),
+        ),
+        migrations.AddField(
+            model_name='coursecontent',
+            name='file_size',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Ukuran file'),
+        ),
+        migrations.CreateModel(
+            name='AttachmentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nama file')),
+                ('size', models.BigIntegerField(verbose_name='Ukuran')),
+                ('sha256', models.CharField(max_length=64)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('uploading', 'Mengunggah'), ('verifying', 'Memeriksa'), ('complete', 'Selesai'), ('failed', 'Gagal')], default='uploading', max_length=10)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='lms_core.coursecontent', verbose_name='konten')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='pengunggah')),
+            ],
+            options={
+                'verbose_name': 'Unggahan Lampiran',
+                'verbose_name_plural': 'Unggahan Lampiran',
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Each composite index leads with a foreign key that had its own index; those
+# single column indexes are dropped once the composites exist, since the
+# composites serve the same lookups (including ON DELETE checks).
+# CourseMember (course_id, user_id) already has the unique index from 0014.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0017_attachment_uploads'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content_id', 'created_at', 'id'], name='comment_content_created'),
+        ),
+        migrations.AddIndex(
+            model_name='completiontracking',
+            index=models.Index(fields=['content', 'student'], name='completion_content_student'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-created_at', '-id'], name='course_created'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='course_category_created'),
+        ),
+        migrations.AddIndex(
+            model_name='coursecontent',
+            index=models.Index(fields=['course_id', 'created_at', 'id'], name='content_course_created'),
+        ),
+        migrations.AddIndex(
+            model_name='coursecontent',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['course_id', 'created_at', 'id'], name='content_course_published'),
+        ),
+        migrations.AddIndex(
+            model_name='coursemember',
+            index=models.Index(fields=['user_id', '-created_at', '-id'], name='member_user_created'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='content_id',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='lms_core.coursecontent', verbose_name='konten'),
+        ),
+        migrations.AlterField(
+            model_name='completiontracking',
+            name='content',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='lms_core.coursecontent'),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='category',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='courses', to='lms_core.coursecategory'),
+        ),
+        migrations.AlterField(
+            model_name='coursecontent',
+            name='course_id',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.RESTRICT, to='lms_core.course', verbose_name='matkul'),
+        ),
+        migrations.AlterField(
+            model_name='coursemember',
+            name='user_id',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.RESTRICT, to=settings.AUTH_USER_MODEL, verbose_name='siswa'),
+        ),
+    ]
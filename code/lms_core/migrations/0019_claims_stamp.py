@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_core', '0018_index_audit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClaimsStamp',
+            fields=[
+                ('user_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('changed_at', models.FloatField(verbose_name='Berubah pada')),
+            ],
+            options={
+                'verbose_name': 'Perubahan Klaim Token',
+                'verbose_name_plural': 'Perubahan Klaim Token',
+            },
+        ),
+    ]
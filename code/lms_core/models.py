@@ -1,5 +1,9 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 
 # Create your models here.
 
@@ -8,6 +12,8 @@ class Profile(models.Model):
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to="profile_pictures/", blank=True, null=True)
+    # resized copies of profile_picture, written by lms_core.images
+    picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     role = models.CharField(max_length=10, choices=[('teacher', 'Teacher'), ('student', 'Student')], default='student')
 
 
@@ -26,10 +32,14 @@ class Course(models.Model):
     description = models.TextField("Deskripsi")
     price = models.IntegerField("Harga")
     image = models.ImageField("Gambar", upload_to="course", blank=True, null=True)
+    image_variants = models.JSONField("Varian gambar", default=dict, blank=True, editable=False)
     teacher = models.ForeignKey(User, verbose_name="Pengajar", on_delete=models.RESTRICT)
     created_at = models.DateTimeField("Dibuat pada", auto_now_add=True)
     updated_at = models.DateTimeField("Diperbarui pada", auto_now=True)
-    category = models.ForeignKey(CourseCategory, null=True, blank=True, on_delete=models.SET_NULL, related_name="courses")
+    category = models.ForeignKey(CourseCategory, null=True, blank=True, on_delete=models.SET_NULL, related_name="courses",
+                                 db_index=False)
+    # maintained by a database trigger on PostgreSQL, see migration 0013
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
 
     def __str__(self):
@@ -39,15 +49,21 @@ class Course(models.Model):
         verbose_name = "Mata Kuliah"
         verbose_name_plural = "Data Mata Kuliah"
         ordering = ["-created_at"]
+        # the keyset pagination of /courses orders by (-created_at, -id)
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='course_created'),
+            models.Index(fields=['category', '-created_at', '-id'], name='course_category_created'),
+        ]
 
     def is_member(self, user):
-        return CourseMember.objects.filter(course_id=self, user_id=user).exists()
+        from lms_core.membership import is_member
+        return is_member(self.pk, getattr(user, 'pk', user))
 
 ROLE_OPTIONS = [('std', "Siswa"), ('ast', "Asisten")]
 
 class CourseMember(models.Model):
     course_id = models.ForeignKey(Course, verbose_name="matkul", on_delete=models.RESTRICT)
-    user_id = models.ForeignKey(User, verbose_name="siswa", on_delete=models.RESTRICT)
+    user_id = models.ForeignKey(User, verbose_name="siswa", on_delete=models.RESTRICT, db_index=False)
     roles = models.CharField("peran", max_length=3, choices=ROLE_OPTIONS, default='std')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -55,6 +71,9 @@ class CourseMember(models.Model):
     class Meta:
         verbose_name = "Subscriber Matkul"
         verbose_name_plural = "Subscriber Matkul"
+        # also the index of membership checks by (course, user)
+        unique_together = ('course_id', 'user_id')
+        indexes = [models.Index(fields=['user_id', '-created_at', '-id'], name='member_user_created')]
 
     def __str__(self) -> str:
         return f"{self.id} {self.course_id} : {self.user_id}"
@@ -64,7 +83,10 @@ class CourseContent(models.Model):
     description = models.TextField("deskripsi", default='-')
     video_url = models.CharField('URL Video', max_length=200, null=True, blank=True)
     file_attachment = models.FileField("File", null=True, blank=True)
-    course_id = models.ForeignKey(Course, verbose_name="matkul", on_delete=models.RESTRICT)
+    # set when file_attachment is written through lms_core.attachments
+    file_size = models.BigIntegerField("Ukuran file", null=True, blank=True)
+    file_sha256 = models.CharField("SHA-256 file", max_length=64, blank=True, default='')
+    course_id = models.ForeignKey(Course, verbose_name="matkul", on_delete=models.RESTRICT, db_index=False)
     parent_id = models.ForeignKey("self", verbose_name="induk", 
                                 on_delete=models.RESTRICT, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -76,13 +98,19 @@ class CourseContent(models.Model):
     class Meta:
         verbose_name = "Konten Matkul"
         verbose_name_plural = "Konten Matkul"
+        indexes = [
+            models.Index(fields=['course_id', 'created_at', 'id'], name='content_course_created'),
+            # students and progress only ever look at published contents
+            models.Index(fields=['course_id', 'created_at', 'id'], condition=models.Q(is_published=True),
+                         name='content_course_published'),
+        ]
 
     def __str__(self) -> str:
         return f'{self.course_id} {self.name}'
 
 
 class Comment(models.Model):
-    content_id = models.ForeignKey(CourseContent, verbose_name="konten", on_delete=models.CASCADE)
+    content_id = models.ForeignKey(CourseContent, verbose_name="konten", on_delete=models.CASCADE, db_index=False)
     member_id = models.ForeignKey(CourseMember, verbose_name="pengguna", on_delete=models.CASCADE)
     comment = models.TextField('komentar')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -91,6 +119,7 @@ class Comment(models.Model):
     class Meta:
         verbose_name = "Komentar"
         verbose_name_plural = "Komentar"
+        indexes = [models.Index(fields=['content_id', 'created_at', 'id'], name='comment_content_created')]
 
     def __str__(self) -> str:
         return "Komen: "+self.member_id.user_id+"-"+self.comment
@@ -113,14 +142,139 @@ class CourseFeedback(models.Model):
         return f"Feedback dari {self.student.username} untuk {self.course.name}"
 
 
+
+class CourseRating(models.Model):
+    # Running rating aggregates for a course, kept up to date by
+    # lms_core.ratings whenever feedback is created, edited or deleted.
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name="rating")
+    count = models.IntegerField("Jumlah rating", default=0)
+    total = models.IntegerField("Total rating", default=0)
+    star_1 = models.IntegerField(default=0)
+    star_2 = models.IntegerField(default=0)
+    star_3 = models.IntegerField(default=0)
+    star_4 = models.IntegerField(default=0)
+    star_5 = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Rating Kursus"
+        verbose_name_plural = "Rating Kursus"
+
+    def __str__(self):
+        return f"{self.course_id}: {self.average} ({self.count})"
+
+    @property
+    def average(self):
+        return round(self.total / self.count, 2) if self.count else 0.0
+
+    @property
+    def histogram(self):
+        return {star: getattr(self, f"star_{star}") for star in range(1, 6)}
+
 class CompletionTracking(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE)
-    content = models.ForeignKey(CourseContent, on_delete=models.CASCADE)
+    content = models.ForeignKey(CourseContent, on_delete=models.CASCADE, db_index=False)
     completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ('student', 'content')
+        indexes = [models.Index(fields=['content', 'student'], name='completion_content_student')]
+
+    def __str__(self):
+        return f"{self.student.username} - {self.content.name} - Completed: {self.completed}"
+
+class CourseProgress(models.Model):
+    # Denormalized per student progress, kept up to date by lms_core.progress
+    # and rebuilt with `manage.py rebuild_progress`.
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="course_progress")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="progress")
+    completed_count = models.IntegerField("Konten selesai", default=0)
+    total_contents = models.IntegerField("Total konten", default=0)
+    last_completed_at = models.DateTimeField("Terakhir selesai", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Progres Kursus"
+        verbose_name_plural = "Progres Kursus"
+        unique_together = ('student', 'course')
+
+    def __str__(self):
+        return f"{self.student_id} - {self.course_id}: {self.completed_count}/{self.total_contents}"
+
+
+TASK_STATUS = [('queued', "Antri"), ('running', "Berjalan"), ('done', "Selesai"), ('failed', "Gagal")]
+
+class Task(models.Model):
+    # Background work queued in the database and run by `manage.py run_workers`,
+    # see lms_core.taskqueue.
+    name = models.CharField("Nama tugas", max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    # at most one queued task per key, enqueueing again returns that task
+    dedup_key = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=TASK_STATUS, default='queued')
+    attempts = models.IntegerField("Percobaan", default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_at = models.DateTimeField("Dijalankan pada", default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField("Dibuat pada", auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # seconds spent in the last attempt
+    duration = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tugas Latar"
+        verbose_name_plural = "Antrian Tugas Latar"
+        indexes = [models.Index(fields=['status', 'run_at'], name='task_status_run_at')]
+        constraints = [
+            models.UniqueConstraint(fields=['dedup_key'], condition=models.Q(status='queued'),
+                                    name='task_queued_dedup_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+UPLOAD_STATUS = [('uploading', "Mengunggah"), ('verifying', "Memeriksa"), ('complete', "Selesai"),
+                 ('failed', "Gagal")]
+
+class AttachmentUpload(models.Model):
+    # A chunked, resumable upload of CourseContent.file_attachment, see
+    # lms_core.attachments.
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    content = models.ForeignKey(CourseContent, verbose_name="konten", on_delete=models.CASCADE,
+                                related_name="uploads")
+    uploaded_by = models.ForeignKey(User, verbose_name="pengunggah", on_delete=models.CASCADE)
+    filename = models.CharField("Nama file", max_length=255)
+    size = models.BigIntegerField("Ukuran")
+    sha256 = models.CharField(max_length=64)
+    # bytes received so far, the next chunk starts here
+    offset = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=UPLOAD_STATUS, default='uploading')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Unggahan Lampiran"
+        verbose_name_plural = "Unggahan Lampiran"
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
+class ClaimsStamp(models.Model):
+    # When the role or memberships of a user last changed, see lms_core.claims.
+    # A plain id rather than a foreign key: the stamp is written from the
+    # post_delete signals that run while the user itself is being deleted.
+    user_id = models.IntegerField(primary_key=True)
+    # epoch seconds, compared with the `claims_at` claim of access tokens
+    changed_at = models.FloatField("Berubah pada")
+
+    class Meta:
+        verbose_name = "Perubahan Klaim Token"
+        verbose_name_plural = "Perubahan Klaim Token"
 
     def __str__(self):
-        return f"{self.student.username} - {self.content.name} - Completed: {self.completed}"
\ No newline at end of file
+        return f"{self.user_id}: {self.changed_at}"
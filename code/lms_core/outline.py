@@ -0,0 +1,53 @@
+from lms_core.cache import CONTENTS, cache_version, course_group, get_or_build
+from lms_core.models import CourseContent
+
+
+OUTLINE_FIELDS = ("id", "parent_id_id", "name", "description", "video_url", "is_published")
+
+
+def build_outline(rows, published_only=False):
+    # rows come from a single query on the course; link every node to its
+    # parent through a dict, so the whole tree is built in O(n)
+    nodes = {}
+    for row in rows:
+        nodes[row["id"]] = {
+            "id": row["id"],
+            "name": row["name"],
+            "description": row["description"],
+            "video_url": row["video_url"],
+            "is_published": row["is_published"],
+            "children": [],
+        }
+
+    roots = []
+    for row in rows:
+        node = nodes[row["id"]]
+        parent = nodes.get(row["parent_id_id"])
+        if parent is None:
+            # no parent, or a parent outside this course
+            roots.append(node)
+        else:
+            parent["children"].append(node)
+
+    if published_only:
+        # an unpublished module hides everything below it
+        def prune(children):
+            children[:] = [child for child in children if child["is_published"]]
+            for child in children:
+                prune(child["children"])
+        prune(roots)
+    return roots
+
+
+def course_outline(course_id, published_only=False):
+    variant = "published" if published_only else "all"
+    key = f"lms:outline:{course_id}:{cache_version(course_group(CONTENTS, course_id))}:{variant}"
+
+    def build():
+        rows = list(CourseContent.objects
+                    .filter(course_id=course_id)
+                    .order_by("created_at", "id")
+                    .values(*OUTLINE_FIELDS))
+        return build_outline(rows, published_only)
+
+    return get_or_build(key, build)
@@ -0,0 +1,159 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, List, Optional
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from ninja import Field, Schema
+from ninja.errors import ValidationError
+from ninja.pagination import AsyncPaginationBase
+
+
+class KeysetPagination(AsyncPaginationBase):
+    # Cursor (keyset) pagination: every page reads page_size + 1 rows after the
+    # cursor's `(created_at, id)`, no COUNT(*) and no OFFSET. The cursor filter
+    # bounds the leading ordering field so an index on it gives a range scan
+    # instead of a full walk. Passing
+    # `page` switches to the classic page-number mode, which also returns the
+    # total count for clients that need it. Async views are paginated with the
+    # async ORM.
+
+    class Input(Schema):
+        cursor: Optional[str] = None
+        page: Optional[int] = Field(None, ge=1)
+        page_size: Optional[int] = Field(None, ge=1)
+
+    class Output(Schema):
+        items: List[Any]
+        next: Optional[str] = None
+        previous: Optional[str] = None
+        count: Optional[int] = None
+
+    def __init__(self, ordering=None, page_size=10, max_page_size=100, **kwargs):
+        self.ordering = tuple(ordering) if ordering else None
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        super().__init__(**kwargs)
+
+    def get_ordering(self, queryset):
+        ordering = list(self.ordering or queryset.model._meta.ordering)
+        names = [field.lstrip('-') for field in ordering]
+        if 'id' not in names and 'pk' not in names:
+            # tie-break on the primary key in the same direction as the last field
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return tuple('id' if field == 'pk' else '-id' if field == '-pk' else field
+                     for field in ordering)
+
+    def _get_page_size(self, requested):
+        if requested is None:
+            return self.page_size
+        return min(requested, self.max_page_size)
+
+    @staticmethod
+    def _reverse(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    @staticmethod
+    def encode_cursor(values, reverse=False):
+        data = json.dumps({'v': values, 'r': reverse}, default=str, separators=(',', ':'))
+        return urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def _to_python(model, name, value):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # annotations such as a search rank round-trip as plain JSON values
+            return value
+        return field.to_python(value)
+
+    def decode_cursor(self, model, ordering, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(urlsafe_b64decode(padded.encode()))
+            values = data['v']
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise ValueError(cursor)
+            values = [self._to_python(model, field.lstrip('-'), value)
+                      for field, value in zip(ordering, values)]
+            # the ordering fields are never NULL, a NULL would match nothing
+            if any(value is None for value in values):
+                raise ValueError(cursor)
+        except (ValueError, KeyError, TypeError, binascii.Error, DjangoValidationError):
+            raise ValidationError([{'cursor': 'Invalid cursor'}])
+        return values, bool(data.get('r'))
+
+    @staticmethod
+    def _after(ordering, values):
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), per-field direction.
+        # Databases do not turn that OR chain into an index range, so it is
+        # ANDed with the redundant a >= x which they do.
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            term = Q(**{f'{name}__{lookup}': values[index]})
+            for previous, value in zip(ordering[:index], values[:index]):
+                term &= Q(**{previous.lstrip('-'): value})
+            condition |= term
+        leading = ordering[0]
+        lookup = 'lte' if leading.startswith('-') else 'gte'
+        return Q(**{f'{leading.lstrip("-")}__{lookup}': values[0]}) & condition
+
+    def _values(self, item, ordering):
+        return [getattr(item, field.lstrip('-')) for field in ordering]
+
+    def _numbered(self, queryset, pagination, page_size):
+        offset = (pagination.page - 1) * page_size
+        queryset = queryset.order_by(*self.get_ordering(queryset))
+        return queryset, queryset[offset:offset + page_size]
+
+    def _keyset(self, queryset, pagination, page_size):
+        # (ordering, reverse, query for page_size + 1 rows)
+        ordering = self.get_ordering(queryset)
+        reverse = False
+        if pagination.cursor:
+            values, reverse = self.decode_cursor(queryset.model, ordering, pagination.cursor)
+            walk = self._reverse(ordering) if reverse else ordering
+            queryset = queryset.filter(self._after(walk, values)).order_by(*walk)
+        else:
+            queryset = queryset.order_by(*ordering)
+        return ordering, reverse, queryset[:page_size + 1]
+
+    def _page(self, rows, pagination, page_size, ordering, reverse):
+        has_more = len(rows) > page_size
+        items = rows[:page_size]
+        if reverse:
+            items.reverse()
+
+        next_cursor = previous_cursor = None
+        if items:
+            if has_more or reverse:
+                next_cursor = self.encode_cursor(self._values(items[-1], ordering))
+            if pagination.cursor and (has_more or not reverse):
+                previous_cursor = self.encode_cursor(self._values(items[0], ordering), reverse=True)
+        return {
+            'items': items,
+            'next': next_cursor,
+            'previous': previous_cursor,
+        }
+
+    def paginate_queryset(self, queryset, pagination: Input, request, **params):
+        page_size = self._get_page_size(pagination.page_size)
+        if pagination.page is not None and not pagination.cursor:
+            queryset, items = self._numbered(queryset, pagination, page_size)
+            return {'items': items, 'count': queryset.count()}
+
+        ordering, reverse, rows = self._keyset(queryset, pagination, page_size)
+        return self._page(list(rows), pagination, page_size, ordering, reverse)
+
+    async def apaginate_queryset(self, queryset, pagination: Input, request, **params):
+        page_size = self._get_page_size(pagination.page_size)
+        if pagination.page is not None and not pagination.cursor:
+            queryset, items = self._numbered(queryset, pagination, page_size)
+            return {'items': [item async for item in items], 'count': await queryset.acount()}
+
+        ordering, reverse, rows = self._keyset(queryset, pagination, page_size)
+        return self._page([row async for row in rows], pagination, page_size, ordering, reverse)
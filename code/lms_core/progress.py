@@ -0,0 +1,188 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Subquery
+
+from lms_core.models import Course, CourseMember, CourseContent, CompletionTracking, CourseProgress
+
+
+# CourseProgress counts completed *published* contents against the number of
+# published contents of the course. Every change below is a single atomic
+# F() update, a missing row is created from a full recount of that pair.
+
+# courses recounted at a time by rebuild_progress()
+REBUILD_BATCH = 500
+
+def _published_total(course_id):
+    return CourseContent.objects.filter(course_id=course_id, is_published=True).count()
+
+
+def _completed(student_id, course_id):
+    return CompletionTracking.objects.filter(student_id=student_id, completed=True,
+                                             content__course_id=course_id,
+                                             content__is_published=True)
+
+
+def ensure_progress(student_id, course_id):
+    # returns True when the row was created (and is therefore already current)
+    if CourseProgress.objects.filter(student_id=student_id, course_id=course_id).exists():
+        return False
+    completed = _completed(student_id, course_id).aggregate(count=Count('id'), last=Max('completed_at'))
+    try:
+        with transaction.atomic():
+            CourseProgress.objects.create(student_id=student_id, course_id=course_id,
+                                          completed_count=completed['count'],
+                                          total_contents=_published_total(course_id),
+                                          last_completed_at=completed['last'])
+    except IntegrityError:
+        return False
+    return True
+
+
+def ensure_progress_many(pairs):
+    # set-based ensure_progress for (student_id, course_id) pairs, returns the
+    # pairs whose row was created
+    pairs = set(pairs)
+    if not pairs:
+        return set()
+    student_ids = {student_id for student_id, _ in pairs}
+    course_ids = {course_id for _, course_id in pairs}
+    existing = set(CourseProgress.objects.filter(student_id__in=student_ids, course_id__in=course_ids)
+                   .values_list('student_id', 'course_id'))
+    missing = pairs - existing
+    if not missing:
+        return set()
+    totals = published_totals({course_id for _, course_id in missing})
+    completed = {(row['student_id'], row['content__course_id']): row for row in
+                 CompletionTracking.objects.filter(completed=True, content__is_published=True,
+                                                   student_id__in=student_ids,
+                                                   content__course_id__in=course_ids)
+                 .order_by().values('student_id', 'content__course_id')
+                 .annotate(count=Count('id'), last=Max('completed_at'))}
+    rows = []
+    for student_id, course_id in missing:
+        row = completed.get((student_id, course_id), {})
+        rows.append(CourseProgress(student_id=student_id, course_id=course_id,
+                                   completed_count=row.get('count', 0),
+                                   total_contents=totals.get(course_id, 0),
+                                   last_completed_at=row.get('last')))
+    CourseProgress.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    return missing
+
+
+def record_completion(student_id, content, completed_at):
+    if not content.is_published or ensure_progress(student_id, content.course_id_id):
+        return
+    CourseProgress.objects.filter(student_id=student_id, course_id=content.course_id_id).update(
+        completed_count=F('completed_count') + 1,
+        last_completed_at=completed_at,
+    )
+
+
+def remove_completion(student_id, content):
+    if not content.is_published or ensure_progress(student_id, content.course_id_id):
+        return
+    last = (_completed(student_id, content.course_id_id)
+            .order_by().values('student_id').annotate(last=Max('completed_at')).values('last'))
+    CourseProgress.objects.filter(student_id=student_id, course_id=content.course_id_id).update(
+        completed_count=F('completed_count') - 1,
+        last_completed_at=Subquery(last),
+    )
+
+
+def _completers(content):
+    return CompletionTracking.objects.filter(content=content, completed=True).values('student_id')
+
+
+def content_published_changed(content, published):
+    delta = 1 if published else -1
+    CourseProgress.objects.filter(course_id=content.course_id_id).update(
+        total_contents=F('total_contents') + delta)
+    CourseProgress.objects.filter(course_id=content.course_id_id,
+                                  student_id__in=_completers(content)).update(
+        completed_count=F('completed_count') + delta)
+
+
+def _course_batches(course_ids, batch_size):
+    if course_ids is None:
+        course_ids = Course.objects.order_by('id').values_list('id', flat=True)
+    course_ids = list(course_ids)
+    for start in range(0, len(course_ids), batch_size):
+        yield course_ids[start:start + batch_size]
+
+
+def rebuild_progress(course_ids=None, batch_size=REBUILD_BATCH):
+    # recounts a batch of courses at a time, so memory is bounded by the
+    # rows of one batch rather than the whole table
+    total = 0
+    with transaction.atomic():
+        for batch in _course_batches(course_ids, batch_size):
+            expected = compute_progress(batch)
+            CourseProgress.objects.filter(course_id__in=batch).delete()
+            CourseProgress.objects.bulk_create(
+                (CourseProgress(student_id=student_id, course_id=course_id, **values)
+                 for (student_id, course_id), values in expected.items()),
+                batch_size=1000)
+            total += len(expected)
+    return total
+
+
+def published_totals(course_ids=None):
+    contents = CourseContent.objects.filter(is_published=True)
+    if course_ids is not None:
+        contents = contents.filter(course_id__in=course_ids)
+    return dict(contents.order_by().values('course_id').annotate(total=Count('id'))
+                .values_list('course_id', 'total'))
+
+
+def compute_progress(course_ids=None, totals=None):
+    if totals is None:
+        totals = published_totals(course_ids)
+    members = CourseMember.objects.all()
+    completed = CompletionTracking.objects.filter(completed=True, content__is_published=True)
+    if course_ids is not None:
+        members = members.filter(course_id__in=course_ids)
+        completed = completed.filter(content__course_id__in=course_ids)
+
+    expected = {}
+    for student_id, course_id in members.order_by().values_list('user_id', 'course_id').distinct():
+        expected[(student_id, course_id)] = {
+            'completed_count': 0, 'total_contents': totals.get(course_id, 0), 'last_completed_at': None}
+
+    completed = (completed.order_by().values('student_id', 'content__course_id')
+                 .annotate(count=Count('id'), last=Max('completed_at')))
+    for row in completed:
+        expected[(row['student_id'], row['content__course_id'])] = {
+            'completed_count': row['count'],
+            'total_contents': totals.get(row['content__course_id'], 0),
+            'last_completed_at': row['last'],
+        }
+    return expected
+
+
+def verify_progress(course_ids=None, batch_size=REBUILD_BATCH):
+    # compared a batch of courses at a time, like rebuild_progress()
+    mismatches = []
+    for batch in _course_batches(course_ids, batch_size):
+        mismatches.extend(_verify_batch(batch))
+    return mismatches
+
+
+def _verify_batch(course_ids):
+    totals = published_totals(course_ids)
+    expected = compute_progress(course_ids, totals)
+    actual = {(row['student_id'], row['course_id']): row for row in
+              CourseProgress.objects.filter(course_id__in=course_ids)
+              .values('student_id', 'course_id', 'completed_count', 'total_contents',
+                      'last_completed_at')}
+
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        row = actual.get(key)
+        values = expected.get(key) or {
+            'completed_count': 0, 'total_contents': totals.get(key[1], 0), 'last_completed_at': None}
+        if row is None:
+            # members without any completion do not need a row yet
+            if values['completed_count']:
+                mismatches.append((key, values, None))
+        elif any(row[field] != value for field, value in values.items()):
+            mismatches.append((key, values, row))
+    return mismatches
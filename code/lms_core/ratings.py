@@ -0,0 +1,63 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from lms_core.models import CourseFeedback, CourseRating
+from lms_core.cache import RATINGS, course_group, invalidate, invalidate_catalogue
+
+
+def rating_aggregates(feedbacks):
+    return feedbacks.aggregate(
+        count=Count('id'),
+        total=Sum('rating', default=0),
+        **{f'star_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)},
+    )
+
+
+def rating_summary(rating):
+    if rating is None:
+        return {'count': 0, 'average': 0.0, 'histogram': {star: 0 for star in range(1, 6)}}
+    return {'count': rating.count, 'average': rating.average, 'histogram': rating.histogram}
+
+
+def _apply(course_id, **changes):
+    updated = CourseRating.objects.filter(course_id=course_id).update(
+        **{field: F(field) + delta for field, delta in changes.items() if delta})
+    if not updated:
+        # first rating of the course (or a missing row): count it from scratch,
+        # the feedback being changed is already saved at this point
+        try:
+            with transaction.atomic():
+                CourseRating.objects.create(
+                    course_id=course_id,
+                    **rating_aggregates(CourseFeedback.objects.filter(course_id=course_id)))
+        except IntegrityError:
+            return _apply(course_id, **changes)
+    # the course's detail and the course lists, not the rest of the catalogue
+    invalidate(course_group(RATINGS, course_id))
+    invalidate(RATINGS)
+
+
+def add_rating(course_id, rating):
+    _apply(course_id, count=1, total=rating, **{f'star_{rating}': 1})
+
+
+def change_rating(course_id, old, new):
+    if old == new:
+        return
+    _apply(course_id, total=new - old, **{f'star_{old}': -1, f'star_{new}': 1})
+
+
+def remove_rating(course_id, rating):
+    _apply(course_id, count=-1, total=-rating, **{f'star_{rating}': -1})
+
+
+def rebuild_ratings():
+    # recount every course from CourseFeedback, for bulk loads that bypass add_rating()
+    stats = (CourseFeedback.objects.order_by().values('course_id')
+             .annotate(count=Count('id'), total=Sum('rating'),
+                       **{f'star_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}))
+    with transaction.atomic():
+        CourseRating.objects.all().delete()
+        CourseRating.objects.bulk_create([CourseRating(**row) for row in stats], batch_size=1000)
+    invalidate_catalogue()
+    return len(stats)
@@ -0,0 +1,45 @@
+import json
+
+from django.http import HttpResponse
+from ninja.renderers import BaseRenderer
+from ninja.responses import NinjaJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json keeps working, only slower
+    orjson = None
+
+
+# orjson encodes datetimes, UUIDs and dataclasses natively and much faster
+# than json + DjangoJSONEncoder. Anything it does not know (Decimal, lazy
+# translation strings, pydantic models, ...) goes through ninja's encoder, so
+# the output stays the same apart from datetimes keeping their microseconds.
+
+_fallback = NinjaJSONEncoder()
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(data):
+    # JSON bytes for `data`
+    if orjson is None:
+        return json.dumps(data, cls=NinjaJSONEncoder).encode()
+    return orjson.dumps(data, default=_fallback.default, option=ORJSON_OPTIONS)
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+
+    def render(self, request, data, *, response_status):
+        return dumps(data)
+
+
+class JsonResponse(HttpResponse):
+    # Drop-in for django.http.JsonResponse that serializes with dumps().
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
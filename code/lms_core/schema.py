@@ -1,8 +1,12 @@
-from ninja import Schema
-from typing import Optional
+from ninja import Field, Schema
+from typing import List, Optional
 from datetime import datetime
+from uuid import UUID
 
 from django.contrib.auth.models import User
+from lms_core.attachments import chunk_size
+from lms_core.images import variant_urls
+from lms_core.ratings import rating_summary
 
 class UserOut(Schema):
     id: int
@@ -17,10 +21,29 @@ class CourseSchemaOut(Schema):
     description: str
     price: int
     image : Optional[str]
+    image_variants: Optional[dict[str, dict[str, str]]] = None
     teacher: UserOut
     created_at: datetime
     updated_at: datetime
 
+    @staticmethod
+    def resolve_image_variants(obj):
+        # {"thumb"|"card"|"full": {"webp"|"jpeg": url}}, None until they are generated
+        return variant_urls(obj.image, obj.image_variants)
+
+class CourseRatingOut(Schema):
+    count: int
+    average: float
+    histogram: dict[int, int]
+
+
+class CourseDetailOut(CourseSchemaOut):
+    rating: CourseRatingOut
+
+    @staticmethod
+    def resolve_rating(obj):
+        return rating_summary(getattr(obj, 'rating', None))
+
 class CourseMemberOut(Schema):
     id: int 
     course_id: CourseSchemaOut
@@ -62,13 +85,24 @@ class CourseCommentOut(Schema):
     created_at: datetime
     updated_at: datetime
 
+class CommentListOut(Schema):
+    id: int
+    author: str
+    created_at: datetime
+    comment: str
+
+    @staticmethod
+    def resolve_author(obj):
+        user = obj.member_id.user_id
+        return user.get_full_name() or user.username
+
 class CourseCommentIn(Schema):
     comment: str
 
 
 class CourseFeedbackCreateSchema(Schema):
     course_id: int
-    rating: int
+    rating: int = Field(ge=1, le=5)
     feedback: str = None
     created_by: str
     show_date: datetime
@@ -85,7 +119,7 @@ class CourseFeedbackResponseSchema(Schema):
     updated_at: datetime
 
 class FeedbackUpdateSchema(Schema):
-    rating: int
+    rating: int = Field(ge=1, le=5)
     feedback: str
 
 class CategoryCreate(Schema):
@@ -114,6 +148,24 @@ class CompletionTrackingCreateSchema(Schema):
     course_id: int
     
     
+class EnrollmentItemSchema(Schema):
+    username: str
+    course_id: int
+
+
+class BatchEnrollmentSchema(Schema):
+    items: List[EnrollmentItemSchema] = Field(..., min_length=1, max_length=1000)
+
+
+class CompletionItemSchema(Schema):
+    student_username: str
+    content_id: int
+
+
+class BatchCompletionSchema(Schema):
+    items: List[CompletionItemSchema] = Field(..., min_length=1, max_length=1000)
+
+
 class CompletionTrackingResponseSchema(Schema):
     content_name: str  
     completed_at: datetime  
@@ -140,4 +192,25 @@ class GetCourseContentSchema(Schema):
     
 class UserRoleSchema(Schema):
     username: str  
-    is_teacher: Optional[bool] = None
\ No newline at end of file
+    is_teacher: Optional[bool] = None
+
+
+class UploadStartIn(Schema):
+    filename: str = Field(..., min_length=1, max_length=255)
+    size: int
+    sha256: str
+
+
+class UploadOut(Schema):
+    id: UUID
+    filename: str
+    size: int
+    offset: int
+    status: str
+    error: str
+    chunk_size: int = 0
+
+    @staticmethod
+    def resolve_chunk_size(obj):
+        # largest body accepted by one PUT /uploads/{id}
+        return chunk_size()
@@ -0,0 +1,30 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+from lms_core.models import Course
+
+
+SEARCH_CONFIG = 'english'
+
+
+def full_text_available():
+    return connection.vendor == 'postgresql'
+
+
+def course_search_query(text):
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def search_courses(text, queryset=None):
+    # Courses matching `text`, annotated with `rank` (higher is better).
+    # PostgreSQL uses the GIN indexed search_vector; elsewhere it falls back
+    # to icontains with name matches ranked above description matches.
+    queryset = Course.objects.all() if queryset is None else queryset
+    if full_text_available():
+        query = course_search_query(text)
+        return (queryset.filter(search_vector=query)
+                .annotate(rank=SearchRank(F('search_vector'), query)))
+    return (queryset.filter(Q(name__icontains=text) | Q(description__icontains=text))
+            .annotate(rank=Case(When(name__icontains=text, then=Value(1.0)),
+                                default=Value(0.5), output_field=FloatField())))
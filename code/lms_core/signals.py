@@ -0,0 +1,120 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from lms_core.claims import touch_claims
+from lms_core.cache import CONTENTS, course_group, invalidate, invalidate_catalogue
+from lms_core.identity import identity_cache
+from lms_core.images import schedule_variants
+from lms_core.membership import membership_cache
+from lms_core.models import Course, CourseCategory, CourseContent, CourseMember, Profile
+from lms_core.progress import content_published_changed, rebuild_progress
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=CourseCategory)
+@receiver(post_delete, sender=CourseCategory)
+def course_changed(sender, **kwargs):
+    invalidate_catalogue()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def teacher_changed(sender, instance, update_fields=None, **kwargs):
+    # logins only touch last_login, which is not part of any course response
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    if Course.objects.filter(teacher_id=instance.pk).exists():
+        invalidate_catalogue()
+
+
+@receiver(pre_save, sender=CourseContent)
+def content_moving(sender, instance, update_fields=None, **kwargs):
+    # remember the course a content is moved out of for the handlers below
+    instance._previous_course_id = None
+    if instance._state.adding or (update_fields is not None and 'course_id' not in update_fields):
+        return
+    previous = CourseContent.objects.filter(pk=instance.pk).values_list('course_id', flat=True).first()
+    if previous is not None and previous != instance.course_id_id:
+        instance._previous_course_id = previous
+
+
+def _content_courses(instance):
+    previous = getattr(instance, '_previous_course_id', None)
+    return [instance.course_id_id] + ([previous] if previous is not None else [])
+
+
+@receiver(post_save, sender=CourseContent)
+@receiver(post_delete, sender=CourseContent)
+def content_changed(sender, instance, **kwargs):
+    invalidate(CONTENTS)
+    for course_id in _content_courses(instance):
+        invalidate(course_group(CONTENTS, course_id))
+
+
+@receiver(post_save, sender=CourseContent)
+def content_course_changed(sender, instance, **kwargs):
+    membership_cache.put_content(instance.pk, instance.course_id_id)
+
+
+@receiver(post_delete, sender=CourseContent)
+def content_course_removed(sender, instance, **kwargs):
+    membership_cache.evict_content(instance.pk)
+
+
+@receiver(post_save, sender=CourseContent)
+def content_created(sender, instance, created, **kwargs):
+    if created and instance.is_published:
+        content_published_changed(instance, True)
+
+
+@receiver(post_save, sender=CourseContent)
+def content_moved(sender, instance, **kwargs):
+    # the completions move with the content, recount both courses
+    previous = getattr(instance, '_previous_course_id', None)
+    if previous is not None:
+        rebuild_progress([previous, instance.course_id_id])
+
+
+@receiver(pre_delete, sender=CourseContent)
+def content_deleted(sender, instance, **kwargs):
+    # before the cascade removes the completions we need to count; the
+    # instance may be stale, so ask the database whether it is published
+    if CourseContent.objects.filter(pk=instance.pk, is_published=True).exists():
+        content_published_changed(instance, False)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_identity_changed(sender, instance, **kwargs):
+    identity_cache.evict(instance.pk, instance.username)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def profile_identity_changed(sender, instance, **kwargs):
+    identity_cache.evict(instance.user_id)
+
+
+@receiver(post_save, sender=CourseMember)
+@receiver(post_delete, sender=CourseMember)
+def membership_changed(sender, instance, **kwargs):
+    membership_cache.evict(instance.course_id_id, instance.user_id_id)
+    touch_claims(instance.user_id_id)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def role_changed(sender, instance, **kwargs):
+    touch_claims(instance.user_id)
+
+
+@receiver(post_save, sender=Course)
+def course_image_changed(sender, instance, **kwargs):
+    schedule_variants(instance, 'image', 'image_variants')
+
+
+@receiver(post_save, sender=Profile)
+def profile_picture_changed(sender, instance, **kwargs):
+    schedule_variants(instance, 'profile_picture', 'picture_variants')
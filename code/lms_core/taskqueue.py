@@ -0,0 +1,199 @@
+import logging
+import random
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Q
+from django.utils import timezone
+
+from lms_core.models import Task
+
+logger = logging.getLogger(__name__)
+
+# A small task queue kept in the Task table, so side work does not need a
+# broker. Workers claim due tasks with SELECT ... FOR UPDATE SKIP LOCKED, so
+# any number of them can poll the table without blocking each other or
+# running a task twice. Enqueueing inside a transaction only makes the task
+# visible once it commits. A failed task is retried with exponential backoff
+# until max_attempts; a task whose worker died is retried once its lease
+# (LMS_TASK_LEASE seconds, longer than any task should run) runs out.
+
+MAX_BACKOFF = 3600
+
+
+def _lease():
+    return getattr(settings, 'LMS_TASK_LEASE', 900)
+
+
+class TaskType:
+
+    def __init__(self, name, func, max_attempts, backoff):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    def retry_delay(self, attempts):
+        # exponential with jitter, so tasks failing together do not retry together
+        delay = min(self.backoff * 2 ** (attempts - 1), MAX_BACKOFF)
+        return delay * random.uniform(0.5, 1.0)
+
+
+TASKS = {}
+
+
+def task(name, max_attempts=5, backoff=10):
+    # Register func(**payload) as task `name`, see enqueue().
+    def decorator(func):
+        TASKS[name] = TaskType(name, func, max_attempts, backoff)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, dedup_key=None, delay=0, max_attempts=None):
+    if name not in TASKS:
+        raise ValueError(f"Unknown task: {name}")
+    fields = {
+        'name': name,
+        'payload': payload or {},
+        'dedup_key': dedup_key,
+        'run_at': timezone.now() + timedelta(seconds=delay),
+        'max_attempts': max_attempts or TASKS[name].max_attempts,
+    }
+    if dedup_key is None:
+        return Task.objects.create(**fields)
+    while True:
+        try:
+            with transaction.atomic():
+                return Task.objects.create(**fields)
+        except IntegrityError:
+            queued = Task.objects.filter(dedup_key=dedup_key, status='queued').first()
+            if queued is not None:
+                return queued
+            # claimed by a worker in between, it may have started on old data
+
+
+def claim(worker, limit=1):
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(Task.objects.select_for_update(skip_locked=True)
+                     .filter(status='queued', run_at__lte=now).order_by('run_at', 'id')[:limit])
+        if tasks:
+            Task.objects.filter(id__in=[item.id for item in tasks]).update(
+                status='running', locked_by=worker, locked_at=now, started_at=now,
+                attempts=F('attempts') + 1)
+    for item in tasks:
+        item.status, item.locked_by, item.locked_at, item.started_at = 'running', worker, now, now
+        item.attempts += 1
+    return tasks
+
+
+def _fail(item, error, duration):
+    now = timezone.now()
+    task_type = TASKS.get(item.name)
+    fields = {'locked_by': '', 'locked_at': None, 'finished_at': now, 'duration': duration,
+              'last_error': error}
+    if task_type is not None and item.attempts < item.max_attempts:
+        run_at = now + timedelta(seconds=task_type.retry_delay(item.attempts))
+        try:
+            with transaction.atomic():
+                Task.objects.filter(pk=item.pk).update(status='queued', run_at=run_at, **fields)
+            return 'queued'
+        except IntegrityError:
+            # the same work was enqueued again meanwhile, that task will do it
+            Task.objects.filter(pk=item.pk).update(status='done', **fields)
+            return 'done'
+    Task.objects.filter(pk=item.pk).update(status='failed', **fields)
+    return 'failed'
+
+
+def execute(item):
+    # run a claimed task, returns its new status
+    task_type = TASKS.get(item.name)
+    start_time = time.perf_counter()
+    try:
+        if task_type is None:
+            raise LookupError(f"Unknown task: {item.name}")
+        task_type.func(**item.payload)
+    except Exception:
+        duration = time.perf_counter() - start_time
+        status = _fail(item, traceback.format_exc(), duration)
+        logger.warning("Task %s #%s failed (attempt %s/%s), %s", item.name, item.pk,
+                       item.attempts, item.max_attempts, status, exc_info=True)
+        return status
+    Task.objects.filter(pk=item.pk).update(
+        status='done', locked_by='', locked_at=None, finished_at=timezone.now(),
+        duration=time.perf_counter() - start_time, last_error='')
+    return 'done'
+
+
+def reap():
+    # a task claimed longer than the lease ago is taken as lost with its worker
+    # (killed, out of memory, ...): its attempt counts as failed
+    expired = timezone.now() - timedelta(seconds=_lease())
+    with transaction.atomic():
+        stale = list(Task.objects.select_for_update(skip_locked=True)
+                     .filter(status='running', locked_at__lt=expired))
+        for item in stale:
+            _fail(item, f"lease expired on {item.locked_by}", None)
+    return len(stale)
+
+
+def work(worker, stop=None, burst=False, poll=1.0):
+    # claim and run tasks until `stop` is set, or until none is due with burst=True
+    processed = 0
+    next_reap = 0
+    while not (stop is not None and stop.is_set()):
+        try:
+            if time.monotonic() >= next_reap:
+                reap()
+                next_reap = time.monotonic() + 60
+            tasks = claim(worker)
+        except DatabaseError:
+            # e.g. the database restarting, keep the worker alive and poll again
+            logger.warning("Worker %s cannot claim tasks", worker, exc_info=True)
+            connection.close()
+            tasks = []
+        if not tasks:
+            if burst:
+                break
+            if stop is not None:
+                stop.wait(poll)
+            else:
+                time.sleep(poll)
+            continue
+        for item in tasks:
+            execute(item)
+            processed += 1
+    return processed
+
+
+def run_pending(worker='inline'):
+    # run every task that is due in this process, for tests and scripts
+    return work(worker, burst=True)
+
+
+def task_metrics(since=None):
+    # per task name: counts by status and timings in seconds
+    tasks = Task.objects.all()
+    if since is not None:
+        tasks = tasks.filter(created_at__gte=since)
+    latency = ExpressionWrapper(F('finished_at') - F('created_at'), output_field=DurationField())
+    rows = (tasks.order_by().values('name').annotate(
+        queued=Count('id', filter=Q(status='queued')),
+        running=Count('id', filter=Q(status='running')),
+        done=Count('id', filter=Q(status='done')),
+        failed=Count('id', filter=Q(status='failed')),
+        retries=Count('id', filter=Q(attempts__gt=1)),
+        avg_duration=Avg('duration', filter=Q(status='done')),
+        max_duration=Max('duration', filter=Q(status='done')),
+        avg_latency=Avg(latency, filter=Q(status='done')),
+    ).order_by('name'))
+    metrics = []
+    for row in rows:
+        row['avg_latency'] = row['avg_latency'].total_seconds() if row['avg_latency'] is not None else None
+        metrics.append(row)
+    return metrics
@@ -0,0 +1,30 @@
+from django.apps import apps
+from django.core.management import call_command
+
+from lms_core import attachments
+from lms_core.images import process_image
+from lms_core.taskqueue import task
+
+# Tasks run by `manage.py run_workers`, registered when the app is ready.
+
+
+@task('images.variants', max_attempts=3)
+def image_variants(model, pk, field, variants_field):
+    process_image(apps.get_model(model), pk, field, variants_field)
+
+
+@task('command', max_attempts=1)
+def management_command(name, args=()):
+    # long management commands (import_lms, rebuild_progress, ...) queued
+    # with `manage.py enqueue`
+    call_command(name, *args)
+
+
+@task('uploads.finalize', max_attempts=3)
+def finalize_upload(upload_id):
+    attachments.finalize_upload(upload_id)
+
+
+@task('uploads.expire', max_attempts=3)
+def expire_uploads():
+    attachments.expire_uploads()
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.test import override_settings
+from silk.collector import DataCollector
+
+# silk records every request in its own tables, which would show up in
+# assertNumQueries; query count tests run without it.
+_no_silk_middleware = override_settings(
+    MIDDLEWARE=[middleware for middleware in settings.MIDDLEWARE if not middleware.startswith('silk.')]
+)
+
+
+def without_silk(test_class):
+    test_class = _no_silk_middleware(test_class)
+    set_up_class = test_class.setUpClass.__func__
+
+    @classmethod
+    def setUpClass(cls):
+        # a request recorded by an earlier test would keep silk's SQL hook active
+        DataCollector().clear()
+        set_up_class(cls)
+
+    test_class.setUpClass = setUpClass
+    return test_class
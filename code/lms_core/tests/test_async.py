@@ -0,0 +1,111 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from lms_core import api
+from lms_core.models import Course, CourseMember, CourseContent, Comment
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class AsyncReadTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.courses = [Course.objects.create(name=f"Course {num}", description="-", price=100,
+                                              teacher=self.teacher) for num in range(15)]
+        self.course = self.courses[0]
+        self.contents = [CourseContent.objects.create(course_id=self.course, name=f"Lesson {num}")
+                         for num in range(3)]
+        member = CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        CourseMember.objects.create(course_id=self.courses[1], user_id=self.student)
+        for num in range(3):
+            Comment.objects.create(content_id=self.contents[0], member_id=member, comment=f"comment {num}")
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'student', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'Authorization': 'Bearer ' + login.json()['access']}
+
+    def test_read_paths_are_async(self):
+        for view in (api.list_courses, api.detail_course, api.list_content_course,
+                     api.my_courses, api.list_content_comment):
+            self.assertTrue(iscoroutinefunction(view), view.__name__)
+
+    @override_settings(LMS_ASYNC_VIEWS=False)
+    def test_read_view_stays_sync_for_wsgi(self):
+        view = api.read_view(get=True)(lambda request, course_id: Course.objects.filter(id=course_id))
+        self.assertFalse(iscoroutinefunction(view))
+        self.assertEqual(view(None, self.course.id), self.course)
+
+    async def test_list_courses(self):
+        response = await self.async_client.get(f'{self.base_url}courses')
+        first = response.json()
+        self.assertEqual(len(first['items']), 10)
+        response = await self.async_client.get(f'{self.base_url}courses', {'cursor': first['next']})
+        self.assertEqual(len(response.json()['items']), 5)
+        response = await self.async_client.get(f'{self.base_url}courses', {'page': 2})
+        self.assertEqual(response.json()['count'], 15)
+
+    def test_cached_detail_skips_database(self):
+        # CaptureQueriesContext is sync only, the sync client runs the async view through async_to_sync
+        url = f'{self.base_url}courses/{self.course.id}'
+        response = self.client.get(url)
+        self.assertEqual(response.json()['teacher']['id'], self.teacher.id)
+        with CaptureQueriesContext(connection) as queries:
+            again = self.client.get(url)
+        self.assertEqual(again.content, response.content)
+        self.assertEqual(len(queries), 0)
+
+    @override_settings(LMS_CONDITIONAL_GET=True)
+    async def test_cache_is_not_used_on_the_event_loop(self):
+        # the async cache API runs the sync one in a thread, calling it
+        # directly from the view would block the event loop
+        def off_the_loop(method):
+            def call(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return method(*args, **kwargs)
+                raise AssertionError(f"cache.{method.__name__}() called on the event loop")
+            return call
+
+        with mock.patch.object(cache, 'get_or_set', off_the_loop(cache.get_or_set)), \
+                mock.patch.object(cache, 'get', off_the_loop(cache.get)):
+            for url in (f'{self.base_url}courses', f'{self.base_url}courses/{self.course.id}',
+                        f'{self.base_url}courses/{self.course.id}/contents'):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200, url)
+                self.assertTrue(response.has_header('ETag'), url)
+
+    async def test_list_contents_sparse(self):
+        response = await self.async_client.get(f'{self.base_url}courses/{self.course.id}/contents',
+                                               {'fields': 'id,name'})
+        self.assertEqual(response.json()['items'], [{'id': content.id, 'name': content.name}
+                                                    for content in self.contents])
+
+    async def test_my_courses_normalized(self):
+        response = await self.async_client.get(f'{self.base_url}mycourses', {'format': 'normalized'},
+                                               headers=self.headers)
+        data = response.json()
+        self.assertEqual(sorted(item['course_id'] for item in data['items']),
+                         [self.course.id, self.courses[1].id])
+        self.assertEqual(set(data['included']['users']), {str(self.student.id), str(self.teacher.id)})
+
+    async def test_list_comments(self):
+        response = await self.async_client.get(f'{self.base_url}contents/{self.contents[0].id}/comments',
+                                               headers=self.headers)
+        self.assertEqual([item['comment'] for item in response.json()['items']],
+                         [f'comment {num}' for num in range(3)])
+        response = await self.async_client.get(f'{self.base_url}contents/{self.contents[0].id}/comments')
+        self.assertEqual(response.status_code, 401)
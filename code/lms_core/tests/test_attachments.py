@@ -0,0 +1,227 @@
+import base64
+import hashlib
+import json
+import os
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from lms_core.attachments import expire_uploads, parse_range, partial_path, write_chunk, UploadError
+from lms_core.models import AttachmentUpload, Course, CourseContent, CourseMember
+from lms_core.taskqueue import run_pending
+
+
+class AttachmentTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        media = override_settings(MEDIA_ROOT=self.media, LMS_UPLOAD_DIR=os.path.join(self.media, 'partial'),
+                                  LMS_UPLOAD_CHUNK_SIZE=1024)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.outsider = User.objects.create_user(username='outsider', password='password123')
+        self.course = Course.objects.create(name='Course', description='-', price=100, teacher=self.teacher)
+        self.content = CourseContent.objects.create(name='Lesson', course_id=self.course, is_published=True)
+        CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        self.data = os.urandom(2500)
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+
+    def auth(self, username):
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': username, 'password': 'password123'}),
+                                 content_type='application/json')
+        return {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+
+    def start(self, headers, sha256=None):
+        return self.client.post(f'{self.base_url}contents/{self.content.id}/uploads',
+                                data=json.dumps({'filename': '../notes final.pdf', 'size': len(self.data),
+                                                 'sha256': sha256 or self.sha256}),
+                                content_type='application/json', **headers)
+
+    def put(self, headers, upload_id, offset, chunk, **extra):
+        return self.client.put(f'{self.base_url}uploads/{upload_id}?offset={offset}', data=chunk,
+                               content_type='application/octet-stream', **headers, **extra)
+
+    def upload(self, headers):
+        upload = self.start(headers).json()
+        for offset in range(0, len(self.data), upload['chunk_size']):
+            response = self.put(headers, upload['id'], offset, self.data[offset:offset + upload['chunk_size']])
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'verifying')
+        run_pending()
+        self.content.refresh_from_db()
+        return upload['id']
+
+    def test_chunked_upload_is_verified_and_stored(self):
+        headers = self.auth('teacher')
+        upload_id = self.upload(headers)
+        self.assertEqual(self.client.get(f'{self.base_url}uploads/{upload_id}', **headers).json()['status'],
+                         'complete')
+        self.assertEqual(self.content.file_attachment.name, f'attachments/{self.content.id}/notes_final.pdf')
+        self.assertEqual(self.content.file_size, len(self.data))
+        self.assertEqual(self.content.file_sha256, self.sha256)
+        with self.content.file_attachment.open('rb') as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertEqual(os.listdir(os.path.join(self.media, 'partial')), [])
+
+    def test_resume_after_interrupted_chunk(self):
+        headers = self.auth('teacher')
+        upload_id = self.start(headers).json()['id']
+        self.assertEqual(self.put(headers, upload_id, 0, self.data[:1024]).status_code, 200)
+        # a chunk at the wrong offset tells the client where to continue
+        response = self.put(headers, upload_id, 2048, self.data[2048:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 1024)
+        # a corrupted chunk is discarded
+        response = self.put(headers, upload_id, 1024, self.data[1024:2048],
+                            HTTP_X_CHUNK_SHA256=hashlib.sha256(b'other').hexdigest())
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(f'{self.base_url}uploads/{upload_id}', **headers).json()['offset'], 1024)
+        self.assertEqual(self.put(headers, upload_id, 1024, self.data[1024:2048],
+                                  HTTP_X_CHUNK_SHA256=hashlib.sha256(self.data[1024:2048]).hexdigest()).status_code,
+                         200)
+        self.assertEqual(self.put(headers, upload_id, 2048, self.data[2048:]).json()['status'], 'verifying')
+        run_pending()
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.file_sha256, self.sha256)
+
+    def test_chunk_is_received_before_locking(self):
+        headers = self.auth('teacher')
+        upload_id = self.start(headers).json()['id']
+        self.put(headers, upload_id, 0, self.data[:1024])
+        data = self.data
+
+        class SlowClient(io.BytesIO):
+            # the same chunk arrives through another request while this one streams
+            def read(self, size=-1):
+                AttachmentUpload.objects.filter(pk=upload_id).update(offset=2048)
+                return super().read(size)
+
+        with self.assertRaises(UploadError) as raised:
+            write_chunk(upload_id, 1024, SlowClient(b'x' * 1024), 1024)
+        self.assertEqual(raised.exception.status, 409)
+        upload = AttachmentUpload.objects.get(pk=upload_id)
+        with open(partial_path(upload), 'rb') as partial:
+            self.assertEqual(partial.read(), data[:1024])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.media, 'partial'))), [f'{upload_id}.part'])
+
+    def test_abandoned_upload_expires(self):
+        headers = self.auth('teacher')
+        upload_id = self.start(headers).json()['id']
+        self.put(headers, upload_id, 0, self.data[:1024])
+        active_id = self.start(headers).json()['id']
+        self.assertEqual(expire_uploads(), 0)
+        AttachmentUpload.objects.filter(pk=upload_id).update(updated_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(expire_uploads(), 1)
+        upload = AttachmentUpload.objects.get(pk=upload_id)
+        self.assertEqual((upload.status, upload.error), ('failed', "Upload expired"))
+        self.assertEqual(os.listdir(os.path.join(self.media, 'partial')), [f'{active_id}.part'])
+        self.assertEqual(self.put(headers, upload_id, 1024, self.data[1024:2048]).status_code, 409)
+
+    def test_replaced_attachment_is_removed(self):
+        headers = self.auth('teacher')
+        self.upload(headers)
+        first = self.content.file_attachment.name
+        self.upload(headers)
+        self.assertNotEqual(self.content.file_attachment.name, first)
+        self.assertFalse(default_storage.exists(first))
+        self.assertTrue(default_storage.exists(self.content.file_attachment.name))
+
+    def test_checksum_mismatch_fails_upload(self):
+        headers = self.auth('teacher')
+        upload_id = self.start(headers, sha256='0' * 64).json()['id']
+        for offset in range(0, len(self.data), 1024):
+            self.put(headers, upload_id, offset, self.data[offset:offset + 1024])
+        run_pending()
+        upload = AttachmentUpload.objects.get(id=upload_id)
+        self.assertEqual(upload.status, 'failed')
+        self.content.refresh_from_db()
+        self.assertFalse(self.content.file_attachment)
+
+    def test_oversized_chunk_is_refused(self):
+        headers = self.auth('teacher')
+        upload_id = self.start(headers).json()['id']
+        self.assertEqual(self.put(headers, upload_id, 0, self.data[:1500]).status_code, 400)
+
+    def test_only_teacher_uploads(self):
+        self.assertEqual(self.start(self.auth('student')).status_code, 403)
+        self.assertEqual(self.start(self.auth('teacher'), sha256='xyz').status_code, 400)
+
+    def test_range_download(self):
+        self.upload(self.auth('teacher'))
+        headers = self.auth('student')
+        url = f'{self.base_url}contents/{self.content.id}/attachment'
+
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], f'"{self.sha256}"')
+        self.assertEqual(response['Repr-Digest'],
+                         f'sha-256=:{base64.b64encode(hashlib.sha256(self.data).digest()).decode()}:')
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-199', **headers)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.data)}')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join(response.streaming_content), self.data[100:200])
+
+        response = self.client.get(url, HTTP_RANGE='bytes=2000-', HTTP_IF_RANGE=f'"{self.sha256}"', **headers)
+        self.assertEqual(b''.join(response.streaming_content), self.data[2000:])
+        response = self.client.get(url, HTTP_RANGE='bytes=2000-', HTTP_IF_RANGE='"stale"', **headers)
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+        response = self.client.get(url, HTTP_RANGE='bytes=5000-', **headers)
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+        self.assertEqual(self.client.get(url, **self.auth('outsider')).status_code, 403)
+
+    def test_download_after_attachment_is_replaced_by_path(self):
+        teacher = self.auth('teacher')
+        self.upload(teacher)
+        default_storage.save('attachments/other.txt', io.BytesIO(b'tiny'))
+        response = self.client.put(f'{self.base_url}update-content/{self.content.id}/',
+                                   data=json.dumps({'file_attachment': 'attachments/other.txt'}),
+                                   content_type='application/json', **teacher)
+        self.assertEqual(response.status_code, 200)
+        self.content.refresh_from_db()
+        self.assertIsNone(self.content.file_size)
+        self.assertEqual(self.content.file_sha256, '')
+
+        headers = self.auth('student')
+        url = f'{self.base_url}contents/{self.content.id}/attachment'
+        response = self.client.get(url, **headers)
+        self.assertEqual(response['Content-Length'], '4')
+        self.assertNotIn('ETag', response)
+        self.assertEqual(b''.join(response.streaming_content), b'tiny')
+
+        # a stored size that no longer matches the file is not trusted either
+        CourseContent.objects.filter(pk=self.content.pk).update(file_size=5000, file_sha256=self.sha256)
+        response = self.client.get(url, HTTP_RANGE='bytes=1-', **headers)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 1-3/4')
+        self.assertNotIn('ETag', response)
+        self.assertEqual(b''.join(response.streaming_content), b'iny')
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=990-2000', 1000), (990, 999))
+        self.assertIsNone(parse_range('bytes=0-1,5-9', 1000))
+        self.assertIsNone(parse_range(None, 1000))
+        with self.assertRaises(UploadError):
+            parse_range('bytes=1000-', 1000)
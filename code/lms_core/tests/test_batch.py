@@ -0,0 +1,134 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from lms_core.models import Course, CourseMember, CourseContent, CompletionTracking, CourseProgress
+from lms_core.progress import verify_progress
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class BatchTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        self.contents = [CourseContent.objects.create(course_id=self.course, name=f"Content {num}",
+                                                      is_published=num < 3)
+                         for num in range(4)]
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'teacher', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+
+    def post(self, url, items):
+        return self.client.post(self.base_url+url, data=json.dumps({'items': items}),
+                                content_type='application/json', **self.headers)
+
+    def create_students(self, count):
+        return [User.objects.create(username=f'student{num}') for num in range(count)]
+
+    def enroll(self, students):
+        return self.post('courses/enroll-batch/',
+                         [{'username': student.username, 'course_id': self.course.id} for student in students])
+
+    def test_enroll_batch_results(self):
+        students = self.create_students(3)
+        CourseMember.objects.create(course_id=self.course, user_id=students[0])
+        response = self.post('courses/enroll-batch/', [
+            {'username': 'student0', 'course_id': self.course.id},
+            {'username': 'student1', 'course_id': self.course.id},
+            {'username': 'student1', 'course_id': self.course.id},
+            {'username': 'nobody', 'course_id': self.course.id},
+            {'username': 'student2', 'course_id': 999},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.json()['results']],
+                         ['already_enrolled', 'enrolled', 'already_enrolled', 'user_not_found',
+                          'course_not_found'])
+        self.assertEqual(response.json()['summary']['enrolled'], 1)
+        self.assertEqual(CourseMember.objects.filter(course_id=self.course).count(), 2)
+        self.assertTrue(CourseProgress.objects.filter(student=students[1], course=self.course).exists())
+
+    def test_enroll_batch_query_count_is_constant(self):
+        # the caller's identity is loaded (and cached) by the first request
+        self.enroll(self.create_students(1))
+        counts = []
+        for students in ([User.objects.create(username=f'some{num}') for num in range(2)], [User.objects.create(username=f'other{num}')
+                                                   for num in range(20)]):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.enroll(students).status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_complete_batch_updates_progress(self):
+        students = self.create_students(2)
+        self.enroll(students)
+        self.post('add-completion-batch/', [{'student_username': 'student0',
+                                             'content_id': self.contents[0].id}])
+        items = [{'student_username': student.username, 'content_id': content.id}
+                 for student in students for content in self.contents]
+        items.append({'student_username': 'nobody', 'content_id': self.contents[0].id})
+        items.append({'student_username': 'student0', 'content_id': 999})
+        response = self.post('add-completion-batch/', items)
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()['summary']
+        self.assertEqual(summary, {'completed': 7, 'already_completed': 1,
+                                   'user_not_found': 1, 'content_not_found': 1})
+        self.assertEqual(CompletionTracking.objects.filter(completed=True).count(), 8)
+        progress = CourseProgress.objects.get(student=students[1], course=self.course)
+        self.assertEqual((progress.completed_count, progress.total_contents), (3, 3))
+        self.assertEqual(verify_progress(), [])
+
+        response = self.post('add-completion-batch/', items[:4])
+        self.assertEqual(response.json()['summary'], {'already_completed': 4})
+        self.assertEqual(verify_progress(), [])
+
+    def test_only_teacher_or_staff_may_batch(self):
+        self.create_students(2)
+        other = User.objects.create_user(username='other', password='password123')
+        other_course = Course.objects.create(name="Flask", description="-", price=50, teacher=other)
+        response = self.post('courses/enroll-batch/', [
+            {'username': 'student0', 'course_id': self.course.id},
+            {'username': 'student0', 'course_id': other_course.id},
+        ])
+        self.assertEqual([result['status'] for result in response.json()['results']], ['enrolled', 'forbidden'])
+
+        other_content = CourseContent.objects.create(course_id=other_course, name="Routing", is_published=True)
+        response = self.post('add-completion-batch/', [
+            {'student_username': 'student0', 'content_id': self.contents[0].id},
+            {'student_username': 'student0', 'content_id': other_content.id},
+        ])
+        self.assertEqual([result['status'] for result in response.json()['results']], ['completed', 'forbidden'])
+        self.assertFalse(CompletionTracking.objects.filter(content=other_content).exists())
+
+        # a student cannot enroll anyone, staff can enroll into any course
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'other', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+        response = self.post('courses/enroll-batch/', [{'username': 'student1', 'course_id': self.course.id}])
+        self.assertEqual(response.json()['summary'], {'forbidden': 1})
+        User.objects.filter(username='other').update(is_staff=True)
+        User.objects.get(username='other').save()
+        response = self.post('courses/enroll-batch/', [{'username': 'student1', 'course_id': self.course.id}])
+        self.assertEqual(response.json()['summary'], {'enrolled': 1})
+
+    def test_complete_batch_counts_uncompleted_rows_once(self):
+        students = self.create_students(1)
+        self.enroll(students)
+        CompletionTracking.objects.create(student=students[0], content=self.contents[0], completed=False)
+        response = self.post('add-completion-batch/', [
+            {'student_username': 'student0', 'content_id': self.contents[0].id},
+            {'student_username': 'student0', 'content_id': self.contents[0].id},
+        ])
+        self.assertEqual([result['status'] for result in response.json()['results']],
+                         ['completed', 'already_completed'])
+        self.assertEqual(CourseProgress.objects.get(student=students[0], course=self.course).completed_count, 1)
+        self.assertEqual(verify_progress(), [])
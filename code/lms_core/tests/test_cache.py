@@ -0,0 +1,59 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from lms_core.cache import get_or_build
+from lms_core.models import Course, CourseCategory
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class CourseCacheTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123',
+                                                first_name='Old')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+
+    def test_cached_list_and_detail_skip_database(self):
+        self.client.get(f'{self.base_url}courses')
+        self.client.get(f'{self.base_url}courses/{self.course.id}')
+        with self.assertNumQueries(0):
+            response = self.client.get(f'{self.base_url}courses')
+            self.assertEqual(response.json()['items'][0]['name'], "Django for Beginners")
+            response = self.client.get(f'{self.base_url}courses/{self.course.id}')
+            self.assertEqual(response.json()['name'], "Django for Beginners")
+
+    def test_course_save_invalidates(self):
+        self.client.get(f'{self.base_url}courses/{self.course.id}')
+        self.course.name = "Renamed"
+        self.course.save()
+        response = self.client.get(f'{self.base_url}courses/{self.course.id}')
+        self.assertEqual(response.json()['name'], "Renamed")
+
+    def test_teacher_save_invalidates(self):
+        self.client.get(f'{self.base_url}courses')
+        self.teacher.first_name = 'New'
+        self.teacher.save()
+        response = self.client.get(f'{self.base_url}courses')
+        self.assertEqual(response.json()['items'][0]['teacher']['first_name'], 'New')
+
+    def test_category_change_invalidates(self):
+        self.client.get(f'{self.base_url}courses')
+        CourseCategory.objects.create(name="Programming")
+        with self.assertNumQueries(1):
+            self.client.get(f'{self.base_url}courses')
+
+    def test_get_or_build_waits_for_lock_holder(self):
+        calls = []
+        cache.add('stampede:lock', 1)
+        threading.Timer(0.1, cache.set, args=('stampede', 'fresh')).start()
+        value = get_or_build('stampede', lambda: calls.append(1) or 'rebuilt')
+        self.assertEqual(value, 'fresh')
+        self.assertEqual(calls, [])
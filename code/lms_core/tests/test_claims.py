@@ -0,0 +1,119 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ninja_simple_jwt.jwt.token_operations import TokenTypes, decode_token
+
+from lms_core.auth import AuthClaims
+from lms_core.identity import identity_cache
+from lms_core.models import Course, CourseMember, CourseContent, Profile
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class TokenClaimsTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        cache.clear()
+        identity_cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        Profile.objects.create(user=self.teacher, role='teacher')
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        self.other = Course.objects.create(name="Flask", description="-", price=50, teacher=self.teacher)
+        self.content = CourseContent.objects.create(course_id=self.course, name="Intro", is_published=True)
+        CourseMember.objects.create(course_id=self.course, user_id=self.student)
+
+    def sign_in(self, username):
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': username, 'password': 'password123'}),
+                                 content_type='application/json')
+        return login.json()
+
+    def headers(self, tokens):
+        return {'HTTP_AUTHORIZATION': 'Bearer ' + tokens['access']}
+
+    def authorization_queries(self, queries):
+        return [query for query in queries
+                if '"lms_core_profile"' in query['sql'] or '"lms_core_coursemember"' in query['sql']]
+
+    def test_token_carries_role_and_courses(self):
+        claims = decode_token(self.sign_in('student')['access'], TokenTypes.ACCESS)
+        self.assertIsNone(claims['role'])
+        self.assertEqual(claims['courses'], [self.course.id])
+        claims = decode_token(self.sign_in('teacher')['access'], TokenTypes.ACCESS)
+        self.assertEqual(claims['role'], 'teacher')
+        self.assertEqual(claims['courses'], [])
+
+    def test_refreshed_token_keeps_claims_time(self):
+        tokens = self.sign_in('student')
+        refreshed = self.client.post(self.base_url+'auth/token-refresh',
+                                     data=json.dumps({'refresh': tokens['refresh']}),
+                                     content_type='application/json').json()
+        before = decode_token(tokens['refresh'], TokenTypes.REFRESH)
+        after = decode_token(refreshed['access'], TokenTypes.ACCESS)
+        self.assertEqual(before['claims_at'], after['claims_at'])
+        self.assertEqual(after['courses'], [self.course.id])
+
+    def test_role_check_without_queries(self):
+        headers = self.headers(self.sign_in('teacher'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'{self.base_url}course-content/{self.course.id}/',
+                                        data=json.dumps({'username': 'teacher'}),
+                                        content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.authorization_queries(queries), [])
+
+    def test_non_member_rejected_without_queries(self):
+        content = CourseContent.objects.create(course_id=self.other, name="Routing")
+        headers = self.headers(self.sign_in('student'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'{self.base_url}contents/{content.id}/comments',
+                                        data=json.dumps({'comment': 'hi'}),
+                                        content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.authorization_queries(queries), [])
+
+    def test_stale_token_falls_back_to_database(self):
+        content = CourseContent.objects.create(course_id=self.other, name="Routing")
+        headers = self.headers(self.sign_in('student'))
+        CourseMember.objects.create(course_id=self.other, user_id=self.student)
+        response = self.client.post(f'{self.base_url}contents/{content.id}/comments',
+                                    data=json.dumps({'comment': 'hi'}),
+                                    content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 201)
+
+    def test_change_outlives_the_cache(self):
+        # another process, or a restart, does not have the cached stamp
+        headers = self.headers(self.sign_in('student'))
+        CourseMember.objects.filter(user_id=self.student).delete()
+        cache.clear()
+        response = self.client.post(f'{self.base_url}contents/{self.content.id}/comments',
+                                    data=json.dumps({'comment': 'hi'}),
+                                    content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 401)
+
+    def test_refreshed_token_of_demoted_user_is_stale(self):
+        tokens = self.sign_in('teacher')
+        Profile.objects.filter(user=self.teacher).update(role='student')
+        Profile.objects.get(user=self.teacher).save()
+        cache.clear()
+        refreshed = self.client.post(self.base_url+'auth/token-refresh',
+                                     data=json.dumps({'refresh': tokens['refresh']}),
+                                     content_type='application/json').json()
+        claims = AuthClaims(self.teacher.id, role='teacher', courses=[],
+                            claims_at=decode_token(refreshed['access'], TokenTypes.ACCESS)['claims_at'])
+        self.assertTrue(claims.stale)
+        self.assertFalse(claims.is_teacher)
+
+    def test_fallback_can_be_disabled(self):
+        claims = AuthClaims(self.student.id, courses=[], claims_at=0, db_fallback=False)
+        self.assertFalse(claims.is_member(self.course.id))
+        claims = AuthClaims(self.student.id, courses=[], claims_at=0)
+        self.assertTrue(claims.is_member(self.course.id))
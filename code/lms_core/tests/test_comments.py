@@ -0,0 +1,49 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from lms_core.models import Course, CourseMember, CourseContent, Comment
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class CommentListTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        self.content = CourseContent.objects.create(course_id=self.course, name="Intro")
+        other = CourseContent.objects.create(course_id=self.course, name="Models")
+        students = [User.objects.create(username=f'student{num}', first_name='Student', last_name=str(num))
+                    for num in range(5)]
+        members = [CourseMember.objects.create(course_id=self.course, user_id=student) for student in students]
+        for num in range(60):
+            Comment.objects.create(content_id=self.content, member_id=members[num % 5], comment=f"comment {num}")
+        Comment.objects.create(content_id=other, member_id=members[0], comment="elsewhere")
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'teacher', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+
+    def test_page_is_one_query_with_flat_items(self):
+        url = f'{self.base_url}contents/{self.content.id}/comments?page_size=50'
+        with self.assertNumQueries(1):
+            response = self.client.get(url, **self.headers)
+        data = response.json()
+        self.assertEqual(len(data['items']), 50)
+        self.assertEqual(data['items'][0], {
+            'id': data['items'][0]['id'],
+            'author': 'Student 0',
+            'created_at': data['items'][0]['created_at'],
+            'comment': 'comment 0',
+        })
+
+        response = self.client.get(f"{url}&cursor={data['next']}", **self.headers)
+        rest = response.json()
+        self.assertEqual([item['comment'] for item in rest['items']],
+                         [f'comment {num}' for num in range(50, 60)])
+        self.assertIsNone(rest['next'])
@@ -0,0 +1,76 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from lms_core.conditional import conditional_enabled
+from lms_core.models import Course, CourseContent
+from lms_core.ratings import add_rating
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+@override_settings(LMS_CONDITIONAL_GET=True)
+class ConditionalGetTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        self.content = CourseContent.objects.create(course_id=self.course, name="Intro")
+
+    def urls(self):
+        return [f'{self.base_url}courses', f'{self.base_url}courses/{self.course.id}',
+                f'{self.base_url}courses/{self.course.id}/contents',
+                f'{self.base_url}courses/{self.course.id}/contents/{self.content.id}']
+
+    def test_if_none_match_skips_database(self):
+        for url in self.urls():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            with CaptureQueriesContext(connection) as queries:
+                again = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(again.status_code, 304, url)
+            self.assertEqual(again.content, b'')
+            self.assertEqual(len(queries), 0, url)
+
+    def test_if_modified_since(self):
+        for url in self.urls():
+            response = self.client.get(url)
+            again = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(again.status_code, 304, url)
+            older = http_date(self.course.updated_at.timestamp() - 60)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=older).status_code, 200, url)
+
+    def test_changes_move_the_etag(self):
+        etags = [self.client.get(url)['ETag'] for url in self.urls()]
+        CourseContent.objects.create(course_id=self.course, name="Models")
+        add_rating(self.course.id, 5)
+        for url, etag in zip(self.urls(), etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200, url)
+
+    def test_query_string_is_part_of_the_etag(self):
+        url = f'{self.base_url}courses'
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(f'{url}?fields=id')['ETag'], etag)
+
+    def test_missing_object(self):
+        response = self.client.get(f'{self.base_url}courses/999/contents', HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['items'], [])
+
+    @override_settings(LMS_CONDITIONAL_GET=None)
+    def test_needs_a_shared_cache(self):
+        # other processes never bump a per-process cache, their writes would go unseen
+        for url in self.urls():
+            response = self.client.get(url)
+            self.assertFalse(response.has_header('ETag'), url)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date()).status_code, 200, url)
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                                   'LOCATION': 'redis://localhost:6379'}}):
+            self.assertTrue(conditional_enabled())
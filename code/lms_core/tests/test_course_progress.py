@@ -0,0 +1,100 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from lms_core.models import Course, CourseContent, CompletionTracking, CourseProgress
+from lms_core.progress import rebuild_progress, verify_progress
+
+
+class CourseProgressTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        self.contents = [CourseContent.objects.create(course_id=self.course, name=f"Content {num}",
+                                                      teacher=self.teacher, is_published=num < 3)
+                         for num in range(4)]
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'student', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+        self.client.post(f'{self.base_url}courses/{self.course.id}/enroll', **self.headers)
+
+    def progress(self):
+        return CourseProgress.objects.get(student=self.student, course=self.course)
+
+    def complete(self, content):
+        self.client.post(f'{self.base_url}add-completion/', data={
+            'student_username': 'student', 'content_id': content.id, 'course_id': self.course.id,
+        }, content_type='application/json', **self.headers)
+
+    def test_enroll_creates_progress(self):
+        self.assertEqual(self.progress().completed_count, 0)
+        self.assertEqual(self.progress().total_contents, 3)
+
+    def test_completion_updates_incrementally(self):
+        self.complete(self.contents[0])
+        self.complete(self.contents[0])
+        self.complete(self.contents[1])
+        self.complete(self.contents[3])  # unpublished, not counted
+        self.assertEqual(self.progress().completed_count, 2)
+        self.assertIsNotNone(self.progress().last_completed_at)
+
+        self.client.delete(f'{self.base_url}delete-completion/?student_id={self.student.id}'
+                           f'&content_id={self.contents[1].id}', **self.headers)
+        self.assertEqual(self.progress().completed_count, 1)
+        self.assertEqual(verify_progress(), [])
+
+    def test_publish_and_content_lifecycle(self):
+        self.complete(self.contents[3])
+        self.client.put(f'{self.base_url}publish-content/{self.contents[3].id}/', data={
+            'username': 'teacher', 'is_published': True,
+        }, content_type='application/json', **self.headers)
+        self.assertEqual((self.progress().completed_count, self.progress().total_contents), (1, 4))
+
+        CourseContent.objects.create(course_id=self.course, name="New", is_published=True)
+        self.assertEqual(self.progress().total_contents, 5)
+        self.contents[3].delete()
+        self.assertEqual((self.progress().completed_count, self.progress().total_contents), (0, 4))
+        self.assertEqual(verify_progress(), [])
+
+    def test_rebuild_command(self):
+        CompletionTracking.objects.create(student=self.student, content=self.contents[2],
+                                          completed=True, completed_at=timezone.now())
+        self.assertEqual(len(verify_progress()), 1)
+        out = StringIO()
+        call_command('rebuild_progress', stdout=out)
+        self.assertIn('verified', out.getvalue())
+        self.assertEqual(self.progress().completed_count, 1)
+
+    def test_rebuild_in_batches(self):
+        other = Course.objects.create(name="Flask", description="-", price=50, teacher=self.teacher)
+        content = CourseContent.objects.create(course_id=other, name="Routing", is_published=True)
+        CompletionTracking.objects.create(student=self.student, content=content,
+                                          completed=True, completed_at=timezone.now())
+        CourseProgress.objects.all().delete()
+        self.assertEqual([key for key, _, _ in verify_progress(batch_size=1)], [(self.student.id, other.id)])
+        self.assertEqual(rebuild_progress(batch_size=1), 2)
+        self.assertEqual(verify_progress(batch_size=1), [])
+
+    def test_moving_content_recounts_both_courses(self):
+        other = Course.objects.create(name="Flask", description="-", price=50, teacher=self.teacher)
+        self.client.post(f'{self.base_url}courses/{other.id}/enroll', **self.headers)
+        self.complete(self.contents[0])
+        self.complete(self.contents[1])
+        response = self.client.put(f'{self.base_url}update-content/{self.contents[0].id}/',
+                                   data=json.dumps({'course_id': other.id}),
+                                   content_type='application/json', **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((self.progress().completed_count, self.progress().total_contents), (1, 2))
+        moved = CourseProgress.objects.get(student=self.student, course=other)
+        self.assertEqual((moved.completed_count, moved.total_contents), (1, 1))
+        self.assertEqual(verify_progress(), [])
@@ -0,0 +1,97 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from lms_core.models import Course, CourseMember, CourseContent, Comment
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class FieldSetTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123',
+                                                email='teacher@example.com')
+        self.course = Course.objects.create(name="Django for Beginners", description="x" * 4000,
+                                            price=100, teacher=self.teacher)
+        self.content = CourseContent.objects.create(course_id=self.course, name="Intro", description="-")
+        member = CourseMember.objects.create(course_id=self.course, user_id=self.teacher)
+        Comment.objects.create(content_id=self.content, member_id=member, comment="hello")
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'teacher', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.base_url + url, **self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), [query['sql'] for query in queries]
+
+    def test_course_list_fields(self):
+        data, queries = self.get('courses?fields=id,name,price')
+        self.assertEqual(data['items'], [{'id': self.course.id, 'name': "Django for Beginners", 'price': 100}])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"description"', queries[0])
+        self.assertNotIn('auth_user', queries[0])
+
+    def test_full_schema_without_parameters(self):
+        data, _ = self.get('courses')
+        self.assertEqual(data['items'][0]['teacher']['email'], 'teacher@example.com')
+        self.assertIn('rating', data['items'][0])
+
+    def test_expand_relation(self):
+        data, queries = self.get(f'courses/{self.course.id}?fields=id&expand=teacher,rating')
+        self.assertEqual(set(data), {'id', 'teacher', 'rating'})
+        self.assertEqual(data['teacher']['email'], 'teacher@example.com')
+        self.assertEqual(data['rating']['count'], 0)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"password"', queries[0])
+
+    def test_expand_only_keeps_scalar_fields(self):
+        data, queries = self.get(f'courses/{self.course.id}/contents?expand=course_id')
+        item = data['items'][0]
+        self.assertEqual(item['name'], "Intro")
+        self.assertEqual(item['course_id']['teacher']['id'], self.teacher.id)
+        self.assertEqual(len(queries), 1)
+
+    def test_members_and_comments(self):
+        data, _ = self.get('mycourses?fields=id,roles')
+        self.assertEqual(data['items'], [{'id': data['items'][0]['id'], 'roles': 'std'}])
+        data, queries = self.get(f'contents/{self.content.id}/comments?fields=author')
+        self.assertEqual(data['items'], [{'author': 'teacher'}])
+        self.assertEqual(len(queries), 1)
+
+    def test_unknown_field(self):
+        response = self.client.get(self.base_url + 'courses?fields=id,secret')
+        self.assertEqual(response.status_code, 422)
+
+    def test_normalized_contents(self):
+        for num in range(5):
+            CourseContent.objects.create(course_id=self.course, name=f"Lesson {num}")
+        data, queries = self.get(f'courses/{self.course.id}/contents?format=normalized&page_size=50')
+        self.assertEqual(len(data['items']), 6)
+        self.assertEqual({item['course_id'] for item in data['items']}, {self.course.id})
+        course = data['included']['courses'][str(self.course.id)]
+        self.assertEqual(course['teacher'], self.teacher.id)
+        self.assertEqual(data['included']['users'][str(self.teacher.id)]['email'], 'teacher@example.com')
+        # contents, then one in_bulk for courses and one for users
+        self.assertEqual(len(queries), 3)
+
+    def test_normalized_members_with_fields(self):
+        data, queries = self.get('mycourses?format=normalized&fields=id,course_id,user_id')
+        self.assertEqual(data['items'][0]['user_id'], self.teacher.id)
+        self.assertEqual(set(data['included']), {'courses', 'users'})
+        self.assertEqual(list(data['included']['users']), [str(self.teacher.id)])
+        self.assertEqual(len(queries), 3)
+
+    def test_normalized_not_supported(self):
+        response = self.client.get(self.base_url + 'courses?format=normalized')
+        self.assertEqual(response.status_code, 422)
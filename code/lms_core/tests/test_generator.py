@@ -0,0 +1,82 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import F, Max, Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from lms_core.generator import Generator, Sizes
+from lms_core.models import Comment, CompletionTracking, Course, CourseContent, CourseFeedback, CourseMember
+from lms_core.models import CourseProgress, CourseRating, Profile
+from lms_core.progress import verify_progress
+
+SMALL = ['--users', '300', '--teachers', '10', '--categories', '4', '--courses', '40',
+         '--contents-per-course', '6', '--comments', '2000', '--chunk-size', '500']
+
+
+class GenerateLmsDataTest(TestCase):
+
+    def generate(self, *args):
+        out = StringIO()
+        call_command('generate_lms_data', *SMALL, *args, stdout=out)
+        return out.getvalue()
+
+    def test_rows_are_consistent(self):
+        output = self.generate()
+        self.assertIn('completions', output)
+        self.assertEqual(User.objects.count(), 300)
+        self.assertEqual(Profile.objects.filter(role='teacher').count(), 10)
+        self.assertEqual(Course.objects.count(), 40)
+        self.assertEqual(Comment.objects.count(), 2000)
+        self.assertTrue(check_password('password123', User.objects.last().password))
+
+        # every comment is written by a member of the content's course
+        self.assertFalse(Comment.objects.exclude(content_id__course_id=F('member_id__course_id')).exists())
+        self.assertFalse(CompletionTracking.objects.filter(content__is_published=False).exists())
+        self.assertFalse(CourseContent.objects.filter(parent_id__isnull=False)
+                         .exclude(parent_id__course_id=F('course_id')).exists())
+        # derived tables are rebuilt, timestamps are kept
+        self.assertEqual(verify_progress(), [])
+        self.assertEqual(CourseRating.objects.aggregate(total=Sum('count'))['total'],
+                         CourseFeedback.objects.count())
+        self.assertLess(Course.objects.order_by('created_at').first().created_at,
+                        timezone.now() - timedelta(days=1))
+        self.assertGreater(CourseProgress.objects.count(), 0)
+
+    def test_popularity_is_skewed(self):
+        self.generate()
+        members = sorted(Counter(CourseMember.objects.values_list('course_id', flat=True)).values(), reverse=True)
+        self.assertGreater(members[0], 5 * members[len(members) // 2])
+        commenters = Counter(Comment.objects.values_list('member_id__user_id', flat=True)).most_common()
+        top = sum(count for _, count in commenters[:len(commenters) // 10])
+        self.assertGreater(top, Comment.objects.count() // 3)
+
+    def test_same_seed_same_rows(self):
+        # on every run: the timestamps count back from a fixed time
+        def rows(seed):
+            generator = Generator(Sizes(users=50, teachers=5, courses=10, comments=100), seed=seed)
+            generator.plan()
+            # the password hash has a random salt, every other value comes from the seed
+            return [[row[:2] + row[3:] if name == 'users' else row for row in build()]
+                    for name, _, _, build in generator.stages()]
+
+        self.assertEqual(rows(1), rows(1))
+        self.assertNotEqual(rows(1), rows(2))
+
+    def test_base_time(self):
+        self.generate('--scale', '0.2', '--now', '2024-06-01T12:00:00')
+        latest = max(Course.objects.aggregate(latest=Max('created_at'))['latest'],
+                     CompletionTracking.objects.aggregate(latest=Max('completed_at'))['latest'])
+        self.assertLessEqual(latest, datetime(2024, 6, 1, 12, tzinfo=dt_timezone.utc))
+        self.assertGreater(latest, datetime(2024, 5, 1, tzinfo=dt_timezone.utc))
+
+    def test_appends_after_existing_rows(self):
+        self.generate('--scale', '0.5')
+        self.generate('--scale', '0.5', '--seed', '1')
+        self.assertEqual(Course.objects.count(), 40)
+        self.assertEqual(verify_progress(), [])
+
@@ -0,0 +1,67 @@
+import json
+import time
+from dataclasses import FrozenInstanceError
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from lms_core.identity import Identity, IdentityCache, identity_cache, identity_for_user_id, identity_for_username
+from lms_core.models import Course, Profile
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class IdentityTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        identity_cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'student', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+
+    def user_queries(self, queries):
+        # identity lookups load the user together with its profile
+        return [query for query in queries if '"lms_core_profile"' in query['sql']]
+
+    def test_identity_is_loaded_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(f'{self.base_url}courses/{self.course.id}/enroll', **self.headers)
+        self.assertEqual(len(self.user_queries(queries)), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(f'{self.base_url}courses/{self.course.id}/enroll', **self.headers)
+        self.assertEqual(self.user_queries(queries), [])
+
+    def test_profile_change_evicts(self):
+        self.assertIsNone(identity_for_username('teacher').role)
+        Profile.objects.create(user=self.teacher, role='teacher')
+        self.assertTrue(identity_for_username('teacher').is_teacher)
+
+    def test_lru_bound_and_ttl(self):
+        cache = IdentityCache(maxsize=1, ttl=0.05)
+        cache.put(Identity(self.teacher.id, 'teacher', None))
+        cache.put(Identity(self.student.id, 'student', None))
+        self.assertIsNone(cache.get(self.teacher.id))
+        self.assertIsNone(cache.get_by_username('teacher'))
+        self.assertEqual(cache.get_by_username('student').user_id, self.student.id)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get(self.student.id))
+
+    def test_fresh_lookup_skips_cached_role(self):
+        Profile.objects.create(user=self.teacher, role='student')
+        cached = identity_for_username('teacher')
+        with self.assertRaises(FrozenInstanceError):
+            cached.role = 'teacher'
+        # a role change made by another process does not evict this cache
+        Profile.objects.filter(user=self.teacher).update(role='teacher')
+        self.assertFalse(identity_for_username('teacher').is_teacher)
+        self.assertTrue(identity_for_username('teacher', fresh=True).is_teacher)
+        self.assertTrue(identity_for_user_id(self.teacher.id).is_teacher)
@@ -0,0 +1,100 @@
+import json
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from lms_core import images
+from lms_core.models import Course, Profile, Task
+from lms_core.taskqueue import run_pending
+
+
+def sample_image(size=(2400, 1600), fmt='JPEG', mode='RGB'):
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 120, 40)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class ImageVariantTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+        cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'teacher', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+
+    def create_course(self, content, process=True):
+        response = self.client.post(self.base_url+'courses', data={
+            'name': 'New Course', 'description': '-', 'price': 150,
+            'image': SimpleUploadedFile('photo.jpg', content, content_type='image/jpeg'),
+        }, **self.headers)
+        self.assertEqual(response.status_code, 201)
+        if process:
+            run_pending()
+        return Course.objects.get(id=response.json()['id'])
+
+    def test_upload_writes_variants_next_to_original(self):
+        course = self.create_course(sample_image())
+        self.assertEqual(course.image_variants['source'], course.image.name)
+        expected = {'thumb': (160, 160), 'card': (640, 360), 'full': (1600, 1067)}
+        for variant, size in expected.items():
+            for fmt, name in course.image_variants['files'][variant].items():
+                self.assertEqual(name, images.variant_name(course.image.name, variant, fmt))
+                with course.image.storage.open(name) as stored:
+                    image = Image.open(stored)
+                    self.assertEqual(image.size, size)
+                    self.assertEqual(image.format, images.FORMATS[fmt][0])
+
+        response = self.client.get(f'{self.base_url}courses/{course.id}')
+        variants = response.json()['image_variants']
+        self.assertEqual(variants['card']['webp'], course.image.storage.url(
+            images.variant_name(course.image.name, 'card', 'webp')))
+
+    def test_replaced_image_hides_stale_variants(self):
+        course = self.create_course(sample_image())
+        course.image.save('other.png', SimpleUploadedFile('other.png', sample_image(fmt='PNG', mode='RGBA')),
+                          save=False)
+        self.assertIsNone(images.variant_urls(course.image, course.image_variants))
+        course.save()
+        run_pending()
+        course.refresh_from_db()
+        self.assertEqual(course.image_variants['source'], course.image.name)
+
+    def test_profile_picture_variants(self):
+        profile = Profile(user=self.teacher)
+        profile.profile_picture.save('me.jpg', SimpleUploadedFile('me.jpg', sample_image((800, 800))), save=False)
+        profile.save()
+        run_pending()
+        profile.refresh_from_db()
+        self.assertEqual(set(profile.picture_variants['files']), set(images.VARIANTS))
+
+    def test_broken_upload_is_left_without_variants(self):
+        with self.assertLogs('lms_core.images', 'WARNING'):
+            course = self.create_course(b'not an image')
+        self.assertEqual(course.image_variants, {})
+        self.assertIsNone(self.client.get(f'{self.base_url}courses/{course.id}').json()['image_variants'])
+
+    def test_request_only_queues_the_work(self):
+        course = self.create_course(sample_image(), process=False)
+        self.assertEqual(course.image_variants, {})
+        course.save()
+        task = Task.objects.get(status='queued')
+        self.assertEqual(task.name, 'images.variants')
+        self.assertEqual(task.dedup_key, f'images:lms_core.Course:{course.id}:image')
+        self.assertEqual(run_pending(), 1)
+        course.refresh_from_db()
+        self.assertEqual(course.image_variants['source'], course.image.name)
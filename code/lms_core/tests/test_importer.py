@@ -0,0 +1,95 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from lms_core.importer import PasswordHasherPool, _copy_row, _copy_value, iter_json_array
+from lms_core.models import Course, CourseMember, CourseContent, Comment
+
+
+class ImportLmsCommandTest(TestCase):
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name)
+        (self.path / 'user-data.csv').write_text(
+            "firstname,lastname,email,password,username\n"
+            "Gisela,Lacy,lacy@example.com,DSS37LTU3FN,GiselaLacy\n"
+            "Kyra,Nola,nola@example.com,DTY83URL6DI,KyraNola\n"
+        )
+        (self.path / 'course-data.csv').write_text(
+            "name,url,description,site,price,teacher\n"
+            f"Course A,http://a,\"Desc, A\",Coursera,100,{self.teacher.id}\n"
+            f"Course B,http://b,Desc B,Coursera,200,{self.student.id + 100}\n"
+        )
+        (self.path / 'member-data.csv').write_text(
+            "course_id,user_id,roles\n"
+            f"1,{self.student.id},\"std\"\n"
+        )
+        (self.path / 'contents.json').write_text(json.dumps([
+            {"video_url": "http://v", "course_id": 1, "name": "Intro", "description": "-"},
+        ]))
+        (self.path / 'comments.json').write_text(json.dumps([
+            {"content_id": 1, "user_id": self.student.id, "comment": "Nice"},
+            {"content_id": 1, "user_id": self.teacher.id, "comment": "Not a member"},
+        ]))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_import(self, **options):
+        out = StringIO()
+        call_command('import_lms', path=str(self.path), stdout=out, **options)
+        return out.getvalue()
+
+    def test_import_all_stages(self):
+        output = self.run_import()
+        self.assertIn('rows/s', output)
+        self.assertEqual(User.objects.count(), 4)
+        self.assertTrue(User.objects.get(username='GiselaLacy').check_password('DSS37LTU3FN'))
+        # course B references a teacher that does not exist
+        self.assertEqual(list(Course.objects.values_list('name', flat=True)), ['Course A'])
+        self.assertEqual(CourseMember.objects.count(), 1)
+        self.assertEqual(CourseContent.objects.count(), 1)
+        self.assertEqual(list(Comment.objects.values_list('comment', flat=True)), ['Nice'])
+
+    def test_import_is_idempotent(self):
+        self.run_import()
+        self.run_import()
+        self.assertEqual(User.objects.count(), 4)
+        self.assertEqual(Course.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_copy_backend_falls_back_to_orm(self):
+        self.run_import(backend='copy')
+        self.assertEqual(Course.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_parallel_password_hashing(self):
+        with PasswordHasherPool(workers=2) as hasher:
+            hashed = hasher(['first-Secret1', 'second-Secret2'])
+        self.assertTrue(check_password('first-Secret1', hashed[0]))
+        self.assertTrue(check_password('second-Secret2', hashed[1]))
+
+    def test_copy_value_quoting(self):
+        self.assertEqual(_copy_value(None), '\\N')
+        self.assertEqual(_copy_value('\\N'), '"\\N"')
+        self.assertEqual(_copy_value('say "hi", ok'), '"say ""hi"", ok"')
+
+    def test_copy_row_encodes_json(self):
+        course = Course(name='Say "hi"', description='-', price=100, teacher=self.teacher,
+                        image_variants={'thumb': 'a.webp'})
+        fields = [Course._meta.get_field(name) for name in ('name', 'image_variants', 'category')]
+        self.assertEqual(_copy_row(fields, course), '"Say ""hi""","{""thumb"": ""a.webp""}",\\N\n')
+
+    def test_iter_json_array_small_reads(self):
+        data = [{"id": i, "text": "x" * i} for i in range(20)]
+        (self.path / 'items.json').write_text(json.dumps(data, indent=2))
+        self.assertEqual(list(iter_json_array(self.path / 'items.json', read_size=7)), data)
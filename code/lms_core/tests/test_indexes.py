@@ -0,0 +1,113 @@
+import inspect
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from lms_core import api
+from lms_core.api import completion_rows, course_completions, course_contents
+from lms_core.membership import _members
+from lms_core.models import Comment, CompletionTracking, Course, CourseCategory, CourseContent, CourseMember
+from lms_core.pagination import KeysetPagination
+from lms_core.progress import _completed, _completers
+
+
+class QueryPlanTest(TestCase):
+    # The hot queries of lms_core/api.py must be answered from an index. On
+    # PostgreSQL sequential scans are disabled for the test, so a plan still
+    # scanning a table means no index fits the query; SQLite plans the same
+    # way from its schema alone.
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.teacher = User.objects.create_user(username='teacher', password='password123')
+        students = User.objects.bulk_create(User(username=f'student{num}') for num in range(50))
+        categories = CourseCategory.objects.bulk_create(CourseCategory(name=f'Category {num}') for num in range(5))
+        courses = Course.objects.bulk_create(
+            Course(name=f'Course {num}', description='-', price=100, teacher=cls.teacher,
+                   category=categories[num % 5]) for num in range(40))
+        Course.objects.update(created_at=now)
+        contents = CourseContent.objects.bulk_create(
+            CourseContent(name=f'Content {num}', course_id=courses[num % 40], is_published=num % 3 != 0)
+            for num in range(400))
+        members = CourseMember.objects.bulk_create(
+            CourseMember(course_id=course, user_id=student) for course in courses[:10] for student in students)
+        Comment.objects.bulk_create(
+            Comment(content_id=contents[num % 40], member_id=members[num % len(members)], comment='-')
+            for num in range(800))
+        CompletionTracking.objects.bulk_create(
+            CompletionTracking(student=student, content=content, completed=True, completed_at=now - timedelta(days=1))
+            for content in contents[:40] for student in students[:20])
+        cls.course = courses[3]
+        cls.category = categories[3]
+        cls.content = contents[3]
+        cls.student = students[7]
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE')
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            elif connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+
+    def assertIndexed(self, queryset, *models):
+        plan = queryset.explain()
+        for model in models:
+            table = model._meta.db_table
+            if connection.vendor == 'postgresql':
+                self.assertNotIn(f'Seq Scan on {table}', plan)
+            else:
+                self.assertIsNone(re.search(rf'SCAN {table}\b(?! USING)', plan), plan)
+        return plan
+
+    def view_queryset(self, view, **kwargs):
+        # the queryset the view body builds, below its pagination and sparse fields
+        request = RequestFactory().get('/')
+        request.user = self.student
+        return inspect.unwrap(view)(request, **kwargs)
+
+    def pages(self, queryset, ordering=None):
+        # the first page and the page after it, as KeysetPagination queries them
+        paginator = KeysetPagination(ordering=ordering)
+        ordering, _, first = paginator._keyset(queryset, KeysetPagination.Input(), 10)
+        cursor = paginator.encode_cursor(paginator._values(list(first)[-1], ordering))
+        _, _, after = paginator._keyset(queryset, KeysetPagination.Input(cursor=cursor), 10)
+        return first, after
+
+    def test_course_list(self):
+        for page in self.pages(self.view_queryset(api.list_courses)):
+            self.assertIndexed(page, Course)
+
+    def test_courses_of_category(self):
+        courses = self.view_queryset(api.list_courses).filter(category=self.category)
+        self.assertIndexed(self.pages(courses)[0], Course)
+
+    def test_membership_check(self):
+        self.assertIndexed(_members().filter(course_id=self.course.id, user_id=self.student.id), CourseMember)
+
+    def test_my_courses(self):
+        for page in self.pages(self.view_queryset(api.my_courses), ordering=['-created_at']):
+            self.assertIndexed(page, CourseMember)
+
+    def test_published_contents(self):
+        self.assertIndexed(course_contents(self.course.id, is_teacher=False), CourseContent)
+        self.assertIndexed(course_contents(self.course.id, is_teacher=True), CourseContent)
+        contents = self.view_queryset(api.list_content_course, course_id=self.course.id)
+        for page in self.pages(contents, ordering=['created_at']):
+            self.assertIndexed(page, CourseContent)
+
+    def test_comments_of_content(self):
+        comments = self.view_queryset(api.list_content_comment, content_id=self.content.id)
+        for page in self.pages(comments, ordering=['created_at']):
+            self.assertIndexed(page, Comment)
+
+    def test_completions_of_course(self):
+        self.assertIndexed(course_completions(self.course.id), CompletionTracking, CourseContent)
+        self.assertEqual(len(completion_rows(self.course.id)), 20)
+        self.assertIndexed(_completers(self.content), CompletionTracking)
+        self.assertIndexed(_completed(self.student.id, self.course.id), CompletionTracking, CourseContent)
@@ -0,0 +1,77 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from lms_core.membership import MembershipCache, get_membership, membership_cache, membership_for_content
+from lms_core.models import Course, CourseMember, CourseContent
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class MembershipTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        cache.clear()
+        membership_cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        self.content = CourseContent.objects.create(course_id=self.course, name="Intro")
+
+    def test_check_and_fetch_in_one_query(self):
+        member = CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        membership_cache.clear()
+        with self.assertNumQueries(1):
+            found = membership_for_content(self.content.id, self.student.id)
+            self.assertEqual(found, member)
+            self.assertEqual(found.course_id.name, "Django for Beginners")
+            self.assertEqual(found.user_id.username, "student")
+        with self.assertNumQueries(0):
+            self.assertEqual(membership_for_content(self.content.id, self.student.id), member)
+            self.assertTrue(self.course.is_member(self.student))
+
+    def test_enroll_and_unenroll_invalidate(self):
+        self.assertFalse(self.course.is_member(self.student))
+        member = CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        self.assertTrue(self.course.is_member(self.student))
+        member.delete()
+        self.assertIsNone(get_membership(self.course.id, self.student.id))
+        self.assertIsNone(membership_for_content(self.content.id, self.student.id))
+
+    def test_comment_reuses_cached_membership(self):
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'student', 'password': 'password123'}),
+                                 content_type='application/json')
+        headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+        url = f'{self.base_url}contents/{self.content.id}/comments'
+        response = self.client.post(url, data=json.dumps({'comment': 'hi'}),
+                                    content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 401)
+
+        self.client.post(f'{self.base_url}courses/{self.course.id}/enroll', **headers)
+        response = self.client.post(url, data=json.dumps({'comment': 'hi'}),
+                                    content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['member_id']['user_id']['id'], self.student.id)
+
+    def test_lru_bound(self):
+        lru = MembershipCache(maxsize=1)
+        first = CourseMember.objects.create(course_id=self.course, user_id=self.student)
+        second = CourseMember.objects.create(course_id=self.course, user_id=self.teacher)
+        lru.put(first)
+        lru.put(second)
+        self.assertIsNone(lru.get(self.course.id, self.student.id))
+        self.assertEqual(lru.get(self.course.id, self.teacher.id), second)
+
+    def test_content_course_expires(self):
+        lru = MembershipCache(ttl=-1)
+        lru.put_content(1, self.course.id)
+        self.assertIsNone(lru.content_course(1))
+        lru = MembershipCache()
+        lru.put_content(1, self.course.id)
+        self.assertEqual(lru.content_course(1), self.course.id)
@@ -0,0 +1,81 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from lms_core.models import Course, CourseContent
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class CourseOutlineTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.student = User.objects.create_user(username='student', password='password123')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        module = self.add("Module 1", published=True)
+        self.add("Lesson 1.1", module, published=True)
+        self.add("Lesson 1.2", module, published=False)
+        hidden = self.add("Module 2", published=False)
+        self.add("Lesson 2.1", hidden, published=True)
+        self.headers = {name: self.login(name) for name in ('teacher', 'student')}
+
+    def add(self, name, parent=None, published=True):
+        return CourseContent.objects.create(course_id=self.course, name=name, parent_id=parent,
+                                            is_published=published)
+
+    def login(self, username):
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': username, 'password': 'password123'}),
+                                 content_type='application/json')
+        return {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+
+    def outline(self, username):
+        response = self.client.get(f'{self.base_url}courses/{self.course.id}/outline', **self.headers[username])
+        self.assertEqual(response.status_code, 200)
+        return response.json()['outline']
+
+    def names(self, nodes):
+        return [(node['name'], self.names(node['children'])) for node in nodes]
+
+    def test_teacher_sees_full_tree(self):
+        self.assertEqual(self.names(self.outline('teacher')), [
+            ('Module 1', [('Lesson 1.1', []), ('Lesson 1.2', [])]),
+            ('Module 2', [('Lesson 2.1', [])]),
+        ])
+
+    def test_student_sees_published_subtrees(self):
+        self.assertEqual(self.names(self.outline('student')), [('Module 1', [('Lesson 1.1', [])])])
+
+    def test_outline_is_cached_and_invalidated(self):
+        self.outline('teacher')
+        with CaptureQueriesContext(connection) as queries:
+            self.outline('teacher')
+        self.assertFalse(any('lms_core_coursecontent' in query['sql'] for query in queries))
+        self.add("Module 3")
+        self.assertEqual(len(self.outline('teacher')), 3)
+
+    def test_outline_is_invalidated_per_course(self):
+        other = Course.objects.create(name="Flask", description="-", price=50, teacher=self.teacher)
+        self.outline('teacher')
+        CourseContent.objects.create(course_id=other, name="Routing")
+        with CaptureQueriesContext(connection) as queries:
+            self.outline('teacher')
+        self.assertFalse(any('lms_core_coursecontent' in query['sql'] for query in queries))
+
+        # moving a content out of the course invalidates its outline too
+        moved = CourseContent.objects.get(name="Module 2")
+        moved.course_id = other
+        moved.save()
+        self.assertEqual(self.names(self.outline('teacher')), [
+            ('Module 1', [('Lesson 1.1', []), ('Lesson 1.2', [])]),
+            ('Lesson 2.1', []),
+        ])
@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from lms_core.models import Course
+from lms_core.pagination import KeysetPagination
+
+
+class KeysetPaginationTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        for num in range(25):
+            Course.objects.create(name=f"Course {num}", description="-", price=num, teacher=self.teacher)
+        # force ties on created_at so the id tie-breaker is exercised
+        same_time = timezone.now()
+        Course.objects.filter(price__lt=10).update(created_at=same_time)
+        self.expected = list(Course.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def walk(self, direction, cursor=None):
+        seen = []
+        url = f'{self.base_url}courses'
+        while True:
+            response = self.client.get(url, {'cursor': cursor} if cursor else {})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            seen.append([item['id'] for item in data['items']])
+            cursor = data[direction]
+            if not cursor:
+                return seen, data
+
+    def test_forward_pages_cover_every_course_once(self):
+        pages, last = self.walk('next')
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertIsNone(last['count'])
+
+    def test_previous_cursor_walks_back(self):
+        first = self.client.get(f'{self.base_url}courses').json()
+        second = self.client.get(f'{self.base_url}courses', {'cursor': first['next']}).json()
+        back = self.client.get(f'{self.base_url}courses', {'cursor': second['previous']}).json()
+        self.assertEqual([item['id'] for item in back['items']], self.expected[:10])
+        self.assertIsNone(back['previous'])
+        self.assertEqual(back['next'], first['next'])
+
+    def test_keyset_mode_skips_count(self):
+        first = self.client.get(f'{self.base_url}courses').json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'{self.base_url}courses', {'cursor': first['next']})
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in queries))
+
+    def test_page_number_mode_returns_count(self):
+        response = self.client.get(f'{self.base_url}courses', {'page': 3})
+        data = response.json()
+        self.assertEqual(data['count'], 25)
+        self.assertEqual([item['id'] for item in data['items']], self.expected[20:])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'{self.base_url}courses', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 422)
+
+    def test_malformed_cursor_values(self):
+        for values in (['garbage', 1], ['2024-01-01T00:00:00', 'abc'], [None, None],
+                       ['2024-01-01T00:00:00'], {'a': 1}):
+            cursor = KeysetPagination.encode_cursor(values)
+            response = self.client.get(f'{self.base_url}courses', {'cursor': cursor})
+            self.assertEqual(response.status_code, 422, values)
+
+    def test_cursor_bounds_leading_field(self):
+        first = self.client.get(f'{self.base_url}courses').json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'{self.base_url}courses', {'cursor': first['next']})
+        self.assertTrue(any('"created_at" <=' in query['sql'] for query in queries))
@@ -0,0 +1,83 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from lms_core.models import Course, CourseMember, CourseContent, CompletionTracking
+from lms_core.tests.helpers import without_silk
+
+
+@without_silk
+class ProgressReportTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        self.contents = [CourseContent.objects.create(course_id=self.course, name=f"Content {num}",
+                                                      is_published=True)
+                         for num in range(4)]
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'teacher', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+
+    def add_students(self, count, completed):
+        for num in range(count):
+            student = User.objects.create(username=f'student{User.objects.count()}')
+            CourseMember.objects.create(course_id=self.course, user_id=student)
+            for content in self.contents[:completed]:
+                CompletionTracking.objects.create(student=student, content=content, completed=True,
+                                                  completed_at=timezone.now())
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_progress_report_counts(self):
+        self.add_students(2, completed=3)
+        _, data = self.count_queries(f'{self.base_url}progress-report/?course_id={self.course.id}')
+        self.assertEqual(len(data['students']), 2)
+        self.assertEqual(data['students'][0]['completed'], 3)
+        self.assertEqual(data['students'][0]['total'], 4)
+        self.assertEqual(data['students'][0]['percentage'], 75.0)
+        self.assertNotIn('completions', data)
+
+    def test_progress_report_matches_my_progress(self):
+        self.add_students(1, completed=3)
+        self.contents[0].is_published = False
+        self.contents[0].save()
+        student = User.objects.get(username='student1')
+        student.set_password('password123')
+        student.save()
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'student1', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.client.post(f'{self.base_url}courses/{self.course.id}/enroll',
+                         HTTP_AUTHORIZATION='Bearer ' + login.json()['access'])
+        mine = self.client.get(f'{self.base_url}my-progress/',
+                               HTTP_AUTHORIZATION='Bearer ' + login.json()['access']).json()['progress'][0]
+        _, data = self.count_queries(f'{self.base_url}progress-report/?course_id={self.course.id}')
+        report = data['students'][0]
+        self.assertEqual((report['completed'], report['total'], report['percentage']),
+                         (mine['completed'], mine['total'], mine['percentage']))
+        self.assertEqual((report['completed'], report['total']), (2, 3))
+
+    def test_query_count_does_not_grow_with_rows(self):
+        urls = [f'{self.base_url}progress-report/?course_id={self.course.id}',
+                f'{self.base_url}progress-report/?course_id={self.course.id}&detail=true',
+                f'{self.base_url}show-completion/?course_id={self.course.id}']
+        self.add_students(1, completed=1)
+        small = [self.count_queries(url) for url in urls]
+        self.add_students(10, completed=4)
+        large = [self.count_queries(url) for url in urls]
+        self.assertEqual([count for count, _ in small], [count for count, _ in large])
+        self.assertEqual(len(large[1][1]['completions']), 41)
+        self.assertEqual(len(large[2][1]['completions']), 41)
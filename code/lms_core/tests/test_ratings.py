@@ -0,0 +1,111 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from lms_core.models import Course, CourseFeedback
+
+
+class CourseRatingTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.students = [User.objects.create(username=f'student{num}') for num in range(3)]
+        self.course = Course.objects.create(name="Django for Beginners", description="-",
+                                            price=100, teacher=self.teacher)
+        login = self.client.post(self.base_url+'auth/sign-in',
+                                 data=json.dumps({'username': 'teacher', 'password': 'password123'}),
+                                 content_type='application/json')
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + login.json()['access']}
+
+    def give_feedback(self, student, rating):
+        response = self.client.post(f'{self.base_url}feedbacks/', data={
+            'course_id': self.course.id, 'rating': rating, 'feedback': 'ok',
+            'created_by': student.username, 'show_date': '2025-01-01T00:00:00Z',
+        }, content_type='application/json')
+        return response.json()['feedback']['id']
+
+    def rating(self):
+        return self.client.get(f'{self.base_url}courses/{self.course.id}').json()['rating']
+
+    def test_course_without_feedback(self):
+        self.assertEqual(self.rating(), {'count': 0, 'average': 0.0,
+                                         'histogram': {str(star): 0 for star in range(1, 6)}})
+
+    def test_create_edit_delete_update_stats(self):
+        first = self.give_feedback(self.students[0], 5)
+        self.give_feedback(self.students[1], 4)
+        self.give_feedback(self.students[2], 4)
+        rating = self.rating()
+        self.assertEqual((rating['count'], rating['average']), (3, 4.33))
+        self.assertEqual(rating['histogram']['4'], 2)
+
+        self.client.put(f'{self.base_url}edit-feedback/{first}', data={'rating': 1, 'feedback': 'meh'},
+                        content_type='application/json', **self.headers)
+        # edit is only allowed for the author, the teacher's request is rejected
+        self.assertEqual(self.rating()['histogram']['5'], 1)
+        CourseFeedback.objects.filter(id=first).update(student=self.teacher)
+        self.client.put(f'{self.base_url}edit-feedback/{first}', data={'rating': 1, 'feedback': 'meh'},
+                        content_type='application/json', **self.headers)
+        rating = self.rating()
+        self.assertEqual((rating['histogram']['5'], rating['histogram']['1'], rating['average']), (0, 1, 3.0))
+
+        self.client.delete(f'{self.base_url}delete-feedback/?student_id={self.teacher.id}&feedback_id={first}',
+                           **self.headers)
+        rating = self.rating()
+        self.assertEqual((rating['count'], rating['average']), (2, 4.0))
+        list_rating = self.client.get(f'{self.base_url}courses').json()['items'][0]['rating']
+        self.assertEqual(list_rating, rating)
+
+    def test_repeated_delete_counts_once(self):
+        first = self.give_feedback(self.teacher, 5)
+        self.give_feedback(self.students[0], 3)
+        url = f'{self.base_url}delete-feedback/?student_id={self.teacher.id}&feedback_id={first}'
+        self.assertEqual(self.client.delete(url, **self.headers).status_code, 200)
+        self.assertEqual(self.client.delete(url, **self.headers).status_code, 404)
+        rating = self.rating()
+        self.assertEqual((rating['count'], rating['average'], rating['histogram']['3']), (1, 3.0, 1))
+
+    def test_rating_only_invalidates_its_course(self):
+        other = Course.objects.create(name="Flask", description="-", price=50, teacher=self.teacher)
+        self.client.get(f'{self.base_url}courses/{other.id}')
+        self.client.get(f'{self.base_url}courses')
+        self.give_feedback(self.students[0], 5)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'{self.base_url}courses/{other.id}')
+        self.assertFalse(any('lms_core_course"' in query['sql'] for query in queries))
+        self.assertEqual(self.rating()['count'], 1)
+        items = self.client.get(f'{self.base_url}courses').json()['items']
+        self.assertEqual({item['id']: item['rating']['count'] for item in items}, {self.course.id: 1, other.id: 0})
+
+    def test_rating_out_of_range_is_rejected(self):
+        first = self.give_feedback(self.teacher, 5)
+        for rating in (0, 6):
+            response = self.client.post(f'{self.base_url}feedbacks/', data={
+                'course_id': self.course.id, 'rating': rating, 'feedback': 'ok',
+                'created_by': self.students[0].username, 'show_date': '2025-01-01T00:00:00Z',
+            }, content_type='application/json')
+            self.assertEqual(response.status_code, 422)
+            response = self.client.put(f'{self.base_url}edit-feedback/{first}',
+                                       data={'rating': rating, 'feedback': 'meh'},
+                                       content_type='application/json', **self.headers)
+            self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.rating()['count'], 1)
+
+    def test_show_feedback_is_paginated(self):
+        for student in self.students:
+            self.give_feedback(student, 3)
+        response = self.client.get(f'{self.base_url}show-feedback/',
+                                   {'course_id': self.course.id, 'page_size': 2}, **self.headers)
+        data = response.json()
+        self.assertEqual(len(data['feedbacks']), 2)
+        self.assertEqual(data['rating']['count'], 3)
+        response = self.client.get(f'{self.base_url}show-feedback/',
+                                   {'course_id': self.course.id, 'cursor': data['next']}, **self.headers)
+        self.assertEqual(len(response.json()['feedbacks']), 1)
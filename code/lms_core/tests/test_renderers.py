@@ -0,0 +1,29 @@
+import datetime
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+
+from lms_core.renderers import JsonResponse, dumps
+
+
+class RendererTest(TestCase):
+
+    def test_dumps_types(self):
+        moment = datetime.datetime(2024, 5, 1, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+        data = json.loads(dumps({'at': moment, 'price': Decimal('9.50'), 'histogram': {5: 2}}))
+        self.assertEqual(data, {'at': '2024-05-01T08:30:15.123456Z', 'price': '9.50', 'histogram': {'5': 2}})
+
+    def test_json_response(self):
+        response = JsonResponse({'message': 'ok'}, status=201)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(response.content), {'message': 'ok'})
+        with self.assertRaises(TypeError):
+            JsonResponse([1, 2])
+        self.assertEqual(json.loads(JsonResponse([1, 2], safe=False).content), [1, 2])
+
+    def test_api_uses_renderer(self):
+        response = self.client.get('/api/v1/courses')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['items'], [])
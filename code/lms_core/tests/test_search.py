@@ -0,0 +1,35 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from lms_core.models import Course
+
+
+class CourseSearchTest(TestCase):
+
+    base_url = '/api/v1/'
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='password123')
+        self.in_description = Course.objects.create(name="Web Development", price=100, teacher=self.teacher,
+                                                    description="Build sites with Django and Python.")
+        self.in_name = Course.objects.create(name="Django for Beginners", price=100, teacher=self.teacher,
+                                             description="Learn the framework from scratch.")
+        Course.objects.create(name="Cooking", description="Pasta and pizza.", price=100, teacher=self.teacher)
+
+    def test_search_ranks_name_matches_first(self):
+        response = self.client.get(f'{self.base_url}courses/search', {'q': 'django'})
+        self.assertEqual(response.status_code, 200)
+        ids = [item['id'] for item in response.json()['items']]
+        self.assertEqual(ids, [self.in_name.id, self.in_description.id])
+
+    def test_search_keyset_pages(self):
+        first = self.client.get(f'{self.base_url}courses/search', {'q': 'django', 'page_size': 1}).json()
+        second = self.client.get(f'{self.base_url}courses/search',
+                                 {'q': 'django', 'page_size': 1, 'cursor': first['next']}).json()
+        self.assertEqual([item['id'] for item in first['items'] + second['items']],
+                         [self.in_name.id, self.in_description.id])
+        self.assertIsNone(second['next'])
+
+    def test_search_without_match(self):
+        response = self.client.get(f'{self.base_url}courses/search', {'q': 'rust'})
+        self.assertEqual(response.json()['items'], [])
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from lms_core.models import Task
+from lms_core.taskqueue import claim, enqueue, reap, run_pending, task, task_metrics
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('tests.flaky', max_attempts=3, backoff=60)
+def flaky(fail_times):
+    calls.append('flaky')
+    if calls.count('flaky') <= fail_times:
+        raise RuntimeError("flaky failure")
+
+
+class TaskQueueTest(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def run_failing(self):
+        with self.assertLogs('lms_core.taskqueue', 'WARNING'):
+            return run_pending()
+
+    def test_enqueue_and_run(self):
+        queued = enqueue('tests.record', {'value': 1})
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [1])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.locked_by), ('done', 1, ''))
+        self.assertIsNotNone(queued.duration)
+        self.assertEqual(run_pending(), 0)
+
+    def test_unknown_task(self):
+        with self.assertRaises(ValueError):
+            enqueue('tests.missing')
+
+    def test_dedup_key_keeps_one_queued_task(self):
+        first = enqueue('tests.record', {'value': 1}, dedup_key='same')
+        self.assertEqual(enqueue('tests.record', {'value': 2}, dedup_key='same').pk, first.pk)
+        claim('worker')
+        # once running, new changes need a new run
+        second = enqueue('tests.record', {'value': 3}, dedup_key='same')
+        self.assertNotEqual(second.pk, first.pk)
+        self.assertEqual(Task.objects.filter(dedup_key='same').count(), 2)
+
+    def test_delayed_task_waits(self):
+        enqueue('tests.record', {'value': 1}, delay=60)
+        self.assertEqual(run_pending(), 0)
+        Task.objects.update(run_at=timezone.now())
+        self.assertEqual(run_pending(), 1)
+
+    def test_retries_with_backoff_then_fails(self):
+        queued = enqueue('tests.flaky', {'fail_times': 5})
+        self.run_failing()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('queued', 1))
+        self.assertIn("flaky failure", queued.last_error)
+        self.assertGreaterEqual(queued.run_at, timezone.now() + timedelta(seconds=29))
+
+        for attempt in range(2):
+            Task.objects.update(run_at=timezone.now())
+            self.run_failing()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 3))
+        self.assertEqual(calls.count('flaky'), 3)
+
+    def test_retry_succeeds(self):
+        queued = enqueue('tests.flaky', {'fail_times': 1})
+        self.run_failing()
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.last_error), ('done', 2, ''))
+
+    @override_settings(LMS_TASK_LEASE=60)
+    def test_reap_lost_tasks(self):
+        queued = enqueue('tests.record', {'value': 1})
+        claim('dead-worker')
+        self.assertEqual(reap(), 0)
+        Task.objects.update(locked_at=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(reap(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'queued')
+        self.assertIn('dead-worker', queued.last_error)
+
+    def test_metrics(self):
+        enqueue('tests.record', {'value': 1})
+        enqueue('tests.record', {'value': 2})
+        enqueue('tests.flaky', {'fail_times': 5}, max_attempts=1)
+        self.run_failing()
+        enqueue('tests.record', {'value': 3}, delay=60)
+        metrics = {row['name']: row for row in task_metrics()}
+        self.assertEqual((metrics['tests.record']['done'], metrics['tests.record']['queued']), (2, 1))
+        self.assertEqual(metrics['tests.flaky']['failed'], 1)
+        self.assertIsNotNone(metrics['tests.record']['avg_duration'])
+        self.assertIsNotNone(metrics['tests.record']['avg_latency'])
+
+    def test_commands(self):
+        out = StringIO()
+        call_command('enqueue', 'check', stdout=out)
+        call_command('enqueue', 'check', stdout=out)
+        self.assertEqual(Task.objects.get().payload, {'name': 'check', 'args': []})
+        call_command('run_workers', workers=1, burst=True, stdout=out)
+        self.assertIn('1 tasks processed', out.getvalue())
+        call_command('task_stats', stdout=out)
+        self.assertIn('command', out.getvalue())
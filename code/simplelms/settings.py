@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from lms_core import claims as lms_claims
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -49,10 +52,19 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'silk.middleware.SilkyMiddleware'
-
 ]
 
+# django-silk profiles every request. Its middleware is sync only, so under
+# ASGI it would run each async view in a thread again; the ASGI deployment
+# starts with LMS_SILK=0.
+if os.environ.get('LMS_SILK', '1') != '0':
+    MIDDLEWARE.append('silk.middleware.SilkyMiddleware')
+
+# The hot read views are async for ASGI servers; wsgi.py sets
+# LMS_ASYNC_VIEWS=0 so WSGI workers get plain sync views instead of running
+# every read through async_to_sync (see read_view in lms_core/api.py).
+LMS_ASYNC_VIEWS = os.environ.get('LMS_ASYNC_VIEWS', '1') != '0'
+
 ROOT_URLCONF = 'simplelms.urls'
 
 TEMPLATES = [
@@ -89,6 +101,90 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory is per process, production should point this at a shared
+# cache (Redis/Memcached) so invalidation reaches every worker: set
+# LMS_REDIS_URL (docker-compose does) or override CACHES in local_settings.py.
+
+if os.environ.get('LMS_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['LMS_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'simplelms',
+        }
+    }
+
+LMS_CACHE_TIMEOUT = 300
+# ETag/Last-Modified on the catalogue reads, None sends them only when the
+# cache above is shared (see lms_core.conditional)
+LMS_CONDITIONAL_GET = None
+
+
+# Task queue
+# Side work (image variants, queued management commands) runs in
+# `manage.py run_workers`. A task still running after LMS_TASK_LEASE seconds
+# is taken as lost and retried.
+
+LMS_TASK_LEASE = 900
+
+
+# Attachment uploads
+# Chunked uploads are written to LMS_UPLOAD_DIR until complete; with several
+# app servers it must be a directory they all share. An upload that received
+# no chunk for LMS_UPLOAD_EXPIRY seconds fails and its files are removed.
+
+LMS_UPLOAD_DIR = BASE_DIR / 'partial_uploads'
+LMS_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+LMS_UPLOAD_MAX_SIZE = 2 * 1024 ** 3
+LMS_UPLOAD_EXPIRY = 24 * 3600
+
+
+def silk_intercept(request):
+    # silk reads the whole request body into memory, keep upload chunks streaming
+    return not request.path.startswith('/api/v1/uploads/')
+
+
+SILKY_INTERCEPT_FUNC = silk_intercept
+
+
+# JWT
+# Access tokens carry the user's role and enrolled course ids so read-path
+# authorization needs no queries. Tokens whose claims predate a role or
+# membership change are checked against the database instead. The time of
+# the last change is stored in the database and cached for
+# LMS_CLAIMS_CHECK_TTL seconds, so with a per-process cache another worker
+# trusts the old claims for at most that long.
+
+NINJA_SIMPLE_JWT = {
+    'TOKEN_CLAIM_USER_ATTRIBUTE_MAP': {
+        'user_id': 'id',
+        'username': 'username',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'email': 'email',
+        'is_staff': 'is_staff',
+        'is_superuser': 'is_superuser',
+        'last_login': 'last_login',
+        'date_joined': 'date_joined',
+        'role': lms_claims.token_role,
+        'courses': lms_claims.token_courses,
+        'claims_at': lms_claims.token_claims_at,
+    },
+}
+
+LMS_AUTH_CLAIMS_DB_FALLBACK = True
+LMS_TOKEN_MAX_COURSES = 200
+LMS_CLAIMS_CHECK_TTL = 10
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
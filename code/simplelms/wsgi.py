@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simplelms.settings')
+# sync workers get sync read views, see LMS_ASYNC_VIEWS in settings
+os.environ.setdefault('LMS_ASYNC_VIEWS', '0')
 
 application = get_wsgi_application()